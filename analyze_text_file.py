@@ -5,13 +5,20 @@ Generates comprehensive reports in multiple formats.
 """
 import os
 import sys
-import json
 import yaml
 import argparse
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from text_analyzer import TextAnalyzer
+from parallel_scan import analyze_file_sharded
+from error_store import ErrorStore
+from report_formats import REPORT_FORMATS, EntrySpool, resolve_format, write_report
+from report_writer import PagedReportWriter, write_markdown_line
+from line_index import MappedTextFile
+from metrics import MetricsExporter, ScanMetrics
+from time_budget import format_coverage
+from tracing import start_tracing, stop_tracing
 
 
 def load_config(config_path: str = 'config.yaml') -> Dict[str, Any]:
@@ -37,7 +44,9 @@ def load_config(config_path: str = 'config.yaml') -> Dict[str, Any]:
 
 
 def analyze_text_file(file_path: str, output_dir: str = 'error_reports', 
-                      enable_grammar: bool = True, config_path: str = 'config.yaml') -> Dict[str, Any]:
+                      enable_grammar: bool = True, config_path: str = 'config.yaml',
+                      paged: bool = False, workers: int = 1,
+                      time_budget: Optional[float] = None, metrics: Optional[ScanMetrics] = None) -> Dict[str, Any]:
     """
     Analyze a text file for errors.
     
@@ -46,9 +55,16 @@ def analyze_text_file(file_path: str, output_dir: str = 'error_reports',
         output_dir: Directory to save error reports
         enable_grammar: Whether to enable grammar checking
         config_path: Path to configuration file
+        paged: Whether to stream HTML/Markdown reports into bounded pages
+        workers: Number of processes; above 1 the file is analyzed in line-aligned shards
+        time_budget: Seconds to spend checking; cheap, high-severity checks run over
+            the whole file first and grammar checking fills the rest (single process)
+        metrics: Optional live metrics updated as lines are checked (single process)
         
     Returns:
-        Dictionary containing analysis results
+        Dictionary containing analysis results (when paged, lines_with_errors
+        is a closed EntrySpool: its length is the number of line entries, which
+        are in the saved reports)
     """
     print(f"\n{'='*60}")
     print(f"Analyzing Text File: {file_path}")
@@ -62,45 +78,156 @@ def analyze_text_file(file_path: str, output_dir: str = 'error_reports',
         print(f"Error: File '{file_path}' not found")
         return None
     
-    # Initialize analyzer
-    analyzer = TextAnalyzer(
-        enable_grammar=enable_grammar,
-        enable_turkish=config.get('error_types', {}).get('enable_turkish_specific', True),
-        config=config
-    )
+    # Budgeted runs schedule checks over the whole file, so they are not sharded
+    if time_budget is not None and workers > 1:
+        print("Note: --time-budget analyzes the file in a single process; ignoring --workers")
+        workers = 1
+    if metrics is not None and workers > 1:
+        print("Note: live metrics are not collected from worker processes")
+    
+    # Initialize analyzer (sharded runs create one per worker process instead)
+    enable_turkish = config.get('error_types', {}).get('enable_turkish_specific', True)
+    analyzer = None
+    if workers <= 1:
+        analyzer = TextAnalyzer(
+            enable_grammar=enable_grammar,
+            enable_turkish=enable_turkish,
+            config=config,
+            metrics=metrics
+        )
+    
+    # Line-indexed view of the file for report context lines
+    source = open_context_source(file_path, config)
+    line_callback = None
+    spool = None
     
     try:
         # Analyze file
         print("Analyzing file...")
-        results = analyzer.analyze_file(file_path)
+        if paged:
+            # Stream line entries straight into the paged report; the JSON reports are
+            # written once the totals are known, so their entries wait in a spool on disk
+            writer = create_paged_writer(file_path, output_dir, config, source)
+            spool = EntrySpool()
+            
+            def line_callback(line_data: Dict[str, Any]):
+                writer.add_line(line_data)
+                spool.append(line_data)
+        
+        if analyzer is not None:
+            results = analyzer.analyze_file(file_path, line_callback=line_callback, collect_lines=not paged,
+                                            time_budget=time_budget)
+        else:
+            print(f"Using {workers} worker processes")
+            results = analyze_file_sharded(
+                file_path,
+                workers=workers,
+                enable_grammar=enable_grammar,
+                enable_turkish=enable_turkish,
+                config=config,
+                line_callback=line_callback,
+                collect_lines=not paged
+            )
+        if spool is not None:
+            results['lines_with_errors'] = spool
+        lines_with_errors = len(results['lines_with_errors'])
         
         # Add metadata
         results['analysis_date'] = datetime.now().isoformat()
         results['config_used'] = config_path
         
+        if paged:
+            results['paged_report'] = str(writer.close(results))
+        
         print(f"\n{'='*60}")
         print(f"Analysis Complete!")
         print(f"{'='*60}")
         print(f"Total lines: {results['total_lines']}")
-        print(f"Lines with errors: {len(results['lines_with_errors'])}")
+        print(f"Lines with errors: {lines_with_errors}")
         print(f"Total errors: {results['total_errors']}")
         print(f"\nError Summary:")
         print(f"  - Grammar/Punctuation: {results['error_summary']['grammar_punctuation']}")
         print(f"  - Mathematical: {results['error_summary']['mathematical']}")
         print(f"  - Turkish-specific: {results['error_summary']['turkish']}")
         print(f"  - Spacing: {results['error_summary']['spacing']}")
+        print(f"Repeated-line cache hit rate: {results['cache_stats']['hit_rate']:.1%}")
+        if 'time_budget' in results:
+            coverage = results['time_budget']
+            state = 'deadline reached' if coverage['deadline_reached'] else 'all checks complete'
+            print(f"\nTime budget: {coverage['elapsed']:g}s of {coverage['seconds']:g}s ({state})")
+            for line in format_coverage(coverage):
+                print(f"  - {line}")
         print(f"{'='*60}\n")
         
         # Save reports
-        save_reports(results, output_dir, config)
+        save_reports(results, output_dir, config, paged=paged, source=source)
+        if paged:
+            print(f"Paged report saved to: {results['paged_report']}")
         
         return results
         
     finally:
-        analyzer.close()
+        if analyzer is not None:
+            analyzer.close()
+        if source is not None:
+            source.close()
+        if spool is not None:
+            # Spooled entries are in the saved reports now
+            spool.close()
+
+
+def open_context_source(file_path: str, config: Dict[str, Any]) -> Optional[MappedTextFile]:
+    """
+    Open a memory-mapped view of a file if reports should show context lines.
+    
+    Args:
+        file_path: Path to the analyzed file
+        config: Configuration dictionary
+        
+    Returns:
+        MappedTextFile, or None if context lines are disabled or unavailable
+    """
+    if not config.get('reporting', {}).get('include_context_lines', 0):
+        return None
+    
+    try:
+        return MappedTextFile(file_path)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Context lines disabled. Could not map '{file_path}': {e}")
+        return None
 
 
-def save_reports(results: Dict[str, Any], output_dir: str, config: Dict[str, Any]):
+def create_paged_writer(file_path: str, output_dir: str, config: Dict[str, Any],
+                        source: Optional[MappedTextFile] = None) -> PagedReportWriter:
+    """
+    Create a paged report writer for a file.
+    
+    Args:
+        file_path: Path to the analyzed file
+        output_dir: Directory to save the reports
+        config: Configuration dictionary
+        source: Mapped source file used to show context lines
+        
+    Returns:
+        PagedReportWriter writing into a timestamped report directory
+    """
+    reporting = config.get('reporting', {})
+    export_formats = reporting.get('export_formats', ['json', 'markdown'])
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    
+    return PagedReportWriter(
+        output_dir,
+        f"{Path(file_path).stem}_report_{timestamp}",
+        page_size=reporting.get('page_size', 1000),
+        formats=[fmt for fmt in export_formats if fmt in ('html', 'markdown')],
+        source=source,
+        context_lines=reporting.get('include_context_lines', 0),
+        max_context_chars=reporting.get('max_context_chars', 0)
+    )
+
+
+def save_reports(results: Dict[str, Any], output_dir: str, config: Dict[str, Any], paged: bool = False,
+                 source: Optional[MappedTextFile] = None):
     """
     Save error reports in multiple formats.
     
@@ -108,6 +235,8 @@ def save_reports(results: Dict[str, Any], output_dir: str, config: Dict[str, Any
         results: Analysis results dictionary
         output_dir: Directory to save the reports
         config: Configuration dictionary
+        paged: Whether HTML/Markdown reports were already streamed by a PagedReportWriter
+        source: Mapped source file used to show context lines
     """
     # Create output directory if it doesn't exist
     Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -119,40 +248,63 @@ def save_reports(results: Dict[str, Any], output_dir: str, config: Dict[str, Any
     # Get export formats from config
     export_formats = config.get('reporting', {}).get('export_formats', ['json', 'markdown'])
     
-    # Save JSON report
-    if 'json' in export_formats:
-        json_filename = f"{file_name}_errors_{timestamp}.json"
-        json_path = Path(output_dir) / json_filename
+    # Save JSON report and its streamed, compressed or binary variants
+    for report_format in REPORT_FORMATS:
+        if report_format not in export_formats:
+            continue
+        report_format = resolve_format(report_format)
+        report_filename = f"{file_name}_errors_{timestamp}.{report_format}"
+        report_path = Path(output_dir) / report_filename
         
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        write_report(results, report_path, report_format)
         
-        print(f"JSON report saved to: {json_path}")
+        kind = 'JSON report' if report_format == 'json' else f"Report ({report_format})"
+        print(f"{kind} saved to: {report_path}")
     
     # Save Markdown report
-    if 'markdown' in export_formats:
+    if 'markdown' in export_formats and not paged:
         md_filename = f"{file_name}_errors_{timestamp}.md"
         md_path = Path(output_dir) / md_filename
         
-        generate_markdown_report(results, md_path)
+        reporting = config.get('reporting', {})
+        generate_markdown_report(results, md_path, source,
+                                 reporting.get('include_context_lines', 0),
+                                 reporting.get('max_context_chars', 0))
         print(f"Markdown report saved to: {md_path}")
     
     # Save HTML report
-    if 'html' in export_formats:
+    if 'html' in export_formats and not paged:
         html_filename = f"{file_name}_errors_{timestamp}.html"
         html_path = Path(output_dir) / html_filename
         
         generate_html_report(results, html_path)
         print(f"HTML report saved to: {html_path}")
+    
+    # Save columnar Parquet export for analytics
+    if 'parquet' in export_formats:
+        parquet_filename = f"{file_name}_errors_{timestamp}.parquet"
+        parquet_path = Path(output_dir) / parquet_filename
+        
+        store = ErrorStore.from_results(results)
+        try:
+            if store.export_parquet(str(parquet_path)):
+                print(f"Parquet export saved to: {parquet_path}")
+        finally:
+            store.close()
 
 
-def generate_markdown_report(results: Dict[str, Any], output_path: Path):
+def generate_markdown_report(results: Dict[str, Any], output_path: Path,
+                             source: Optional[MappedTextFile] = None,
+                             context_lines: int = 0, max_context_chars: int = 0):
     """
     Generate a Markdown format error report.
     
     Args:
         results: Analysis results dictionary
         output_path: Path to save the Markdown report
+        source: Mapped source file used to show surrounding lines
+        context_lines: Number of surrounding lines to show before and after
+        max_context_chars: Truncate surrounding lines to this length (0 for no limit)
     """
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(f"# Error Detection Report\n\n")
@@ -170,55 +322,35 @@ def generate_markdown_report(results: Dict[str, Any], output_path: Path):
         f.write(f"| Turkish-specific | {results['error_summary']['turkish']} |\n")
         f.write(f"| Spacing | {results['error_summary']['spacing']} |\n\n")
         
+        if 'time_budget' in results:
+            coverage = results['time_budget']
+            state = 'deadline reached' if coverage['deadline_reached'] else 'all checks complete'
+            f.write(f"## Time Budget\n\n")
+            f.write(f"{coverage['elapsed']:g}s of {coverage['seconds']:g}s ({state})\n\n")
+            for line in format_coverage(coverage):
+                f.write(f"- {line}\n")
+            f.write(f"\n")
+        
+        if results.get('severity_summary'):
+            f.write(f"## Severity Breakdown\n\n")
+            f.write(f"| Severity | Count |\n")
+            f.write(f"|----------|-------|\n")
+            for severity, count in results['severity_summary'].items():
+                f.write(f"| {severity.title()} | {count} |\n")
+            f.write(f"\n")
+        
+        if results.get('top_rules'):
+            f.write(f"## Most Frequent Rules\n\n")
+            f.write(f"| Rule | Count |\n")
+            f.write(f"|------|-------|\n")
+            for rule, count in results['top_rules']:
+                f.write(f"| {rule} | {count} |\n")
+            f.write(f"\n")
+        
         f.write(f"## Detailed Errors\n\n")
         
         for line_data in results['lines_with_errors']:
-            line_num = line_data['line_number']
-            line_text = line_data['text']
-            
-            f.write(f"### Line {line_num}\n\n")
-            f.write(f"```\n{line_text}\n```\n\n")
-            
-            # Grammar/Punctuation errors
-            if line_data['errors'].get('grammar_punctuation'):
-                f.write(f"#### Grammar/Punctuation Errors\n\n")
-                for i, error in enumerate(line_data['errors']['grammar_punctuation'], 1):
-                    f.write(f"{i}. **{error['message']}**\n")
-                    f.write(f"   - Context: `{error['context']}`\n")
-                    if error.get('suggestions'):
-                        f.write(f"   - Suggestions: {', '.join(error['suggestions'])}\n")
-                    f.write(f"\n")
-            
-            # Mathematical errors
-            if line_data['errors'].get('mathematical'):
-                f.write(f"#### Mathematical Errors\n\n")
-                for i, error in enumerate(line_data['errors']['mathematical'], 1):
-                    f.write(f"{i}. **{error['message']}**\n")
-                    f.write(f"   - Context: `{error['context']}`\n")
-                    f.write(f"   - Severity: {error.get('severity', 'N/A')}\n")
-                    if error.get('suggestions'):
-                        f.write(f"   - Suggestions: {', '.join(error['suggestions'])}\n")
-                    f.write(f"\n")
-            
-            # Turkish-specific errors
-            if line_data['errors'].get('turkish'):
-                f.write(f"#### Turkish-specific Errors\n\n")
-                for i, error in enumerate(line_data['errors']['turkish'], 1):
-                    f.write(f"{i}. **{error['message']}**\n")
-                    f.write(f"   - Context: `{error['context']}`\n")
-                    f.write(f"   - Severity: {error.get('severity', 'N/A')}\n")
-                    if error.get('suggestions'):
-                        f.write(f"   - Suggestions: {', '.join(error['suggestions'])}\n")
-                    f.write(f"\n")
-            
-            # Spacing errors
-            if line_data['errors'].get('spacing'):
-                f.write(f"#### Spacing Errors\n\n")
-                for i, error in enumerate(line_data['errors']['spacing'], 1):
-                    f.write(f"{i}. **{error['message']}**\n")
-                    f.write(f"   - Context: `{error['context']}`\n")
-                    f.write(f"   - Severity: {error.get('severity', 'N/A')}\n")
-                    f.write(f"\n")
+            write_markdown_line(f, line_data, source, context_lines, max_context_chars)
 
 
 def generate_html_report(results: Dict[str, Any], output_path: Path):
@@ -424,6 +556,21 @@ Examples:
   
   # Use custom config file
   python analyze_text_file.py text.txt --config custom_config.yaml
+  
+  # Write large reports as paged HTML/Markdown with an index page
+  python analyze_text_file.py text.txt --paged
+  
+  # Analyze a large file with 8 processes
+  python analyze_text_file.py big.txt --workers 8
+  
+  # Finish within 60 seconds: important checks first, grammar as time allows
+  python analyze_text_file.py text.txt --time-budget 60
+  
+  # Serve live throughput metrics for Prometheus
+  python analyze_text_file.py big.txt --metrics-port 9464
+  
+  # Record a Chrome trace of every stage (open in chrome://tracing or ui.perfetto.dev)
+  python analyze_text_file.py text.txt --trace analysis_trace.json
         """
     )
     
@@ -450,11 +597,63 @@ Examples:
         help='Path to configuration file (default: config.yaml)'
     )
     
+    parser.add_argument(
+        '--paged',
+        action='store_true',
+        help='Stream HTML/Markdown reports into pages of reporting.page_size errors with an index page'
+    )
+    
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=1,
+        help='Number of processes for analyzing one large file in shards (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--time-budget',
+        type=float,
+        help='Seconds to spend checking; bracket, reference and spelling checks run first'
+    )
+    
+    parser.add_argument(
+        '--metrics-file',
+        help='Write live analysis metrics in Prometheus text format to this file'
+    )
+    
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        help='Serve live analysis metrics at http://127.0.0.1:PORT/metrics'
+    )
+    
+    parser.add_argument(
+        '--metrics-interval',
+        type=float,
+        default=15.0,
+        help='Seconds between metrics file writes (default: 15)'
+    )
+    
+    parser.add_argument(
+        '--trace',
+        help='Write a Chrome trace (JSON) of the checkers and report writing to this file'
+    )
+    
     args = parser.parse_args()
     
+    metrics = None
+    exporter = None
+    if args.metrics_file or args.metrics_port is not None:
+        metrics = ScanMetrics()
+        exporter = MetricsExporter(metrics, args.metrics_file, args.metrics_port, args.metrics_interval).start()
+    
+    # Spans of this process only; shard worker processes are not traced
+    tracer = start_tracing(args.trace, sys.modules[__name__]) if args.trace else None
+    
     try:
         enable_grammar = not args.no_grammar
-        analyze_text_file(args.file, args.output, enable_grammar, args.config)
+        analyze_text_file(args.file, args.output, enable_grammar, args.config, paged=args.paged, workers=args.workers,
+                          time_budget=args.time_budget, metrics=metrics)
     except KeyboardInterrupt:
         print("\n\nAnalysis interrupted by user.")
         sys.exit(0)
@@ -463,6 +662,11 @@ Examples:
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if tracer is not None:
+            stop_tracing(tracer)
+        if exporter is not None:
+            exporter.stop()
 
 
 if __name__ == '__main__':
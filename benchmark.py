@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Performance regression benchmarks with stored baselines.
+
+A fixed workload is run several times: the MAT104E25BF text file and PDF and
+generated corpora of several sizes built from the text file's lines. The
+grammar backend is replaced by a stub that answers instantly, so results do
+not depend on LanguageTool or the network. Each workload is split into stages
+(setup, extraction, checking, report) and every stage is timed in each run;
+one extra run under tracemalloc records the memory each stage needs.
+
+`run` stores the measurements as a baseline JSON file. `compare` measures the
+current tree (or loads a second results file) and fails when a stage became
+slower with statistical significance (exact one-sided Mann-Whitney test over
+the repeated timings, plus a minimum relative slowdown), or when its memory
+grew beyond a threshold.
+"""
+import io
+import sys
+import math
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import contextlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from error_record import to_json
+from memory_profile import MemoryProfiler
+from text_analyzer import TextAnalyzer
+
+
+BASELINE_VERSION = 1
+DEFAULT_SCALES = [5000, 20000]
+DEFAULT_REPEATS = 5
+DATA_DIR = Path(__file__).resolve().parent
+TEXT_SOURCE = 'MAT104E25BF.txt'
+PDF_SOURCE = 'MAT104E25BF.pdf'
+
+
+class StubLanguageTool:
+    """Grammar backend stand-in that reports no matches."""
+
+    def check(self, text: str) -> List[Any]:
+        return []
+
+    def close(self):
+        pass
+
+
+def _quiet() -> contextlib.AbstractContextManager:
+    """Silence the checkers' start-up messages."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def _load_config() -> Dict[str, Any]:
+    from analyze_text_file import load_config
+    with _quiet():
+        return load_config(str(DATA_DIR / 'config.yaml')) or {}
+
+
+def _stub_grammar(analyzer: TextAnalyzer):
+    """Route grammar checks through the stub backend."""
+    detector = analyzer.detector
+    detector.language_tool = StubLanguageTool()
+    detector.simple_grammar = None
+    detector.grammar_enabled = True
+
+
+def generate_corpus(source: Path, lines: int, output: Path, seed: int = 0):
+    """
+    Write a synthetic corpus built from the lines of a source text.
+
+    Lines are drawn at random from the source and half of them get new
+    digits, so the corpus keeps the source's mix of text and formulas while
+    the repeated-line cache cannot answer every line.
+
+    Args:
+        source: Text file whose lines are sampled
+        lines: Number of lines to write
+        output: Path of the corpus file
+        seed: Random seed; the same seed gives the same corpus
+    """
+    rng = random.Random(seed)
+    with open(source, 'r', encoding='utf-8') as f:
+        pool = [line.rstrip('\n') for line in f if line.strip()]
+
+    with open(output, 'w', encoding='utf-8') as f:
+        for _ in range(lines):
+            line = rng.choice(pool)
+            if rng.random() < 0.5:
+                line = ''.join(str(rng.randint(0, 9)) if char.isdigit() else char for char in line)
+            f.write(line + '\n')
+
+
+def _run_stages(stages: List[Tuple[str, Callable[[], Any]]], profiler: Optional[MemoryProfiler] = None) -> Dict[str, float]:
+    """Run stage functions in order, timing each (and marking it for the profiler)."""
+    timings = {}
+    for name, stage in stages:
+        if profiler is not None:
+            profiler.mark(name)
+        started = time.perf_counter()
+        stage()
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def _text_workload(path: Path, config: Dict[str, Any], report_path: Path,
+                   state: Dict[str, Any]) -> List[Tuple[str, Callable[[], Any]]]:
+    """Stages of a text file analysis; state['units'] is set to the number of lines."""
+
+    def setup():
+        with _quiet():
+            state['analyzer'] = TextAnalyzer(enable_grammar=False, enable_turkish=True, config=config)
+        _stub_grammar(state['analyzer'])
+
+    def checking():
+        state['results'] = state['analyzer'].analyze_file(str(path))
+        state['units'] = state['results']['total_lines']
+
+    def report():
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(state['results'], f, indent=2, ensure_ascii=False, default=to_json)
+        state['analyzer'].close()
+
+    return [('setup', setup), ('checking', checking), ('report', report)]
+
+
+def _pdf_workload(path: Path, config: Dict[str, Any], report_path: Path,
+                  state: Dict[str, Any]) -> List[Tuple[str, Callable[[], Any]]]:
+    """Stages of a PDF scan; state['units'] is set to the number of pages."""
+    from pdf_extractor import PDFExtractor
+    from scanner import check_page
+
+    def setup():
+        state['extractor'] = PDFExtractor(str(path))
+        with _quiet():
+            state['analyzer'] = TextAnalyzer(enable_grammar=False, enable_turkish=True, config=config)
+        _stub_grammar(state['analyzer'])
+
+    def extraction():
+        with _quiet():
+            state['pages'] = state['extractor'].extract_all_pages()
+        if not state['pages']:
+            raise RuntimeError(f"No pages extracted from {path}")
+        state['units'] = len(state['pages'])
+
+    def checking():
+        detector = state['analyzer'].detector
+        state['results'] = {'pages': [check_page(detector, page_data) for page_data in state['pages']]}
+
+    def report():
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(state['results'], f, indent=2, ensure_ascii=False, default=to_json)
+        state['analyzer'].close()
+
+    return [('setup', setup), ('extraction', extraction), ('checking', checking), ('report', report)]
+
+
+def run_benchmarks(repeats: int = DEFAULT_REPEATS, scales: Optional[List[int]] = None,
+                   data_dir: Path = DATA_DIR) -> Dict[str, Any]:
+    """
+    Measure every workload.
+
+    Args:
+        repeats: Timed runs per workload
+        scales: Line counts of the generated corpora
+        data_dir: Directory with the MAT104E25BF source files
+
+    Returns:
+        Results dictionary in the baseline format
+    """
+    scales = DEFAULT_SCALES if scales is None else scales
+    config = _load_config()
+    text_source = data_dir / TEXT_SOURCE
+    pdf_source = data_dir / PDF_SOURCE
+
+    results: Dict[str, Any] = {
+        'version': BASELINE_VERSION,
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': repeats,
+        'scales': scales,
+        'workloads': {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        workloads: List[Tuple[str, str, Path, Callable]] = [('text', 'line', text_source, _text_workload)]
+        for lines in scales:
+            corpus = tmp_dir / f"corpus_{lines}.txt"
+            generate_corpus(text_source, lines, corpus)
+            workloads.append((f"corpus_{lines}", 'line', corpus, _text_workload))
+        workloads.append(('pdf', 'page', pdf_source, _pdf_workload))
+
+        for name, unit, path, workload in workloads:
+            print(f"Benchmarking {name} ({path.name})...")
+            report_path = tmp_dir / f"{name}_report.json"
+            state: Dict[str, Any] = {}
+            try:
+                runs = [_run_stages(workload(path, config, report_path, state)) for _ in range(repeats)]
+                profiler = MemoryProfiler()
+                _run_stages(workload(path, config, report_path, state), profiler)
+                memory = {stage['stage']: stage for stage in profiler.finish()['stages']}
+            except (ImportError, OSError, RuntimeError) as e:
+                print(f"  Skipped: {e}")
+                results['workloads'][name] = {'skipped': str(e)}
+                continue
+
+            units = state['units']
+            stages = {}
+            for stage in runs[0]:
+                seconds = [run[stage] for run in runs]
+                stages[stage] = {
+                    'seconds': [round(value, 6) for value in seconds],
+                    'median_seconds': round(_median(seconds), 6),
+                    'peak_increase_mb': memory[stage]['peak_increase_mb'],
+                    'retained_mb': memory[stage]['retained_mb'],
+                }
+            results['workloads'][name] = {'unit': unit, 'units': units, 'stages': stages}
+            checking = stages['checking']['median_seconds']
+            if checking > 0:
+                print(f"  {units} {unit}s, checking {units / checking:.0f} {unit}s/s")
+
+    return results
+
+
+def _median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def mann_whitney_greater(baseline: List[float], current: List[float]) -> float:
+    """
+    Exact one-sided Mann-Whitney U test that current values are larger.
+
+    Args:
+        baseline: Baseline samples
+        current: Current samples
+
+    Returns:
+        p-value: probability of at least this much separation if both
+        samples came from the same distribution
+    """
+    n, m = len(current), len(baseline)
+    if n == 0 or m == 0:
+        return 1.0
+    # U counts (current, baseline) pairs where current is larger; ties count half
+    u = sum(1.0 if c > b else 0.5 if c == b else 0.0 for c in current for b in baseline)
+
+    # Number of rank arrangements giving each U, by the standard recurrence
+    counts: Dict[Tuple[int, int], List[int]] = {}
+
+    def distribution(i: int, j: int) -> List[int]:
+        if i == 0 or j == 0:
+            return [1]
+        key = (i, j)
+        if key not in counts:
+            with_current = [0] * j + distribution(i - 1, j)
+            without = distribution(i, j - 1)
+            size = max(len(with_current), len(without))
+            counts[key] = [
+                (with_current[k] if k < len(with_current) else 0) + (without[k] if k < len(without) else 0)
+                for k in range(size)
+            ]
+        return counts[key]
+
+    frequencies = distribution(n, m)
+    total = sum(frequencies)
+    at_least = sum(count for value, count in enumerate(frequencies) if value >= u - 1e-9)
+    return at_least / total
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1,
+                    memory_threshold: float = 0.1, alpha: float = 0.05,
+                    memory_slack_mb: float = 1.0) -> List[Dict[str, Any]]:
+    """
+    Compare current measurements with a baseline.
+
+    Args:
+        baseline: Baseline results
+        current: Current results
+        threshold: Smallest relative slowdown of a stage's median time that counts
+        memory_threshold: Smallest relative growth of a stage's peak memory that counts
+        alpha: Significance level of the timing test
+        memory_slack_mb: Absolute memory growth always tolerated (allocator noise)
+
+    Returns:
+        One row per workload stage with the changes and a 'regression' flag
+    """
+    rows = []
+    for name, base_workload in baseline['workloads'].items():
+        workload = current['workloads'].get(name)
+        if 'stages' not in base_workload or not workload or 'stages' not in workload:
+            rows.append({'workload': name, 'stage': None, 'regression': False,
+                         'note': 'not measured in both runs'})
+            continue
+
+        for stage, base_stage in base_workload['stages'].items():
+            stage_now = workload['stages'].get(stage)
+            if stage_now is None:
+                rows.append({'workload': name, 'stage': stage, 'regression': False, 'note': 'stage missing'})
+                continue
+
+            base_median = base_stage['median_seconds']
+            median = stage_now['median_seconds']
+            change = (median - base_median) / base_median if base_median > 0 else 0.0
+            p_value = mann_whitney_greater(base_stage['seconds'], stage_now['seconds'])
+            slower = change > threshold and p_value < alpha
+
+            base_memory = base_stage['peak_increase_mb'] or 0.0
+            memory = stage_now['peak_increase_mb'] or 0.0
+            memory_change = (memory - base_memory) / base_memory if base_memory > 0 else 0.0
+            larger = memory - base_memory > max(memory_slack_mb, base_memory * memory_threshold)
+
+            rows.append({
+                'workload': name,
+                'stage': stage,
+                'baseline_seconds': base_median,
+                'seconds': median,
+                'time_change': round(change, 4),
+                'p_value': round(p_value, 4),
+                'baseline_memory_mb': base_memory,
+                'memory_mb': memory,
+                'memory_change': round(memory_change, 4),
+                'slower': slower,
+                'larger': larger,
+                'regression': slower or larger,
+            })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]]):
+    """
+    Print a comparison table.
+
+    Args:
+        rows: Rows returned by compare_results()
+    """
+    print(f"{'Workload':<16} {'Stage':<11} {'Time':>10} {'Change':>8} {'p':>7} {'Memory':>10} {'Change':>8}")
+    print('-' * 76)
+    for row in rows:
+        if row['stage'] is None or 'note' in row:
+            print(f"{row['workload']:<16} {row['stage'] or '-':<11} {row['note']}")
+            continue
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['workload']:<16} {row['stage']:<11} {row['seconds']:>9.3f}s {row['time_change']:>+8.1%} "
+              f"{row['p_value']:>7.3f} {row['memory_mb']:>7.1f} MB {row['memory_change']:>+8.1%}{flag}")
+
+
+def main():
+    """Main entry point for the benchmark command."""
+    parser = argparse.ArgumentParser(
+        description='Run scanner performance benchmarks and compare them with a baseline',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Record a baseline before upgrading
+  python benchmark.py run --output benchmark_baseline.json
+
+  # After the upgrade: measure again and fail on significant regressions
+  python benchmark.py compare benchmark_baseline.json
+
+  # Compare two stored runs
+  python benchmark.py compare benchmark_baseline.json --current benchmark_new.json
+        """
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Measure the workloads and write a results file')
+    run_parser.add_argument('-o', '--output', default='benchmark_baseline.json',
+                            help='Results file to write (default: benchmark_baseline.json)')
+    run_parser.add_argument('-r', '--repeats', type=int, default=DEFAULT_REPEATS,
+                            help=f'Timed runs per workload (default: {DEFAULT_REPEATS})')
+    run_parser.add_argument('--scale', type=int, action='append',
+                            help='Lines of a generated corpus; repeat for several sizes '
+                                 f'(default: {", ".join(str(scale) for scale in DEFAULT_SCALES)})')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare with a baseline; exit 1 on regressions')
+    compare_parser.add_argument('baseline', help='Baseline results file')
+    compare_parser.add_argument('--current', help='Results file to compare (default: measure now)')
+    compare_parser.add_argument('-o', '--output', help='Also write the new measurements to this file')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='Relative slowdown of a stage that counts as a regression (default: 0.1)')
+    compare_parser.add_argument('--memory-threshold', type=float, default=0.1,
+                                help='Relative growth of stage memory that counts as a regression (default: 0.1)')
+    compare_parser.add_argument('--alpha', type=float, default=0.05,
+                                help='Significance level for timing differences (default: 0.05)')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run_benchmarks(args.repeats, args.scale)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Benchmark results saved to: {args.output}")
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('version') != BASELINE_VERSION:
+        print(f"Error: Unsupported baseline version {baseline.get('version')}")
+        sys.exit(2)
+
+    if args.current:
+        with open(args.current, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        current = run_benchmarks(baseline['repeats'], baseline['scales'])
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(current, f, indent=2)
+
+    # With few repeats even complete separation of the timings is not significant
+    smallest_p = 1 / math.comb(baseline['repeats'] + current['repeats'], current['repeats'])
+    if smallest_p >= args.alpha:
+        print(f"Warning: {baseline['repeats']} and {current['repeats']} repeats cannot show a timing "
+              f"difference at alpha {args.alpha}; only memory is compared (use --repeats 4 or more)")
+
+    rows = compare_results(baseline, current, args.threshold, args.memory_threshold, args.alpha)
+    print()
+    print_comparison(rows)
+
+    regressions = [row for row in rows if row['regression']]
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed")
+        sys.exit(1)
+    print("\nNo significant regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Turkish-aware case folding for case-insensitive matching without re.IGNORECASE.
+
+re.IGNORECASE treats i, I, İ and ı as one letter, which is wrong for Turkish,
+where I pairs with ı and İ pairs with i. A line is folded once with the
+translation tables below and matched case-sensitively against folded words
+and patterns.
+
+Folding never changes the length of the text (İ is the only character whose
+lowercase form is longer, and both tables map it to a single 'i'), so the
+offset map back to the original text is the identity: a match at offset n in
+the folded text is at offset n in the original.
+"""
+from typing import Dict
+
+
+# Applied before str.lower(), which handles every other character
+TURKISH_FOLD: Dict[int, str] = str.maketrans({'I': 'ı', 'İ': 'i'})
+DEFAULT_FOLD: Dict[int, str] = str.maketrans({'İ': 'i'})
+
+
+def casefold(text: str, turkish: bool = True) -> str:
+    """
+    Fold text for case-insensitive matching.
+
+    Args:
+        text: Text to fold
+        turkish: Whether to use Turkish rules (I → ı, İ → i) or the default
+            rules used for English (I → i, İ → i)
+
+    Returns:
+        Folded text of the same length as text
+    """
+    if turkish:
+        return text.translate(TURKISH_FOLD).lower()
+    if text.isascii():
+        return text.lower()
+    return text.translate(DEFAULT_FOLD).lower()
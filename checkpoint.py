@@ -0,0 +1,233 @@
+"""
+Append-only checkpoints that let interrupted scans resume.
+
+A checkpoint is a JSON Lines file. The first line identifies the scan (source
+file, its size and modification time, scan options). Each finished page, line
+or file is appended as an entry, and a progress marker is appended at regular
+intervals after flushing the entries to disk. On resume, entries after the
+last progress marker are discarded, so a checkpoint is never half-applied.
+"""
+import os
+import json
+import time
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+from error_record import to_json
+
+
+CHECKPOINT_DIR = '.checkpoints'
+
+
+def checkpoint_path(output_dir: str, source: str) -> str:
+    """
+    Get the checkpoint file path for a scanned file or directory.
+
+    Args:
+        output_dir: Directory where reports are saved
+        source: Path of the scanned file or directory
+
+    Returns:
+        Path of the checkpoint file inside output_dir/.checkpoints
+    """
+    resolved = str(Path(source).resolve())
+    digest = hashlib.sha1(resolved.encode('utf-8')).hexdigest()[:10]
+    return str(Path(output_dir) / CHECKPOINT_DIR / f"{Path(source).name}_{digest}.jsonl")
+
+
+def file_fingerprint(file_path: str, **options) -> Dict[str, Any]:
+    """
+    Describe a source file so a checkpoint is only reused for the same file.
+
+    Args:
+        file_path: Path of the scanned file
+        **options: Scan options that change the results (e.g. enable_grammar)
+
+    Returns:
+        Dictionary with the resolved path, size, modification time and options
+    """
+    stat = os.stat(file_path)
+    fingerprint = {
+        'source': str(Path(file_path).resolve()),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns
+    }
+    fingerprint.update(options)
+    return fingerprint
+
+
+class ScanCheckpoint:
+    """Checkpoint file for one scan."""
+
+    def __init__(self, path: str, fingerprint: Dict[str, Any], interval: float = 30.0):
+        """
+        Initialize a checkpoint.
+
+        Args:
+            path: Path of the checkpoint file
+            fingerprint: Description of the scan; a stored checkpoint is only resumed if it matches
+            interval: Minimum seconds between progress markers (0 to commit after every entry)
+        """
+        self.path = path
+        # Compared with the fingerprint read back from the file, so kept in its JSON form
+        # (tuples become lists, other values such as dates in the config become strings)
+        self.fingerprint = json.loads(json.dumps(fingerprint, ensure_ascii=False, default=str))
+        self.interval = interval
+        self._file = None
+        self._valid_size = 0
+        self._last_commit = 0.0
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the stored checkpoint.
+
+        Returns:
+            Dictionary with 'scan_date', 'entries' and 'position', or None if
+            there is no usable checkpoint for this scan
+        """
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return None
+
+        with f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                return None
+            if header.get('fingerprint') != self.fingerprint:
+                print(f"Warning: Checkpoint '{self.path}' belongs to a different scan; starting over.")
+                return None
+
+            entries = []
+            pending = []
+            position = header['position']
+            valid_size = f.tell()
+
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break  # Partly written line from an interrupted write
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    break
+                if 'entry' in record:
+                    pending.append(record['entry'])
+                else:
+                    entries.extend(pending)
+                    pending = []
+                    position = record['position']
+                    valid_size = f.tell()
+
+        self._valid_size = valid_size
+        return {'scan_date': header['scan_date'], 'entries': entries, 'position': position}
+
+    def open(self, scan_date: str, position: int, resumed: bool = False):
+        """
+        Open the checkpoint for writing.
+
+        Args:
+            scan_date: Scan date stored in the report
+            position: First page, line or file index still to be scanned
+            resumed: Whether load() returned a checkpoint that is being continued
+        """
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        if resumed:
+            self._file = open(self.path, 'r+b')
+            # Drop entries written after the last progress marker
+            self._file.truncate(self._valid_size)
+            self._file.seek(self._valid_size)
+        else:
+            self._file = open(self.path, 'wb')
+            header = {'fingerprint': self.fingerprint, 'scan_date': scan_date, 'position': position}
+            self._write(header)
+            self._sync()
+
+        self._last_commit = time.monotonic()
+
+    def _write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=to_json).encode('utf-8') + b'\n')
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def add(self, entry: Dict[str, Any]):
+        """
+        Append a finished page, line or file entry.
+
+        Args:
+            entry: Entry to restore on resume
+        """
+        self._write({'entry': entry})
+
+    def commit(self, position: int):
+        """
+        Flush all entries to disk and record the scan position.
+
+        Args:
+            position: First page, line or file index still to be scanned
+        """
+        self._sync()
+        self._write({'position': position})
+        self._sync()
+        self._last_commit = time.monotonic()
+
+    def maybe_commit(self, position: int):
+        """
+        Commit if the checkpoint interval has passed since the last commit.
+
+        Args:
+            position: First page, line or file index still to be scanned
+        """
+        if time.monotonic() - self._last_commit >= self.interval:
+            self.commit(position)
+
+    def close(self):
+        """Close the checkpoint file, keeping it for a later resume."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Close and delete the checkpoint after the scan finished, and its directory if now empty."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        try:
+            os.rmdir(Path(self.path).parent)
+        except OSError:
+            pass  # Other scans still have checkpoints there
+
+
+def open_checkpoint(path: str, fingerprint: Dict[str, Any], resume: bool = False,
+                    interval: float = 30.0, start: int = 1) -> Tuple[ScanCheckpoint, str, List[Dict[str, Any]], int]:
+    """
+    Create a checkpoint and, if requested, load its stored state.
+
+    Args:
+        path: Path of the checkpoint file
+        fingerprint: Description of the scan
+        resume: Whether to continue from a stored checkpoint
+        interval: Minimum seconds between progress markers
+        start: Position of a fresh scan
+
+    Returns:
+        Tuple of (checkpoint, scan_date, entries, position)
+    """
+    checkpoint = ScanCheckpoint(path, fingerprint, interval)
+    state = checkpoint.load() if resume else None
+
+    if state is None:
+        scan_date = datetime.now().isoformat()
+        checkpoint.open(scan_date, start)
+        return checkpoint, scan_date, [], start
+
+    print(f"Resuming from checkpoint: {len(state['entries'])} entries restored, continuing at {state['position']}")
+    checkpoint.open(state['scan_date'], state['position'], resumed=True)
+    return checkpoint, state['scan_date'], state['entries'], state['position']
+
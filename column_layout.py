@@ -0,0 +1,163 @@
+"""
+Reading-order text for multi-column pages, rebuilt from PDF characters.
+
+Plain text extraction reads each physical line across the whole page, which
+interleaves the columns of two-column exams and books. Here the characters of
+a page are read once, the column gutters are found as empty vertical strips
+in a histogram of character coverage along the x axis, and the text is
+rebuilt column by column. Lines that cross a gutter (titles, headers, wide
+formulas) are kept whole and separate the column blocks above and below them.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+def find_gutters(chars: Sequence[Dict[str, Any]], page_width: float,
+                 min_gutter_width: float = 10.0, max_coverage: float = 0.1,
+                 min_column_share: float = 0.2) -> List[Tuple[float, float]]:
+    """
+    Find column gutters from the horizontal coverage of characters.
+
+    Args:
+        chars: Non-whitespace characters with 'x0' and 'x1' coordinates
+        page_width: Width of the page in points
+        min_gutter_width: Narrowest strip (in points) accepted as a gutter
+        max_coverage: Highest coverage, as a share of the median coverage of
+            the text area, that still counts as empty (lines crossing the
+            gutter keep it from being completely empty)
+        min_column_share: Narrowest column, as a share of the text width
+
+    Returns:
+        List of (x0, x1) gutter intervals from left to right
+    """
+    bins = int(page_width) + 2
+    # Difference array: one pass over the characters, one prefix sum over the page width
+    delta = [0] * (bins + 1)
+    left = bins
+    right = 0
+    for char in chars:
+        # Half-open bins, so touching characters do not both cover their shared edge
+        x0 = min(max(int(char['x0']), 0), bins - 1)
+        x1 = min(max(int(char['x1']), x0 + 1), bins)
+        delta[x0] += 1
+        delta[x1] -= 1
+        left = min(left, x0)
+        right = max(right, x1 - 1)
+    if left >= right:
+        return []
+
+    coverage = []
+    running = 0
+    for x in range(bins):
+        running += delta[x]
+        coverage.append(running)
+
+    occupied = sorted(value for value in coverage[left:right + 1] if value > 0)
+    if not occupied:
+        return []
+    threshold = occupied[len(occupied) // 2] * max_coverage
+
+    # Gutters are low-coverage runs strictly inside the text area; columns
+    # narrower than min_column_share of it are indents or tab stops, not columns
+    min_column_width = (right - left) * min_column_share
+    gutters = []
+    column_start = left
+    start = None
+    for x in range(left, right + 1):
+        if coverage[x] <= threshold:
+            if start is None:
+                start = x
+        elif start is not None:
+            if (x - start >= min_gutter_width and start - column_start >= min_column_width
+                    and right - x >= min_column_width):
+                gutters.append((float(start), float(x)))
+                column_start = x
+            start = None
+    return gutters
+
+
+def _group_lines(chars: Sequence[Dict[str, Any]], y_tolerance: float) -> List[List[Dict[str, Any]]]:
+    """Group characters into physical lines by their top coordinate."""
+    lines: List[List[Dict[str, Any]]] = []
+    line_top: Optional[float] = None
+    for char in sorted(chars, key=lambda c: (c['top'], c['x0'])):
+        if line_top is None or char['top'] - line_top > y_tolerance:
+            lines.append([])
+            line_top = char['top']
+        lines[-1].append(char)
+    for line in lines:
+        line.sort(key=lambda c: c['x0'])
+    return lines
+
+
+def _line_text(chars: List[Dict[str, Any]], x_tolerance: float) -> str:
+    """Join the characters of one line, inserting single spaces at word breaks."""
+    parts = []
+    previous = None
+    spaced = False
+    for char in chars:
+        if not char['text'].strip():
+            spaced = True
+            continue
+        if previous is not None and (spaced or char['x0'] - previous['x1'] > x_tolerance):
+            parts.append(' ')
+        parts.append(char['text'])
+        previous = char
+        spaced = False
+    return ''.join(parts)
+
+
+def columns_text(chars: Sequence[Dict[str, Any]], page_width: float, min_gutter_width: float = 10.0,
+                 x_tolerance: float = 3.0, y_tolerance: float = 3.0) -> str:
+    """
+    Rebuild the text of a page in column reading order.
+
+    Args:
+        chars: Characters of the page as given by pdfplumber's page.chars
+        page_width: Width of the page in points
+        min_gutter_width: Narrowest strip (in points) accepted as a column gutter
+        x_tolerance: Largest gap between characters of the same word
+        y_tolerance: Largest difference in top coordinate within one line
+
+    Returns:
+        Page text; single-column pages come out in plain line order
+    """
+    # Whitespace characters only mark word breaks; they do not cover the page
+    visible = [char for char in chars if char['text'].strip()]
+
+    lines = _group_lines(chars, y_tolerance)
+    gutters = find_gutters(visible, page_width, min_gutter_width)
+    if not gutters:
+        return '\n'.join(_line_text(line, x_tolerance) for line in lines)
+
+    # Column boundaries at the gutter centers
+    boundaries = [(x0 + x1) / 2 for x0, x1 in gutters]
+
+    output: List[str] = []
+    block: List[List[str]] = [[] for _ in range(len(boundaries) + 1)]
+
+    def flush():
+        for column in block:
+            output.extend(column)
+            column.clear()
+
+    for line in lines:
+        crosses = any(
+            char['x0'] < x1 and char['x1'] > x0 and char['text'].strip()
+            for char in line for x0, x1 in gutters
+        )
+        if crosses:
+            # A spanning line ends the current column block
+            flush()
+            output.append(_line_text(line, x_tolerance))
+            continue
+
+        pieces: Dict[int, List[Dict[str, Any]]] = {}
+        for char in line:
+            center = (char['x0'] + char['x1']) / 2
+            column = sum(1 for boundary in boundaries if center > boundary)
+            pieces.setdefault(column, []).append(char)
+        for column, piece in pieces.items():
+            block[column].append(_line_text(piece, x_tolerance))
+    flush()
+
+    return '\n'.join(output)
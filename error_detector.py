@@ -2,13 +2,30 @@
 Error detection module for finding grammar, punctuation, and mathematical errors in text.
 """
 import re
-from typing import List, Dict, Any, Optional
+import copy
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, FrozenSet, Optional, Sequence
+from casefold import casefold
+from error_record import ErrorRecord
+from error_store import CATEGORIES
+from line_classifier import ENGLISH, LINE_CLASSES, ROUTES, TURKISH, LineClassifier
+from prefilter import DIGITS, OPERATORS, WHITESPACE, char_signature, requires, ignorecase_requires, may_match
+from tokenizer import NUMBER, WORD, Token, tokenize
+
+# Version of the checking rules; bump it whenever a change to the checkers changes the
+# errors found, so page results from reports of earlier versions are not reused
+RULESET_VERSION = 2
+
+# Letters the extra-content rule accepts before the numbers
+SPACING_LETTERS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyzÇĞİÖŞÜçğıöşü')
 
 
 class ErrorDetector:
     """Detect various types of errors in text."""
     
-    def __init__(self, enable_grammar_check: bool = True, enable_turkish: bool = True, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, enable_grammar_check: bool = True, enable_turkish: bool = True, config: Optional[Dict[str, Any]] = None,
+                 metrics: Optional[Any] = None):
         """
         Initialize the error detector with language tools.
         
@@ -16,6 +33,7 @@ class ErrorDetector:
             enable_grammar_check: Whether to enable grammar checking (requires internet on first run)
             enable_turkish: Whether to enable Turkish-specific checks
             config: Optional configuration dictionary
+            metrics: Optional ScanMetrics that records grammar backend latency and cache hit rates
         """
         self.grammar_enabled = False
         self.language_tool = None
@@ -59,13 +77,47 @@ class ErrorDetector:
             'NaN',
             'error',
         ]
+        
+        # Characters each rule needs before it is worth running
+        self.prefilters = {
+            'parentheses': requires('()'),
+            'brackets': requires('[]'),
+            'braces': requires('{}'),
+            'double_operator': requires(OPERATORS),
+            'wrong_union': requires('∪', '=', '∅{}'),
+            'split_equation': requires('=', '(', DIGITS),
+            'incomplete_equation': requires('=', '(', '.', DIGITS),
+            'extra_content': requires(DIGITS, WHITESPACE),
+        }
+        self.keyword_prefilters = {
+            keyword: ignorecase_requires(keyword)
+            for keyword in self.math_error_keywords
+        }
+        
+        # Bounded LRU of results and line classes for repeated lines (headers, footers, answer choices)
+        self.line_cache_size = self.config.get('performance', {}).get('line_cache_size', 10000)
+        self.line_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # Route lines to the checkers relevant to their language and content
+        routing_config = self.config.get('language_routing', {})
+        self.classifier = LineClassifier() if routing_config.get('enabled', True) else None
+        self.class_counts = {line_class: 0 for line_class in LINE_CLASSES}
+        
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.watch(self)
     
-    def check_grammar_punctuation(self, text: str) -> List[Dict[str, Any]]:
+    def check_grammar_punctuation(self, text: str, signature: Optional[FrozenSet[str]] = None,
+                                  tokens: Optional[List[Token]] = None) -> List[ErrorRecord]:
         """
         Check for grammar and punctuation errors.
         
         Args:
             text: Text to check
+            signature: Precomputed character signature of the text
+            tokens: Precomputed tokens of the text
             
         Returns:
             List of detected errors with details
@@ -78,35 +130,40 @@ class ErrorDetector:
         if not text or not text.strip():
             return errors
         
+        started = time.perf_counter() if self.metrics is not None else 0.0
         try:
             if self.language_tool:
                 # Use LanguageTool
                 matches = self.language_tool.check(text)
                 
                 for match in matches:
-                    errors.append({
-                        'type': 'grammar/punctuation',
-                        'message': match.message,
-                        'context': match.context,
-                        'offset': match.offset,
-                        'length': match.errorLength,
-                        'suggestions': match.replacements[:3],  # Top 3 suggestions
-                        'rule': match.ruleId
-                    })
+                    errors.append(ErrorRecord(
+                        type='grammar/punctuation',
+                        message=match.message,
+                        fixed_context=match.context,
+                        offset=match.offset,
+                        length=match.errorLength,
+                        suggestions=match.replacements[:3],  # Top 3 suggestions
+                        rule=match.ruleId
+                    ))
             elif self.simple_grammar:
                 # Use simple grammar checker
-                errors = self.simple_grammar.check(text)
+                errors = self.simple_grammar.check(text, signature, tokens)
         except Exception as e:
             print(f"Error during grammar check: {e}")
         
+        if self.metrics is not None:
+            self.metrics.observe_grammar(time.perf_counter() - started)
+        
         return errors
     
-    def check_mathematical_errors(self, text: str) -> List[Dict[str, Any]]:
+    def check_mathematical_errors(self, text: str, signature: Optional[FrozenSet[str]] = None) -> List[ErrorRecord]:
         """
         Check for mathematical notation errors and inconsistencies.
         
         Args:
             text: Text to check
+            signature: Precomputed character signature of the text
             
         Returns:
             List of detected mathematical errors
@@ -116,119 +173,153 @@ class ErrorDetector:
         if not text:
             return errors
         
+        if signature is None:
+            signature = char_signature(text)
+        
         # Check for unmatched parentheses
-        paren_count = text.count('(') - text.count(')')
+        paren_count = text.count('(') - text.count(')') if may_match(signature, self.prefilters['parentheses']) else 0
         if paren_count != 0:
-            errors.append({
-                'type': 'mathematical',
-                'message': f'Unmatched parentheses: {abs(paren_count)} {"opening" if paren_count > 0 else "closing"} parenthesis/es',
-                'context': 'Full text',
-                'severity': 'high'
-            })
+            errors.append(ErrorRecord(
+                type='mathematical',
+                message=f'Unmatched parentheses: {abs(paren_count)} {"opening" if paren_count > 0 else "closing"} parenthesis/es',
+                fixed_context='Full text',
+                severity='high'
+            ))
         
         # Check for unmatched brackets
-        bracket_count = text.count('[') - text.count(']')
+        bracket_count = text.count('[') - text.count(']') if may_match(signature, self.prefilters['brackets']) else 0
         if bracket_count != 0:
-            errors.append({
-                'type': 'mathematical',
-                'message': f'Unmatched brackets: {abs(bracket_count)} {"opening" if bracket_count > 0 else "closing"} bracket(s)',
-                'context': 'Full text',
-                'severity': 'high'
-            })
+            errors.append(ErrorRecord(
+                type='mathematical',
+                message=f'Unmatched brackets: {abs(bracket_count)} {"opening" if bracket_count > 0 else "closing"} bracket(s)',
+                fixed_context='Full text',
+                severity='high'
+            ))
         
         # Check for unmatched braces
-        brace_count = text.count('{') - text.count('}')
+        brace_count = text.count('{') - text.count('}') if may_match(signature, self.prefilters['braces']) else 0
         if brace_count != 0:
-            errors.append({
-                'type': 'mathematical',
-                'message': f'Unmatched braces: {abs(brace_count)} {"opening" if brace_count > 0 else "closing"} brace(s)',
-                'context': 'Full text',
-                'severity': 'high'
-            })
-        
-        # Check for common mathematical error keywords
-        text_lower = text.lower()
+            errors.append(ErrorRecord(
+                type='mathematical',
+                message=f'Unmatched braces: {abs(brace_count)} {"opening" if brace_count > 0 else "closing"} brace(s)',
+                fixed_context='Full text',
+                severity='high'
+            ))
+        
+        # Check for common mathematical error keywords in the case-folded text,
+        # whose offsets are the offsets in the original text
+        folded = None
         for keyword in self.math_error_keywords:
-            if keyword in text_lower:
+            if not may_match(signature, self.keyword_prefilters[keyword]):
+                continue
+            if folded is None:
+                folded = casefold(text, turkish=False)
+            idx = folded.find(keyword)
+            if idx >= 0:
                 # Find the context around the keyword
-                idx = text_lower.index(keyword)
                 start = max(0, idx - 30)
                 end = min(len(text), idx + len(keyword) + 30)
-                context = text[start:end]
                 
-                errors.append({
-                    'type': 'mathematical',
-                    'message': f'Potential mathematical error: "{keyword}" found',
-                    'context': f'...{context}...',
-                    'severity': 'medium'
-                })
+                errors.append(ErrorRecord(
+                    type='mathematical',
+                    message=f'Potential mathematical error: "{keyword}" found',
+                    source=text,
+                    context_start=start,
+                    context_end=end,
+                    severity='medium'
+                ))
         
         # Check for double operators (e.g., ++, --, etc.)
-        double_ops = re.finditer(r'[\+\-\*/]{2,}', text)
+        if may_match(signature, self.prefilters['double_operator']):
+            double_ops = re.finditer(r'[\+\-\*/]{2,}', text)
+        else:
+            double_ops = []
         for match in double_ops:
             start = max(0, match.start() - 20)
             end = min(len(text), match.end() + 20)
-            context = text[start:end]
             
-            errors.append({
-                'type': 'mathematical',
-                'message': f'Double operator detected: "{match.group()}"',
-                'context': f'...{context}...',
-                'severity': 'medium'
-            })
+            errors.append(ErrorRecord(
+                type='mathematical',
+                message=f'Double operator detected: "{match.group()}"',
+                source=text,
+                context_start=start,
+                context_end=end,
+                severity='medium'
+            ))
         
         # Check for wrong union/intersection symbols (A∪B = ∅ should be A∩B = ∅)
-        wrong_union = re.finditer(r'([A-Z])∪([A-Z])\s*=\s*[∅{}]', text)
+        if may_match(signature, self.prefilters['wrong_union']):
+            wrong_union = re.finditer(r'([A-Z])∪([A-Z])\s*=\s*[∅{}]', text)
+        else:
+            wrong_union = []
         for match in wrong_union:
             start = max(0, match.start() - 20)
             end = min(len(text), match.end() + 20)
-            context = text[start:end]
             
-            errors.append({
-                'type': 'mathematical',
-                'message': f'Wrong symbol: "{match.group()}" - Union (∪) with empty set suggests intersection (∩) should be used',
-                'context': f'...{context}...',
-                'severity': 'high',
-                'suggestions': [match.group().replace('∪', '∩')]
-            })
+            errors.append(ErrorRecord(
+                type='mathematical',
+                message=f'Wrong symbol: "{match.group()}" - Union (∪) with empty set suggests intersection (∩) should be used',
+                source=text,
+                context_start=start,
+                context_end=end,
+                severity='high',
+                suggestions=[match.group().replace('∪', '∩')]
+            ))
         
         # Check for split equation numbers (equation number split across lines)
-        split_equation = re.finditer(r'=\s*\(\d+\.?\d*$', text, re.MULTILINE)
+        if may_match(signature, self.prefilters['split_equation']):
+            split_equation = re.finditer(r'=\s*\(\d+\.?\d*$', text, re.MULTILINE)
+        else:
+            split_equation = []
         for match in split_equation:
             start = max(0, match.start() - 30)
             end = min(len(text), match.end())
-            context = text[start:end]
             
-            errors.append({
-                'type': 'mathematical',
-                'message': 'Equation number appears to be split across lines',
-                'context': f'...{context}',
-                'severity': 'medium'
-            })
+            errors.append(ErrorRecord(
+                type='mathematical',
+                message='Equation number appears to be split across lines',
+                source=text,
+                context_start=start,
+                context_end=end,
+                context_suffix='',
+                severity='medium'
+            ))
         
         # Check for inconsistent equation numbering format
         # Look for patterns like "B = (1.8" where equation number is incomplete
-        incomplete_eq = re.finditer(r'[A-Z]\s*=\s*\(\d+\.\d*$', text, re.MULTILINE)
+        if may_match(signature, self.prefilters['incomplete_equation']):
+            incomplete_eq = re.finditer(r'[A-Z]\s*=\s*\(\d+\.\d*$', text, re.MULTILINE)
+        else:
+            incomplete_eq = []
         for match in incomplete_eq:
             start = max(0, match.start() - 20)
             end = min(len(text), match.end())
-            context = text[start:end]
             
-            errors.append({
-                'type': 'mathematical',
-                'message': 'Incomplete equation or split equation number',
-                'context': f'...{context}',
-                'severity': 'high'
-            })
+            errors.append(ErrorRecord(
+                type='mathematical',
+                message='Incomplete equation or split equation number',
+                source=text,
+                context_start=start,
+                context_end=end,
+                context_suffix='',
+                severity='high'
+            ))
         
         return errors
     
-    def check_turkish_errors(self, text: str) -> List[Dict[str, Any]]:
+    def check_turkish_errors(self, text: str, signature: Optional[FrozenSet[str]] = None,
+                             tokens: Optional[List[Token]] = None,
+                             language_specific: bool = True) -> List[ErrorRecord]:
         """
         Check for Turkish-specific errors.
         
         Args:
             text: Text to check
+            signature: Precomputed character signature of the text
+            tokens: Precomputed tokens of the text
+            language_specific: Whether to run the checks that only apply to
+                Turkish prose (lexicon lookups, terminology and mixed-language
+                rules); broken references and punctuation always run
             
         Returns:
             List of Turkish-specific errors
@@ -237,18 +328,21 @@ class ErrorDetector:
         
         if self.turkish_checker:
             try:
-                errors = self.turkish_checker.check_all(text)
+                errors = self.turkish_checker.check_all(text, signature, tokens, language_specific)
             except Exception as e:
                 print(f"Error during Turkish grammar check: {e}")
         
         return errors
     
-    def check_spacing_errors(self, text: str) -> List[Dict[str, Any]]:
+    def check_spacing_errors(self, text: str, signature: Optional[FrozenSet[str]] = None,
+                             tokens: Optional[List[Token]] = None) -> List[ErrorRecord]:
         """
         Check for inconsistent spacing and extra content.
         
         Args:
             text: Text to check
+            signature: Precomputed character signature of the text
+            tokens: Precomputed tokens of the text
             
         Returns:
             List of spacing errors
@@ -258,42 +352,205 @@ class ErrorDetector:
         if not text:
             return errors
         
-        # Check for extra space and number between words (e.g., "Problemler 2 252")
-        extra_content = re.finditer(r'([A-Za-zÇĞİÖŞÜçğıöşü]+)\s+(\d+)\s+(\d+)', text)
-        for match in extra_content:
-            start = max(0, match.start() - 20)
-            end = min(len(text), match.end() + 20)
-            context = text[start:end]
+        if signature is None:
+            signature = char_signature(text)
+        if not may_match(signature, self.prefilters['extra_content']):
+            return errors
+        
+        if tokens is None:
+            tokens = tokenize(text)
+        
+        # Check for extra space and number between words (e.g., "Problemler 2 252"):
+        # letters, whitespace, a number, whitespace and a token starting with digits
+        i = 0
+        while i + 2 < len(tokens):
+            word, first, second = tokens[i], tokens[i + 1], tokens[i + 2]
+            letters = 0
+            if word.kind == WORD and first.kind == NUMBER and second.text[0].isdecimal():
+                if first.start > word.end and second.start > first.end:
+                    while letters < len(word.text) and word.text[-1 - letters] in SPACING_LETTERS:
+                        letters += 1
+            if not letters:
+                i += 1
+                continue
+            
+            match_start = word.end - letters
+            digits = 1
+            while digits < len(second.text) and second.text[digits].isdecimal():
+                digits += 1
+            match_end = second.start + digits
+            
+            start = max(0, match_start - 20)
+            end = min(len(text), match_end + 20)
             
-            errors.append({
-                'type': 'spacing',
-                'message': f'Extra space and number detected: "{match.group()}"',
-                'context': f'...{context}...',
-                'offset': match.start(),
-                'severity': 'medium'
-            })
+            errors.append(ErrorRecord(
+                type='spacing',
+                message=f'Extra space and number detected: "{text[match_start:match_end]}"',
+                source=text,
+                context_start=start,
+                context_end=end,
+                offset=match_start,
+                severity='medium'
+            ))
+            
+            # The rest of the last token can start the next match
+            i += 2
         
         return errors
     
-    def check_all_errors(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
+    def check_all_errors(self, text: str, categories: Optional[Sequence[str]] = None,
+                         count_classes: bool = True) -> Dict[str, List[ErrorRecord]]:
         """
         Check for all types of errors.
         
         Args:
             text: Text to check
+            categories: Error categories to check (default: all); results of
+                partial checks are not cached
+            count_classes: Whether to count the text's lines in the line class statistics
+            
+        Returns:
+            Dictionary containing all detected errors by type (empty for unchecked categories)
+        """
+        line_classes = []
+        if categories is not None:
+            errors = self._check_categories(text, frozenset(categories), line_classes)
+            if count_classes:
+                self._count_classes(line_classes)
+            return errors
+        
+        if self.line_cache_size > 0:
+            cached = self.line_cache.get(text)
+            if cached is not None:
+                self.cache_hits += 1
+                self.line_cache.move_to_end(text)
+                errors, line_classes = cached
+                # Repeated lines count in the line class statistics like any other
+                if count_classes:
+                    self._count_classes(line_classes)
+                # Copy so per-line reports never alias each other
+                return copy.deepcopy(errors)
+            self.cache_misses += 1
+        
+        errors = self._check_categories(text, frozenset(CATEGORIES), line_classes)
+        if count_classes:
+            self._count_classes(line_classes)
+        
+        if self.line_cache_size > 0:
+            self.line_cache[text] = (copy.deepcopy(errors), tuple(line_classes))
+            if len(self.line_cache) > self.line_cache_size:
+                self.line_cache.popitem(last=False)
+        
+        return errors
+    
+    def _count_classes(self, line_classes: Sequence[str]):
+        """Add the classes of checked lines to the line class statistics."""
+        for line_class in line_classes:
+            self.class_counts[line_class] += 1
+    
+    def _check_categories(self, text: str, categories: FrozenSet[str],
+                          line_classes: Optional[List[str]] = None) -> Dict[str, List[ErrorRecord]]:
+        """
+        Run the checkers of the given error categories.
+        
+        Args:
+            text: Text to check
+            categories: Error categories to check
+            line_classes: List to append the classes of the text's lines to (with routing)
+            
+        Returns:
+            Dictionary containing all detected errors by type
+        """
+        # Character signature shared by every rule prefilter and one token stream shared by all checkers
+        signature = char_signature(text)
+        tokens = tokenize(text)
+        
+        if self.classifier is not None:
+            return self._check_routed(text, signature, tokens, categories, line_classes)
+        
+        return {
+            'grammar_punctuation': self.check_grammar_punctuation(text, signature, tokens) if 'grammar_punctuation' in categories else [],
+            'mathematical': self.check_mathematical_errors(text, signature) if 'mathematical' in categories else [],
+            'turkish': self.check_turkish_errors(text, signature, tokens) if 'turkish' in categories else [],
+            'spacing': self.check_spacing_errors(text, signature, tokens) if 'spacing' in categories else []
+        }
+    
+    def _check_routed(self, text: str, signature: FrozenSet[str], tokens: List[Token],
+                      categories: FrozenSet[str], line_classes: Optional[List[str]] = None) -> Dict[str, List[ErrorRecord]]:
+        """
+        Run only the checkers relevant to the classes of the text's lines.
+        
+        Grammar checking runs on English lines only; the other checkers run on
+        the whole text if any of its lines is routed to them. Turkish checks
+        that only apply to Turkish prose run if the text has a Turkish line.
+        
+        Args:
+            text: Text to check
+            signature: Character signature of the text
+            tokens: Tokens of the text
+            categories: Error categories to check
+            line_classes: List to append the classes of the text's lines to
             
         Returns:
             Dictionary containing all detected errors by type
         """
+        check_grammar = 'grammar_punctuation' in categories
+        if '\n' not in text:
+            line_class = self.classifier.classify(text, tokens)
+            if line_classes is not None:
+                line_classes.append(line_class)
+            routed = categories.intersection(ROUTES[line_class])
+            has_turkish = line_class == TURKISH
+            grammar_errors = []
+            if check_grammar and line_class == ENGLISH:
+                grammar_errors = self.check_grammar_punctuation(text, signature, tokens)
+        else:
+            routed = set()
+            has_turkish = False
+            grammar_errors = []
+            for line_start, line, line_class in self.classifier.classify_lines(text, tokens):
+                if line_classes is not None:
+                    line_classes.append(line_class)
+                routed.update(categories.intersection(ROUTES[line_class]))
+                has_turkish = has_turkish or line_class == TURKISH
+                if not check_grammar or line_class != ENGLISH:
+                    continue
+                # Check English lines separately and shift offsets into the full text
+                for error in self.check_grammar_punctuation(line):
+                    if error.offset is not None:
+                        error.offset += line_start
+                    if error.source is not None:
+                        error.source = text
+                        error.context_start += line_start
+                        error.context_end += line_start
+                    grammar_errors.append(error)
+        
+        return {
+            'grammar_punctuation': grammar_errors,
+            'mathematical': self.check_mathematical_errors(text, signature) if 'mathematical' in routed else [],
+            'turkish': self.check_turkish_errors(text, signature, tokens, has_turkish) if 'turkish' in routed else [],
+            'spacing': self.check_spacing_errors(text, signature, tokens) if 'spacing' in routed else []
+        }
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics for the repeated-line cache.
+        
+        Returns:
+            Dictionary with hits, misses, hit rate and current size
+        """
+        lookups = self.cache_hits + self.cache_misses
         return {
-            'grammar_punctuation': self.check_grammar_punctuation(text),
-            'mathematical': self.check_mathematical_errors(text),
-            'turkish': self.check_turkish_errors(text),
-            'spacing': self.check_spacing_errors(text)
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': round(self.cache_hits / lookups, 4) if lookups else 0.0,
+            'size': len(self.line_cache),
+            'max_size': self.line_cache_size
         }
     
     def close(self):
         """Clean up resources."""
+        self.line_cache.clear()
         try:
             if self.language_tool:
                 self.language_tool.close()
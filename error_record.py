@@ -0,0 +1,128 @@
+"""
+Compact error record with lazily built context strings.
+"""
+from typing import List, Dict, Any, Optional
+
+
+class ErrorRecord:
+    """
+    A single detected error.
+
+    Records keep a reference to the checked text and the bounds of the
+    context window instead of a sliced context string. The context is only
+    built when a report writer asks for it. Records also behave like the
+    read-only error dicts used throughout the reports.
+    """
+
+    __slots__ = (
+        'type', 'message', 'offset', 'length', 'suggestions', 'severity', 'rule',
+        'line_number', 'source', 'context_start', 'context_end',
+        'context_prefix', 'context_suffix', 'fixed_context',
+    )
+
+    # Keys of the dict view, in output order
+    _VIEW_KEYS = ('type', 'message', 'context', 'offset', 'length', 'suggestions', 'severity', 'rule')
+
+    def __init__(self, type: str, message: str, source: str = '', context_start: int = 0,
+                 context_end: int = 0, offset: Optional[int] = None, length: Optional[int] = None,
+                 suggestions: Optional[List[str]] = None, severity: Optional[str] = None,
+                 rule: Optional[str] = None, context_prefix: str = '...', context_suffix: str = '...',
+                 fixed_context: Optional[str] = None, line_number: Optional[int] = None):
+        """
+        Initialize an error record.
+
+        Args:
+            type: Error type (e.g. 'mathematical', 'turkish_spelling')
+            message: Human-readable error message
+            source: Text the error was found in
+            context_start: Start of the context window in source
+            context_end: End of the context window in source
+            offset: Offset of the error in source
+            length: Length of the erroneous text
+            suggestions: Suggested corrections
+            severity: Severity level ('high', 'medium', 'low')
+            rule: Rule identifier
+            context_prefix: Text placed before the context window
+            context_suffix: Text placed after the context window
+            fixed_context: Literal context used instead of a source slice
+            line_number: Line number of the error, if known
+        """
+        self.type = type
+        self.message = message
+        self.source = source
+        self.context_start = context_start
+        self.context_end = context_end
+        self.offset = offset
+        self.length = length
+        self.suggestions = suggestions
+        self.severity = severity
+        self.rule = rule
+        self.context_prefix = context_prefix
+        self.context_suffix = context_suffix
+        self.fixed_context = fixed_context
+        self.line_number = line_number
+
+    @property
+    def context(self) -> str:
+        """Context string around the error, built on demand."""
+        if self.fixed_context is not None:
+            return self.fixed_context
+        return f'{self.context_prefix}{self.source[self.context_start:self.context_end]}{self.context_suffix}'
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the record to the error dict format used in reports.
+
+        Returns:
+            Dictionary with the populated error fields
+        """
+        return {key: self[key] for key in self.keys()}
+
+    def keys(self) -> List[str]:
+        """Keys present in the dict view."""
+        return [key for key in self._VIEW_KEYS if key == 'context' or getattr(self, key) is not None]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style lookup with a default."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._VIEW_KEYS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys()
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (ErrorRecord, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def items(self) -> List[Any]:
+        """Key/value pairs of the dict view."""
+        return [(key, self[key]) for key in self.keys()]
+
+    def __repr__(self) -> str:
+        return f'ErrorRecord({self.to_dict()!r})'
+
+
+def to_json(obj: Any) -> Any:
+    """
+    JSON encoder hook that converts error records to dicts.
+
+    Args:
+        obj: Object the json module could not serialize
+
+    Returns:
+        JSON-serializable representation
+    """
+    if isinstance(obj, ErrorRecord):
+        return obj.to_dict()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
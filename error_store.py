@@ -0,0 +1,215 @@
+"""
+Columnar error store backed by SQLite for fast aggregation of scan results.
+"""
+import sqlite3
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+# Error categories reported by ErrorDetector.check_all_errors
+CATEGORIES = ['grammar_punctuation', 'mathematical', 'turkish', 'spacing']
+
+COLUMNS = ['file', 'page', 'line', 'category', 'rule', 'severity', 'offset', 'length']
+
+
+class ErrorStore:
+    """Store detected errors column-wise and compute summaries with SQL queries."""
+
+    def __init__(self, db_path: str = ':memory:'):
+        """
+        Initialize the error store.
+
+        Args:
+            db_path: SQLite database path (in-memory by default)
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS errors ('
+            'file TEXT, page INTEGER, line INTEGER, category TEXT, '
+            'rule TEXT, severity TEXT, offset INTEGER, length INTEGER)'
+        )
+
+    def add_errors(self, errors: Dict[str, List[Any]], line: Optional[int] = None,
+                   page: Optional[int] = None, file: Optional[str] = None):
+        """
+        Add the errors of one line or page.
+
+        Args:
+            errors: Dictionary of errors by category, as returned by check_all_errors
+            line: Line number (1-indexed), if known
+            page: Page number (1-indexed), if known
+            file: Source file path, if known
+        """
+        rows = []
+        for category, category_errors in errors.items():
+            for error in category_errors:
+                rows.append((
+                    file, page, line, category,
+                    error.get('rule') or error.get('type'),
+                    error.get('severity'),
+                    error.get('offset'),
+                    error.get('length'),
+                ))
+        if rows:
+            self.conn.executemany('INSERT INTO errors VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def add_results(self, results: Dict[str, Any]):
+        """
+        Add all errors from a text or PDF scan results dictionary.
+
+        Args:
+            results: Results from TextAnalyzer, scan_text_file or scan_pdf
+        """
+        file = results.get('file_path') or results.get('file') or results.get('pdf_file')
+        for line_data in results.get('lines_with_errors', []):
+            self.add_errors(line_data['errors'], line=line_data['line_number'], file=file)
+        for page in results.get('pages', []):
+            self.add_errors(page['errors'], page=page['page_number'], file=file)
+
+    @classmethod
+    def from_results(cls, results: Dict[str, Any], db_path: str = ':memory:') -> 'ErrorStore':
+        """
+        Build a store from a scan results dictionary.
+
+        Args:
+            results: Results from TextAnalyzer, scan_text_file or scan_pdf
+            db_path: SQLite database path (in-memory by default)
+
+        Returns:
+            Populated ErrorStore
+        """
+        store = cls(db_path)
+        store.add_results(results)
+        return store
+
+    def count(self) -> int:
+        """
+        Get the total number of stored errors.
+
+        Returns:
+            Number of errors
+        """
+        return self.conn.execute('SELECT COUNT(*) FROM errors').fetchone()[0]
+
+    def group_count(self, column: str) -> Dict[Any, int]:
+        """
+        Count errors grouped by a column.
+
+        Args:
+            column: Column name to group by
+
+        Returns:
+            Dictionary mapping column values to error counts
+        """
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        rows = self.conn.execute(
+            f'SELECT {column}, COUNT(*) FROM errors GROUP BY {column} ORDER BY {column}'
+        )
+        return dict(rows.fetchall())
+
+    def error_summary(self) -> Dict[str, int]:
+        """
+        Count errors per category.
+
+        Returns:
+            Dictionary with a count for every category (zero if absent)
+        """
+        summary = {category: 0 for category in CATEGORIES}
+        summary.update(self.group_count('category'))
+        return summary
+
+    def severity_summary(self) -> Dict[str, int]:
+        """
+        Count errors per severity level.
+
+        Returns:
+            Dictionary mapping severity to count ('unspecified' for errors without one)
+        """
+        rows = self.conn.execute(
+            "SELECT COALESCE(severity, 'unspecified'), COUNT(*) FROM errors GROUP BY 1 ORDER BY 2 DESC"
+        )
+        return dict(rows.fetchall())
+
+    def top_rules(self, n: int = 10) -> List[Tuple[str, int]]:
+        """
+        Get the most frequently triggered rules.
+
+        Args:
+            n: Number of rules to return
+
+        Returns:
+            List of (rule, count) tuples, most frequent first
+        """
+        rows = self.conn.execute(
+            'SELECT rule, COUNT(*) FROM errors GROUP BY rule ORDER BY 2 DESC, rule LIMIT ?', (n,)
+        )
+        return rows.fetchall()
+
+    def page_histogram(self) -> Dict[int, int]:
+        """
+        Count errors per page.
+
+        Returns:
+            Dictionary mapping page number to error count
+        """
+        rows = self.conn.execute(
+            'SELECT page, COUNT(*) FROM errors WHERE page IS NOT NULL GROUP BY page ORDER BY page'
+        )
+        return dict(rows.fetchall())
+
+    def line_histogram(self, bin_size: int = 1000) -> Dict[int, int]:
+        """
+        Count errors per block of lines.
+
+        Args:
+            bin_size: Number of lines per bin
+
+        Returns:
+            Dictionary mapping the first line of each bin to its error count
+        """
+        rows = self.conn.execute(
+            'SELECT ((line - 1) / ?) * ? + 1 AS bin, COUNT(*) FROM errors '
+            'WHERE line IS NOT NULL GROUP BY bin ORDER BY bin',
+            (bin_size, bin_size)
+        )
+        return dict(rows.fetchall())
+
+    def columns(self) -> Dict[str, List[Any]]:
+        """
+        Get the stored errors as columns.
+
+        Returns:
+            Dictionary mapping column names to lists of values
+        """
+        rows = self.conn.execute(f'SELECT {", ".join(COLUMNS)} FROM errors').fetchall()
+        return {name: [row[i] for row in rows] for i, name in enumerate(COLUMNS)}
+
+    def export_parquet(self, output_path: str) -> bool:
+        """
+        Export the stored errors to a Parquet file.
+
+        Args:
+            output_path: Path of the Parquet file to write
+
+        Returns:
+            True if the file was written, False if pyarrow is unavailable
+        """
+        if not PYARROW_AVAILABLE:
+            print("Warning: pyarrow not available. Install with 'pip install pyarrow' for Parquet export.")
+            return False
+
+        table = pyarrow.table(self.columns())
+        pyarrow.parquet.write_table(table, output_path)
+        return True
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
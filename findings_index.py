@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Searchable index of findings across all saved error reports.
+
+Every scan writes its own timestamped `*_errors_*` report, so a question
+about all books ("every broken `Şekil ??` reference") would otherwise load
+every report. `ingest` copies the findings of new or changed reports into one
+SQLite file with indexes on file, rule, severity and category and a full-text
+index on the error context and message; `query` then answers from the indexes
+in milliseconds, also over millions of findings.
+
+Ingest is incremental: reports are remembered by path, size and modification
+time, unchanged reports are skipped and changed ones replace their old
+findings. Text in the full-text index is folded with Turkish case rules
+(I/ı, İ/i), so searches ignore case the way the checkers do.
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from casefold import TURKISH_FOLD, casefold
+from report_formats import ReportReader, is_report_file
+
+
+DEFAULT_DB = 'error_reports/findings.db'
+REPORT_PATTERN = '*_errors_*'
+
+# Columns shown by query and usable with --count-by
+FIELDS = ['file', 'page', 'line', 'category', 'rule', 'severity', 'message', 'context', 'report']
+GROUP_FIELDS = ['file', 'page', 'line', 'category', 'rule', 'severity', 'report']
+
+# Indexes on the findings table: name -> columns
+INDEXES = {
+    'report': 'report_id',
+    'file': 'file, rule',
+    'rule': 'rule, file',
+    'severity': 'severity, file',
+    'category': 'category, rule',
+}
+
+# Rows inserted per executemany call while ingesting
+_BATCH_SIZE = 5000
+
+
+def find_reports(paths: Iterable[str], pattern: str = REPORT_PATTERN) -> List[Path]:
+    """
+    Collect report files from files and directories.
+
+    Args:
+        paths: Report files, or directories searched recursively for reports
+        pattern: Glob pattern of report file names in directories; only names
+            ending in a report format suffix (.json, .jsonl.gz, .bin, ...) are used
+
+    Returns:
+        Sorted list of report paths
+    """
+    reports = set()
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            reports.update(p for p in path.rglob(pattern) if p.is_file() and is_report_file(p))
+        elif path.is_file():
+            reports.add(path)
+        else:
+            print(f"Warning: {path} not found")
+    return sorted(reports)
+
+
+def iter_findings(results: Dict[str, Any]) -> Iterator[Tuple[Optional[int], Optional[int], str, Dict[str, Any]]]:
+    """
+    Iterate over the findings of a report.
+
+    Args:
+        results: Report dictionary written by scanner.py or analyze_text_file.py
+
+    Yields:
+        (page, line, category, error) tuples
+    """
+    for key in ('lines_with_errors', 'pages'):
+        for entry in results.get(key) or []:
+            yield from _entry_findings(key, entry)
+
+
+def _entry_findings(key: str, entry: Dict[str, Any]) -> Iterator[Tuple[Optional[int], Optional[int], str, Dict[str, Any]]]:
+    """Iterate over the findings of one line or page entry."""
+    page = entry.get('page_number') if key == 'pages' else None
+    for category, errors in (entry.get('errors') or {}).items():
+        for error in errors:
+            line = entry.get('line_number') if key == 'lines_with_errors' else error.get('line_number')
+            yield page, line, category, error
+
+
+class FindingsIndex:
+    """SQLite index of findings from many error reports."""
+
+    def __init__(self, db_path: str = DEFAULT_DB):
+        """
+        Open (and create if needed) a findings index.
+
+        Args:
+            db_path: Path to the SQLite index file
+        """
+        self.db_path = db_path
+        if db_path != ':memory:':
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        with self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS reports ('
+                'id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, size INTEGER, mtime_ns INTEGER, '
+                'file TEXT, scan_date TEXT, findings INTEGER, ingested TEXT)'
+            )
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS findings ('
+                'id INTEGER PRIMARY KEY, report_id INTEGER NOT NULL, file TEXT, page INTEGER, '
+                'line INTEGER, category TEXT, rule TEXT, severity TEXT, message TEXT, context TEXT, '
+                'offset INTEGER, length INTEGER)'
+            )
+            # Two-column indexes also cover counting one column per value of the other
+            for name, columns in INDEXES.items():
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS findings_{name} ON findings ({columns})')
+            # Folded copies of context and message; rowid is the finding id
+            self.conn.execute(
+                'CREATE VIRTUAL TABLE IF NOT EXISTS findings_fts USING fts5('
+                "context, message, tokenize = 'unicode61 remove_diacritics 0')"
+            )
+
+    def ingest(self, report_path: str, force: bool = False) -> Optional[int]:
+        """
+        Add the findings of one report, replacing those of an earlier version.
+
+        Args:
+            report_path: Path to an error report in any of the report formats
+            force: Re-read the report even if it did not change
+
+        Returns:
+            Number of findings added, or None if the report was skipped
+            because it is unchanged or unreadable
+        """
+        path = str(Path(report_path).resolve())
+        stat = os.stat(path)
+        known = self.conn.execute(
+            'SELECT id, size, mtime_ns FROM reports WHERE path = ?', (path,)
+        ).fetchone()
+        if known and not force and known[1:] == (stat.st_size, stat.st_mtime_ns):
+            return None
+
+        try:
+            reader = ReportReader(path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read {report_path}: {e}")
+            return None
+        with reader:
+            if not reader.entry_counts:
+                print(f"Warning: {report_path} is not an error report, skipped")
+                return None
+            try:
+                return self._ingest_entries(reader, path, stat, known)
+            except (OSError, ValueError, EOFError) as e:
+                print(f"Warning: Could not read {report_path}: {e}")
+                return None
+
+    def _ingest_entries(self, reader: ReportReader, path: str, stat: os.stat_result,
+                        known: Optional[Tuple[int, int, int]]) -> int:
+        """Replace the findings of a report with those read from it, in one transaction."""
+        header = reader.header
+        file = header.get('file_path') or header.get('file') or header.get('pdf_file')
+        scan_date = header.get('scan_date') or header.get('analysis_date')
+
+        with self.conn:
+            if known:
+                self._delete_report(known[0])
+            report_id = self.conn.execute(
+                'INSERT INTO reports (path, size, mtime_ns, file, scan_date, ingested) VALUES (?, ?, ?, ?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime_ns, file, scan_date, datetime.now().isoformat())
+            ).lastrowid
+            next_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM findings').fetchone()[0]
+
+            added = 0
+            rows: List[Tuple[Any, ...]] = []
+            findings = (finding for key, entry in reader.entries() for finding in _entry_findings(key, entry))
+            for page, line, category, error in findings:
+                rows.append((
+                    next_id + added, report_id, file, page, line, category,
+                    error.get('rule') or error.get('type'),
+                    error.get('severity'),
+                    error.get('message'),
+                    error.get('context'),
+                    error.get('offset'),
+                    error.get('length'),
+                ))
+                added += 1
+                if len(rows) >= _BATCH_SIZE:
+                    self._insert(rows)
+                    rows = []
+            self._insert(rows)
+            self.conn.execute('UPDATE reports SET findings = ? WHERE id = ?', (added, report_id))
+        return added
+
+    def _insert(self, rows: List[Tuple[Any, ...]]):
+        if not rows:
+            return
+        self.conn.executemany('INSERT INTO findings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        self.conn.executemany(
+            'INSERT INTO findings_fts (rowid, context, message) VALUES (?, ?, ?)',
+            [(row[0], casefold(row[9] or ''), casefold(row[8] or '')) for row in rows]
+        )
+
+    def _delete_report(self, report_id: int):
+        self.conn.execute(
+            'DELETE FROM findings_fts WHERE rowid IN (SELECT id FROM findings WHERE report_id = ?)', (report_id,)
+        )
+        self.conn.execute('DELETE FROM findings WHERE report_id = ?', (report_id,))
+        self.conn.execute('DELETE FROM reports WHERE id = ?', (report_id,))
+
+    def prune(self) -> int:
+        """
+        Remove the findings of reports that no longer exist on disk.
+
+        Returns:
+            Number of removed reports
+        """
+        missing = [
+            report_id for report_id, path in self.conn.execute('SELECT id, path FROM reports').fetchall()
+            if not os.path.exists(path)
+        ]
+        with self.conn:
+            for report_id in missing:
+                self._delete_report(report_id)
+        return len(missing)
+
+    def _where(self, text: Optional[str] = None, contains: Optional[str] = None,
+               filters: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Any]]:
+        """Build the FROM and WHERE clauses of a query."""
+        clauses = []
+        params: List[Any] = []
+        source = 'findings f'
+        if text:
+            source = 'findings_fts JOIN findings f ON f.id = findings_fts.rowid'
+            clauses.append('findings_fts MATCH ?')
+            # unicode61 folds case itself but not with Turkish rules; only I/ı and İ/i are
+            # folded here, so uppercase operators (AND, OR, NOT, NEAR) keep their meaning
+            params.append(text.translate(TURKISH_FOLD))
+        if contains:
+            clauses.append('instr(f.context, ?) > 0')
+            params.append(contains)
+        for column, value in (filters or {}).items():
+            if value is None:
+                continue
+            if column == 'file':
+                # Substring of the scanned file path, matched in the small reports table
+                clauses.append('f.file IN (SELECT file FROM reports WHERE instr(file, ?) > 0)')
+            elif column == 'report':
+                clauses.append('f.report_id IN (SELECT id FROM reports WHERE instr(path, ?) > 0)')
+            else:
+                clauses.append(f'f.{column} = ?')
+            params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        return f' FROM {source}{where}', params
+
+    def query(self, text: Optional[str] = None, contains: Optional[str] = None, limit: Optional[int] = 100,
+              **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Find findings.
+
+        Args:
+            text: Full-text query on context and message (FTS5 syntax, e.g. '"şekil"'
+                or 'integral NOT limit'); case is folded with Turkish rules
+            contains: Literal substring the context must contain (e.g. '??',
+                which the full-text index does not see)
+            limit: Largest number of findings returned (None for all)
+            **filters: Exact column values (category, rule, severity, page, line),
+                or substrings of the scanned file path (file) or report path (report)
+
+        Returns:
+            List of finding dictionaries in ingest order
+        """
+        clause, params = self._where(text, contains, filters)
+        sql = ('SELECT f.file, f.page, f.line, f.category, f.rule, f.severity, f.message, f.context, '
+               f'(SELECT path FROM reports WHERE id = f.report_id){clause} ORDER BY f.id')
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [dict(zip(FIELDS, row)) for row in self.conn.execute(sql, params)]
+
+    def count(self, text: Optional[str] = None, contains: Optional[str] = None,
+              group_by: Optional[str] = None, **filters: Any) -> Any:
+        """
+        Count findings, optionally grouped by a column.
+
+        Args:
+            text: Full-text query, as for query()
+            contains: Literal substring of the context, as for query()
+            group_by: Column to group by (one of GROUP_FIELDS)
+            **filters: Column filters, as for query()
+
+        Returns:
+            Number of findings, or a list of (value, count) tuples, most frequent first
+        """
+        clause, params = self._where(text, contains, filters)
+        if group_by is None:
+            return self.conn.execute(f'SELECT COUNT(*){clause}', params).fetchone()[0]
+        if group_by not in GROUP_FIELDS:
+            raise ValueError(f"Unknown column: {group_by}")
+        column = ('(SELECT path FROM reports WHERE id = f.report_id)' if group_by == 'report'
+                  else f'f.{group_by}')
+        rows = self.conn.execute(
+            f'SELECT {column} AS value, COUNT(*){clause} GROUP BY value ORDER BY 2 DESC, value', params
+        )
+        return rows.fetchall()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the contents of the index.
+
+        Returns:
+            Dictionary with the number of reports, findings and scanned files
+        """
+        reports, findings = self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(findings), 0) FROM reports'
+        ).fetchone()
+        files = self.conn.execute('SELECT COUNT(DISTINCT file) FROM reports').fetchone()[0]
+        return {'reports': reports, 'findings': findings, 'files': files}
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+
+def _location(finding: Dict[str, Any]) -> str:
+    parts = [finding['file'] or '?']
+    if finding['page'] is not None:
+        parts.append(f"page {finding['page']}")
+    if finding['line'] is not None:
+        parts.append(f"line {finding['line']}")
+    return ':'.join(parts)
+
+
+def main():
+    """Command-line interface of the findings index."""
+    parser = argparse.ArgumentParser(
+        description='Index error reports in SQLite and search findings across all of them',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Index new and changed reports
+  python findings_index.py ingest error_reports/
+
+  # All broken "Şekil ??" references across every book
+  python findings_index.py query --rule broken_reference --text şekil --contains '??'
+
+  # Which books have the most high-severity findings?
+  python findings_index.py query --severity high --count-by file
+        """
+    )
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'Index file (default: {DEFAULT_DB})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help='Add new or changed reports to the index')
+    ingest_parser.add_argument('paths', nargs='*', default=['error_reports'],
+                               help='Report files or directories (default: error_reports)')
+    ingest_parser.add_argument('--pattern', default=REPORT_PATTERN,
+                               help=f'Report file name pattern in directories (default: {REPORT_PATTERN})')
+    ingest_parser.add_argument('--force', action='store_true', help='Re-read reports even if unchanged')
+    ingest_parser.add_argument('--prune', action='store_true',
+                               help='Also remove findings of reports deleted from disk')
+
+    query_parser = subparsers.add_parser('query', help='Search findings')
+    query_parser.add_argument('--text', help='Full-text query on context and message (FTS5 syntax)')
+    query_parser.add_argument('--contains', help='Literal substring of the context, e.g. "??"')
+    query_parser.add_argument('--file', help='Substring of the scanned file path')
+    query_parser.add_argument('--report', help='Substring of the report path')
+    query_parser.add_argument('--rule', help='Rule or error type')
+    query_parser.add_argument('--severity', help='Severity level')
+    query_parser.add_argument('--category', help='Error category')
+    query_parser.add_argument('--page', type=int, help='Page number')
+    query_parser.add_argument('--line', type=int, help='Line number')
+    query_parser.add_argument('--count-by', choices=GROUP_FIELDS, help='Count findings per value of a column')
+    query_parser.add_argument('--count', action='store_true', help='Only print the number of findings')
+    query_parser.add_argument('--limit', type=int, default=100, help='Largest number of findings shown (0: all)')
+    query_parser.add_argument('--json', action='store_true', help='Print findings as JSON Lines')
+
+    subparsers.add_parser('stats', help='Show what the index contains')
+
+    args = parser.parse_args()
+    index = FindingsIndex(args.db)
+
+    try:
+        if args.command == 'ingest':
+            started = time.perf_counter()
+            reports = find_reports(args.paths, args.pattern)
+            ingested = skipped = findings = 0
+            for report in reports:
+                added = index.ingest(str(report), force=args.force)
+                if added is None:
+                    skipped += 1
+                else:
+                    ingested += 1
+                    findings += added
+                    print(f"Indexed {added} findings from {report}")
+            pruned = index.prune() if args.prune else 0
+            pruned_note = f", {pruned} deleted reports removed" if pruned else ''
+            print(f"\n{ingested} reports indexed ({findings} findings), {skipped} unchanged or skipped"
+                  f"{pruned_note} in {time.perf_counter() - started:.2f}s")
+            stats = index.stats()
+            print(f"Index {args.db}: {stats['findings']} findings from {stats['reports']} reports "
+                  f"of {stats['files']} files")
+
+        elif args.command == 'query':
+            filters = {
+                'file': args.file, 'report': args.report, 'rule': args.rule, 'severity': args.severity,
+                'category': args.category, 'page': args.page, 'line': args.line,
+            }
+            started = time.perf_counter()
+            try:
+                if args.count_by:
+                    rows = index.count(args.text, args.contains, group_by=args.count_by, **filters)
+                    elapsed = time.perf_counter() - started
+                    for value, count in rows:
+                        print(f"{count:>10}  {value}")
+                    print(f"\n{len(rows)} values ({elapsed * 1000:.1f} ms)")
+                elif args.count:
+                    total = index.count(args.text, args.contains, **filters)
+                    print(f"{total} findings ({(time.perf_counter() - started) * 1000:.1f} ms)")
+                else:
+                    findings = index.query(args.text, args.contains, limit=args.limit or None, **filters)
+                    elapsed = time.perf_counter() - started
+                    for finding in findings:
+                        if args.json:
+                            print(json.dumps(finding, ensure_ascii=False))
+                            continue
+                        severity = f"[{finding['severity']}] " if finding['severity'] else ''
+                        print(f"{_location(finding)}: {severity}{finding['rule']}: {finding['message']}")
+                        if finding['context']:
+                            print(f"    {finding['context']}")
+                    if not args.json:
+                        more = ' (limit reached, use --limit 0 for all)' if args.limit and len(findings) == args.limit else ''
+                        print(f"\n{len(findings)} findings{more} ({elapsed * 1000:.1f} ms)")
+            except sqlite3.OperationalError as e:
+                print(f"Error: Invalid query: {e}")
+                sys.exit(1)
+
+        elif args.command == 'stats':
+            stats = index.stats()
+            print(f"Index: {args.db}")
+            print(f"Reports: {stats['reports']}")
+            print(f"Scanned files: {stats['files']}")
+            print(f"Findings: {stats['findings']}")
+            for value, count in index.count(group_by='severity'):
+                print(f"  - {value or 'unspecified'}: {count}")
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
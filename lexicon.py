@@ -0,0 +1,266 @@
+"""
+Compact word lexicon stored as a DAWG in a memory-mapped binary file.
+
+A word list is built once into a minimized trie (a DAWG: shared prefixes and
+shared suffixes) and written as flat arrays. The file is mapped read-only, so
+every worker process answers membership queries from the same page-cache
+copy instead of holding its own Python set.
+
+File layout (little-endian 32-bit integers after the header):
+    header:  magic, node count, edge count, word count
+    nodes:   first edge index and (edge count << 1 | final flag) per node
+    labels:  code point of each edge, sorted within each node
+    targets: target node of each edge
+"""
+import os
+import sys
+import mmap
+import struct
+import argparse
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from casefold import casefold
+
+
+LEXICON_MAGIC = b'LEXDAWG1'
+_HEADER = struct.Struct('<8sIII')
+
+
+class _BuildNode:
+    """Trie node used while building."""
+    __slots__ = ('final', 'edges')
+
+    def __init__(self):
+        self.final = False
+        self.edges: Dict[str, '_BuildNode'] = {}
+
+
+def build_dawg(words: Iterable[str]) -> Tuple[_BuildNode, int]:
+    """
+    Build a minimal DAWG from words.
+
+    Uses incremental construction from sorted input: after each word, the
+    part of the previous word that is no longer shared is merged with an
+    equivalent registered node if one exists.
+
+    Args:
+        words: Words to store (any order, duplicates allowed)
+
+    Returns:
+        Tuple of (root node, number of distinct words)
+    """
+    root = _BuildNode()
+    register: Dict[tuple, _BuildNode] = {}
+    unchecked: List[Tuple[_BuildNode, str, _BuildNode]] = []
+
+    def minimize(down_to: int):
+        while len(unchecked) > down_to:
+            parent, char, child = unchecked.pop()
+            key = (child.final, tuple((c, id(n)) for c, n in sorted(child.edges.items())))
+            existing = register.get(key)
+            if existing is not None:
+                parent.edges[char] = existing
+            else:
+                register[key] = child
+
+    previous = ''
+    count = 0
+    for word in sorted(set(words)):
+        if not word:
+            continue
+        common = 0
+        while common < min(len(word), len(previous)) and word[common] == previous[common]:
+            common += 1
+        minimize(common)
+
+        node = unchecked[-1][2] if unchecked else root
+        for char in word[common:]:
+            child = _BuildNode()
+            node.edges[char] = child
+            unchecked.append((node, char, child))
+            node = child
+        node.final = True
+        previous = word
+        count += 1
+    minimize(0)
+
+    return root, count
+
+
+def write_lexicon(words: Iterable[str], output_path: str, fold: bool = True) -> int:
+    """
+    Build a lexicon file from words.
+
+    Args:
+        words: Words to store
+        output_path: Path of the binary lexicon file
+        fold: Whether to store Turkish case-folded words (lookups fold their input too)
+
+    Returns:
+        Number of distinct words stored
+    """
+    if fold:
+        words = (casefold(word.strip()) for word in words)
+    else:
+        words = (word.strip() for word in words)
+    root, word_count = build_dawg(words)
+
+    # Number nodes breadth-first so the root is node 0
+    node_ids = {id(root): 0}
+    order = [root]
+    for node in order:
+        for _, child in sorted(node.edges.items()):
+            if id(child) not in node_ids:
+                node_ids[id(child)] = len(order)
+                order.append(child)
+
+    nodes = array('I')
+    labels = array('I')
+    targets = array('I')
+    for node in order:
+        nodes.append(len(labels))
+        nodes.append(len(node.edges) << 1 | node.final)
+        for char, child in sorted(node.edges.items()):
+            labels.append(ord(char))
+            targets.append(node_ids[id(child)])
+
+    if sys.byteorder != 'little':
+        for table in (nodes, labels, targets):
+            table.byteswap()
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(LEXICON_MAGIC, len(order), len(labels), word_count))
+        f.write(nodes.tobytes())
+        f.write(labels.tobytes())
+        f.write(targets.tobytes())
+    os.replace(tmp_path, output_path)
+
+    return word_count
+
+
+class Lexicon:
+    """Read-only, memory-mapped DAWG lexicon with fast membership tests."""
+
+    def __init__(self, path: str, fold: bool = True, cache_size: int = 100000):
+        """
+        Map a lexicon file.
+
+        Args:
+            path: Path of the binary lexicon file
+            fold: Whether to Turkish case-fold words before lookup
+            cache_size: Number of recent lookups to remember (0 disables)
+        """
+        if sys.byteorder != 'little':
+            raise ValueError("Lexicon files can only be mapped on little-endian systems")
+
+        self.path = path
+        self.fold = fold
+        self.cache_size = cache_size
+        self._cache: Dict[str, bool] = {}
+
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty lexicon file: {path}")
+
+        magic, node_count, edge_count, self.word_count = _HEADER.unpack_from(self._map)
+        expected = _HEADER.size + 4 * (2 * node_count + 2 * edge_count)
+        if magic != LEXICON_MAGIC or len(self._map) != expected:
+            self._map.close()
+            self._file.close()
+            raise ValueError(f"Not a valid lexicon file: {path}")
+
+        view = memoryview(self._map)[_HEADER.size:].cast('I')
+        self._view = view
+        self._nodes = view[:2 * node_count]
+        self._labels = view[2 * node_count:2 * node_count + edge_count]
+        self._targets = view[2 * node_count + edge_count:]
+
+    def __len__(self) -> int:
+        return self.word_count
+
+    def __contains__(self, word: str) -> bool:
+        if self.fold:
+            word = casefold(word)
+
+        known = self._cache.get(word)
+        if known is None:
+            known = self._lookup(word)
+            if self.cache_size > 0:
+                if len(self._cache) >= self.cache_size:
+                    self._cache.clear()
+                self._cache[word] = known
+        return known
+
+    def _lookup(self, word: str) -> bool:
+        nodes = self._nodes
+        labels = self._labels
+        node = 0
+        for char in word:
+            code = ord(char)
+            # Binary search the node's edges, which are sorted by label
+            low = nodes[2 * node]
+            high = end = low + (nodes[2 * node + 1] >> 1)
+            while low < high:
+                mid = (low + high) // 2
+                if labels[mid] < code:
+                    low = mid + 1
+                else:
+                    high = mid
+            if low == end or labels[low] != code:
+                return False
+            node = self._targets[low]
+        return bool(nodes[2 * node + 1] & 1)
+
+    def close(self):
+        """Release the memory map and file handle."""
+        for view in (self._nodes, self._labels, self._targets, self._view):
+            view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'Lexicon':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def load_lexicon(path: Optional[str]) -> Optional[Lexicon]:
+    """
+    Map a lexicon file if it is configured and readable.
+
+    Args:
+        path: Path of the binary lexicon file, or None
+
+    Returns:
+        Lexicon, or None if no usable lexicon is available
+    """
+    if not path:
+        return None
+    try:
+        return Lexicon(path)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not load lexicon '{path}': {e}")
+        return None
+
+
+def main():
+    """Build a binary lexicon from a word list (one word per line)."""
+    parser = argparse.ArgumentParser(description='Build a compact lexicon file from a word list')
+    parser.add_argument('word_list', help='UTF-8 text file with one word per line')
+    parser.add_argument('output', help='Path of the binary lexicon file to write')
+    args = parser.parse_args()
+
+    with open(args.word_list, 'r', encoding='utf-8') as f:
+        word_count = write_lexicon(f, args.output)
+
+    size = os.path.getsize(args.output)
+    print(f"Wrote {word_count} words to {args.output} ({size / 1024:.1f} KiB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Fast offline line classifier for routing lines to the relevant checkers.
+
+Each line is tagged as English prose, Turkish prose, a math/formula line or a
+numeric/answer-choice line, using Turkish-specific letters, character trigram
+profiles of both languages and the share of math symbols and digits.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+from tokenizer import MATH_SYMBOL, NUMBER, WORD, Token, tokenize
+
+
+ENGLISH = 'english'
+TURKISH = 'turkish'
+MATH = 'math'
+NUMERIC = 'numeric'
+
+LINE_CLASSES = [ENGLISH, TURKISH, MATH, NUMERIC]
+
+# Checker categories run for each line class. The 'turkish' category runs on
+# every class because it holds language-independent rules (broken references,
+# punctuation spacing); its checks that only apply to Turkish prose (lexicon
+# lookups, terminology and mixed-language rules) run on Turkish lines only.
+ROUTES: Dict[str, Tuple[str, ...]] = {
+    ENGLISH: ('grammar_punctuation', 'mathematical', 'turkish', 'spacing'),
+    TURKISH: ('mathematical', 'turkish', 'spacing'),
+    MATH: ('mathematical', 'turkish', 'spacing'),
+    NUMERIC: ('mathematical', 'turkish'),
+}
+
+TURKISH_LETTERS = frozenset('çğıöşüÇĞİÖŞÜ')
+
+# Function names that count as formula content rather than words
+MATH_WORDS = frozenset(['sin', 'cos', 'tan', 'cot', 'log', 'ln', 'lim', 'max', 'min', 'exp', 'mod', 'var', 'cov'])
+
+# Frequent character trigrams of each language (words padded with spaces)
+ENGLISH_TRIGRAMS = frozenset([
+    ' th', 'the', 'he ', ' an', 'and', 'nd ', 'ing', 'ng ', ' of', 'of ', ' to', 'to ',
+    'ion', 'tio', 'ent', ' is', 'is ', 'ed ', 'her', 'hat', 'tha', ' wh', 'whe', 'ere',
+    'for', ' fo', 'ate', 'ity', 'ble', 'thi', 'his', 'are', ' be', 'be ', 'wit', 'ith',
+    'th ', 'ly ', 'ons', 'nce', 'ces', 'ty ', 'ove', 'hic', 'ich', 'ch ', 'at ', ' wi',
+    'ts ', 'ry ', 'ght', ' in', 'cal', 'lus', 'ose', ' we', 'ou ', 'you', 'ome', 'est', 'ave', 'ess', 'all',
+])
+TURKISH_TRIGRAMS = frozenset([
+    'ler', 'lar', 'er ', 'ar ', ' bi', 'bir', 'ir ', 'in ', 'ın ', 'ini', 'ını', 'ind',
+    'ınd', 'nda', 'nde', 'da ', 'de ', 've ', ' ve', 'ası', 'esi', 'eri', 'arı', 'lan',
+    'len', 'ile', ' il', 'le ', 'la ', 'ola', 'lma', 'mak', 'mek', 'dir', 'dır', 'ise',
+    'se ', 'içi', 'çin', ' ya', 'yan', 'eni', 'nin', 'nın', 'sı ', 'si ', 'ık ', 'ik ',
+    'rak', 'rek', 'unu', 'ama', 'aki', 'tır', 'tir', 'lik', 'lık', 'sın', 'ayı', 'yı ',
+    'den', 'dan', 'ek ', 'ede', 'ece', 'eki', 'mi ', 'ır ', 'iği', 'ığı', 'ğın', 'uz ', ' ol', 'olu',
+])
+
+# Two-letter words that count as prose; other short tokens are treated as symbols
+SHORT_WORDS = frozenset([
+    'a', 'i', 'an', 'as', 'at', 'be', 'by', 'do', 'if', 'in', 'is', 'it', 'of', 'on', 'or', 'so', 'to', 'we',
+    'bu', 'da', 'de', 'ki', 'mi', 'mı', 've', 'ya', 'o',
+])
+
+# Combining marks of decomposed Turkish letters in PDF text (ğ, İ, ö/ü, ç/ş)
+TURKISH_MARKS = frozenset('\u0306\u0307\u0308\u0327')
+
+ANSWER_LETTERS = frozenset('abcdeABCDE')
+
+
+def _answer_label_length(tokens: List[Token]) -> int:
+    """Count the tokens of an answer-choice label such as "(a)", "a)" or "A." at the start of a line."""
+    i = 1 if tokens and tokens[0].text == '(' else 0
+    if len(tokens) < i + 2 or tokens[i].text not in ANSWER_LETTERS or tokens[i + 1].text not in ').':
+        return 0
+    if tokens[i + 1].start != tokens[i].end or (i and tokens[i].start != tokens[0].end):
+        return 0
+    return i + 2
+
+
+class LineClassifier:
+    """Classify lines by language and content type."""
+
+    def __init__(self):
+        """Initialize the classifier with empty line and word caches."""
+        self._cache: Dict[str, str] = {}
+        self._word_scores: Dict[str, Tuple[int, int]] = {}
+
+    def classify(self, line: str, tokens: Optional[List[Token]] = None) -> str:
+        """
+        Classify a single line.
+
+        Args:
+            line: Line of text (without line terminator)
+            tokens: Precomputed tokens of the line
+
+        Returns:
+            One of ENGLISH, TURKISH, MATH or NUMERIC
+        """
+        line_class = self._cache.get(line)
+        if line_class is None:
+            line_class = self._classify(tokens if tokens is not None else tokenize(line))
+            if len(self._cache) >= 100000:
+                self._cache.clear()
+            self._cache[line] = line_class
+        return line_class
+
+    def _classify(self, tokens: List[Token]) -> str:
+        words = []
+        formula_chars = 0
+        turkish_marks = 0
+        has_letters = False
+
+        for token in tokens[_answer_label_length(tokens):]:
+            kind = token.kind
+            if kind == NUMBER:
+                formula_chars += len(token.text)
+            elif kind == MATH_SYMBOL:
+                formula_chars += 1
+            elif kind == WORD:
+                text = token.text
+                if text.isalpha():
+                    has_letters = True
+                    lower = text.lower()
+                    if (len(text) >= 3 and lower not in MATH_WORDS) or lower in SHORT_WORDS:
+                        words.append(text)
+                else:
+                    # Mixed tokens such as x2 are formula content
+                    has_letters = has_letters or any(c.isalpha() for c in text)
+                    formula_chars += sum(1 for c in text if c.isdigit())
+            elif token.text in TURKISH_MARKS:
+                turkish_marks += 1
+
+        if not has_letters:
+            return NUMERIC
+        if not words:
+            return MATH
+
+        # Formula lines have more symbols and digits than word letters
+        if formula_chars >= sum(len(word) for word in words):
+            return MATH
+
+        english_score = 0
+        turkish_score = 2 * turkish_marks
+        for word in words:
+            scores = self._word_scores.get(word)
+            if scores is None:
+                scores = self._score_word(word)
+                if len(self._word_scores) >= 100000:
+                    self._word_scores.clear()
+                self._word_scores[word] = scores
+            english_score += scores[0]
+            turkish_score += scores[1]
+
+        # Lines without language evidence keep the English grammar check
+        return TURKISH if turkish_score > english_score else ENGLISH
+
+    def _score_word(self, word: str) -> Tuple[int, int]:
+        """Score a word by English and Turkish evidence."""
+        english_score = 0
+        turkish_score = 2 * sum(1 for c in word if c in TURKISH_LETTERS)
+        padded = f" {word.lower()} "
+        for i in range(len(padded) - 2):
+            trigram = padded[i:i + 3]
+            if trigram in ENGLISH_TRIGRAMS:
+                english_score += 1
+            if trigram in TURKISH_TRIGRAMS:
+                turkish_score += 1
+        return english_score, turkish_score
+
+    def classify_lines(self, text: str, tokens: Optional[List[Token]] = None):
+        """
+        Classify every non-empty line of a multi-line text.
+
+        Args:
+            text: Text to classify
+            tokens: Precomputed tokens of the whole text
+
+        Yields:
+            Tuples of (start_offset, line, line_class)
+        """
+        if tokens is None:
+            tokens = tokenize(text)
+
+        # Tokens never span lines, so each line takes the next run of tokens
+        i = 0
+        for match in re.finditer(r'[^\n]+', text):
+            line = match.group()
+            first = i
+            while i < len(tokens) and tokens[i].start < match.end():
+                i += 1
+            if line.strip():
+                yield match.start(), line, self.classify(line, tokens[first:i])
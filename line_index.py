@@ -0,0 +1,215 @@
+"""
+Memory-mapped text source with a persistent line-offset index.
+
+Gives random access to any line or line range of a large text file without
+reading or decoding the whole file. The index of line start offsets is built
+once and stored beside the file as '<file>.lineidx'.
+"""
+import os
+import re
+import mmap
+import sys
+import struct
+from array import array
+from typing import List, Optional, Tuple
+
+
+INDEX_SUFFIX = '.lineidx'
+
+# Magic, byte order flag, then file size, file mtime and line count
+_INDEX_MAGIC = b'LINEIDX1'
+_INDEX_HEADER = struct.Struct('<8sc7xQqQ')
+_BYTE_ORDER = b'L' if sys.byteorder == 'little' else b'B'
+
+# Same line boundaries as Python's universal newlines mode
+_NEWLINE = re.compile(rb'\r\n|\r|\n')
+
+
+class MappedTextFile:
+    """
+    Read-only, memory-mapped UTF-8 text file with O(1) line access.
+
+    Behaves like the list returned by readlines() in text mode: len() gives
+    the number of lines and indexing or slicing (0-indexed) returns lines
+    with a trailing '\\n'.
+    """
+
+    def __init__(self, file_path: str, index_path: Optional[str] = None, persist_index: bool = True):
+        """
+        Open a text file and load or build its line index.
+
+        Args:
+            file_path: Path to the text file
+            index_path: Path of the index file (default: '<file_path>.lineidx')
+            persist_index: Whether to store a newly built index on disk
+        """
+        self.file_path = file_path
+        self.index_path = index_path or f"{file_path}{INDEX_SUFFIX}"
+
+        self._file = open(file_path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        self.size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+
+        self._index_file = None
+        self._index_map = None
+        self._starts = self._load_index()
+        if self._starts is None:
+            self._starts = self._build_index()
+            if persist_index:
+                self._save_index()
+
+    def _load_index(self) -> Optional[memoryview]:
+        """Map a stored index if it matches the current file."""
+        try:
+            index_file = open(self.index_path, 'rb')
+        except OSError:
+            return None
+
+        try:
+            header = index_file.read(_INDEX_HEADER.size)
+            if len(header) != _INDEX_HEADER.size:
+                index_file.close()
+                return None
+            magic, order, size, mtime_ns, count = _INDEX_HEADER.unpack(header)
+            expected = _INDEX_HEADER.size + count * 8
+            if (magic != _INDEX_MAGIC or order != _BYTE_ORDER or size != self.size
+                    or mtime_ns != self._mtime_ns or os.fstat(index_file.fileno()).st_size != expected):
+                index_file.close()
+                return None
+            if count == 0:
+                index_file.close()
+                return memoryview(array('Q'))
+            index_map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, struct.error):
+            index_file.close()
+            return None
+
+        self._index_file = index_file
+        self._index_map = index_map
+        return memoryview(index_map)[_INDEX_HEADER.size:].cast('Q')
+
+    def _build_index(self) -> memoryview:
+        """Scan the file once for line boundaries."""
+        starts = array('Q')
+        if self.size:
+            starts.append(0)
+            for match in _NEWLINE.finditer(self._data):
+                if match.end() < self.size:
+                    starts.append(match.end())
+        return memoryview(starts)
+
+    def _save_index(self):
+        """Write the index beside the file; failures only disable persistence."""
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, _BYTE_ORDER, self.size, self._mtime_ns, len(self._starts)))
+                f.write(self._starts.tobytes())
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Warning: Could not save line index '{self.index_path}': {e}")
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._line(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('line index out of range')
+        return self._line(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._line(i)
+
+    def line_span(self, index: int) -> Tuple[int, int]:
+        """
+        Get the byte range of a line, including its line terminator.
+
+        Args:
+            index: Line index (0-indexed)
+
+        Returns:
+            Tuple of (start_offset, end_offset)
+        """
+        start = self._starts[index]
+        end = self._starts[index + 1] if index + 1 < len(self._starts) else self.size
+        return start, end
+
+    def _line(self, index: int) -> str:
+        """Decode one line, normalizing its terminator to '\\n'."""
+        start, end = self.line_span(index)
+        raw = self._data[start:end]
+        if raw.endswith(b'\r\n'):
+            return raw[:-2].decode('utf-8') + '\n'
+        if raw.endswith(b'\n') or raw.endswith(b'\r'):
+            return raw[:-1].decode('utf-8') + '\n'
+        return raw.decode('utf-8')
+
+    def get_line(self, line_num: int) -> str:
+        """
+        Get a line without its line terminator.
+
+        Args:
+            line_num: Line number (1-indexed)
+
+        Returns:
+            Line text
+        """
+        return self[line_num - 1].rstrip('\n')
+
+    def get_line_context(self, line_num: int, context_lines: int = 2) -> Tuple[int, int, List[str]]:
+        """
+        Get context lines around a specific line.
+
+        Args:
+            line_num: Target line number (1-indexed)
+            context_lines: Number of lines to include before and after
+
+        Returns:
+            Tuple of (start_line, end_line, context_lines)
+        """
+        start = max(0, line_num - context_lines - 1)
+        end = min(len(self), line_num + context_lines)
+
+        return start + 1, end, self[start:end]
+
+    def line_at_offset(self, offset: int) -> int:
+        """
+        Find the line containing a byte offset.
+
+        Args:
+            offset: Byte offset into the file
+
+        Returns:
+            Line number (1-indexed)
+        """
+        low, high = 0, len(self._starts)
+        while low < high:
+            mid = (low + high) // 2
+            if self._starts[mid] <= offset:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def close(self):
+        """Release the memory maps and file handles."""
+        self._starts.release()
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_file.close()
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> 'MappedTextFile':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
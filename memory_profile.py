@@ -0,0 +1,225 @@
+"""
+Memory profiling of scan stages with tracemalloc and RSS sampling.
+
+A scan marks the boundaries of its stages (opening the PDF, extraction,
+checking, report writing, ...). For each stage the profiler records the
+Python heap traced by tracemalloc at its start and end, the heap's peak
+within the stage, the resident set size (RSS) at the boundaries and its peak
+from a background sampler, and the allocation sites that grew most. Memory
+retained at the end of a stage (e.g. accumulated page results) is told apart
+from memory that only peaked inside it (e.g. a pdfplumber page cache or a
+report being serialized). RSS also covers memory outside the Python heap.
+"""
+import gc
+import os
+import sys
+import time
+import threading
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+
+_MB = 1024 * 1024
+
+
+def current_rss() -> Optional[int]:
+    """
+    Get the resident set size of this process.
+
+    Returns:
+        RSS in bytes, or None where /proc/self/statm is not available
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Get the highest resident set size of this process so far.
+
+    Returns:
+        Peak RSS in bytes, or None if it cannot be determined
+    """
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _mb(value: Optional[int]) -> Optional[float]:
+    return round(value / _MB, 2) if value is not None else None
+
+
+class MemoryProfiler:
+    """Record traced heap and RSS figures per scan stage."""
+
+    def __init__(self, top_sites: int = 10, frames: int = 1, sample_interval: float = 0.05):
+        """
+        Start tracing allocations.
+
+        Args:
+            top_sites: Number of allocation sites reported per stage and overall
+            frames: Stack frames stored per allocation (more frames, more overhead)
+            sample_interval: Seconds between RSS samples
+        """
+        self.top_sites = top_sites
+        self.sample_interval = sample_interval
+        self.stages: List[Dict[str, Any]] = []
+        self._stage: Optional[Dict[str, Any]] = None
+        self._snapshot = None
+        self._rss_peak = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(frames)
+        self._sampler = None
+        if current_rss() is not None:
+            self._sampler = threading.Thread(target=self._sample_rss, daemon=True)
+            self._sampler.start()
+
+    def _sample_rss(self):
+        while not self._stop.wait(self.sample_interval):
+            rss = current_rss()
+            with self._lock:
+                if rss is not None and rss > self._rss_peak:
+                    self._rss_peak = rss
+
+    def mark(self, stage: str):
+        """
+        End the current stage and start the next one.
+
+        Args:
+            stage: Name of the stage starting now
+        """
+        if self._stage is not None:
+            # The end of a stage is the start of the next, with the same collection and snapshot
+            self._end_stage()
+        else:
+            gc.collect()
+            self._snapshot = self._take_snapshot()
+        rss = current_rss()
+        with self._lock:
+            self._rss_peak = rss or 0
+        tracemalloc.reset_peak()
+        self._stage = {
+            'stage': stage,
+            'started': time.perf_counter(),
+            'traced_start': tracemalloc.get_traced_memory()[0],
+            'rss_start': rss,
+        }
+
+    def _take_snapshot(self):
+        # Allocations of the profiler's own snapshots are left out
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    def _end_stage(self):
+        if self._stage is None:
+            return
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        # Unreachable objects not yet collected are not retained by the stage
+        gc.collect()
+        traced_end = tracemalloc.get_traced_memory()[0]
+        rss = current_rss()
+        with self._lock:
+            rss_peak = max(self._rss_peak, rss or 0) or None
+
+        snapshot = self._take_snapshot()
+        growth = [
+            stat for stat in snapshot.compare_to(self._snapshot, 'lineno')
+            if stat.size_diff > 0
+        ][:self.top_sites]
+
+        stage = self._stage
+        self.stages.append({
+            'stage': stage['stage'],
+            'seconds': round(time.perf_counter() - stage['started'], 3),
+            'traced_start_mb': _mb(stage['traced_start']),
+            'traced_end_mb': _mb(traced_end),
+            'traced_peak_mb': _mb(traced_peak),
+            'peak_increase_mb': _mb(traced_peak - stage['traced_start']),
+            'retained_mb': _mb(traced_end - stage['traced_start']),
+            'rss_start_mb': _mb(stage['rss_start']),
+            'rss_end_mb': _mb(rss),
+            'rss_peak_mb': _mb(rss_peak),
+            'top_allocations': [
+                {
+                    'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    'size_diff_kb': round(stat.size_diff / 1024, 1),
+                    'count_diff': stat.count_diff,
+                }
+                for stat in growth
+            ],
+        })
+        self._stage = None
+        self._snapshot = snapshot
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        End the last stage and stop tracing.
+
+        Returns:
+            Dictionary with the stages, the stage with the highest traced peak,
+            overall peaks and the largest allocation sites still alive
+        """
+        self._end_stage()
+        top = self._snapshot.statistics('lineno')[:self.top_sites] if self._snapshot is not None else []
+
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self._started_tracing:
+            tracemalloc.stop()
+
+        peak_stage = max(self.stages, key=lambda stage: stage['traced_peak_mb'], default=None)
+        return {
+            'stages': self.stages,
+            'peak_stage': peak_stage['stage'] if peak_stage else None,
+            'traced_peak_mb': peak_stage['traced_peak_mb'] if peak_stage else None,
+            'rss_peak_mb': _mb(peak_rss()),
+            'top_allocations': [
+                {
+                    'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    'size_kb': round(stat.size / 1024, 1),
+                    'count': stat.count,
+                }
+                for stat in top
+            ],
+        }
+
+
+def format_memory_profile(profile: Dict[str, Any]) -> List[str]:
+    """
+    Describe a memory profile in readable lines.
+
+    Args:
+        profile: Dictionary returned by MemoryProfiler.finish()
+
+    Returns:
+        One line per stage, then the overall peaks
+    """
+    lines = []
+    for stage in profile['stages']:
+        rss = f", RSS peak {stage['rss_peak_mb']:.1f} MB" if stage['rss_peak_mb'] is not None else ''
+        lines.append(f"{stage['stage']}: heap peak {stage['traced_peak_mb']:.1f} MB "
+                     f"(+{stage['peak_increase_mb']:.1f} MB in stage), retained {stage['retained_mb']:+.1f} MB"
+                     f"{rss} ({stage['seconds']:.2f}s)")
+    if profile['peak_stage']:
+        lines.append(f"Highest heap peak: {profile['peak_stage']} ({profile['traced_peak_mb']:.1f} MB)")
+    if profile['rss_peak_mb'] is not None:
+        lines.append(f"Process RSS peak: {profile['rss_peak_mb']:.1f} MB")
+    return lines
@@ -0,0 +1,339 @@
+"""
+Live scan metrics in the Prometheus text exposition format.
+
+A ScanMetrics object is updated as lines and pages are checked and reports
+throughput (lines, pages and errors per second over a sliding window),
+grammar backend latency quantiles, work queue depths and cache hit rates.
+A MetricsExporter writes it periodically to a file (for node_exporter's
+textfile collector) and/or serves it over HTTP, so long scans can be watched
+by an existing Prometheus scraper.
+"""
+import os
+import math
+import time
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from error_store import CATEGORIES
+
+
+LATENCY_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _label_value(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _sample_value(value: float) -> str:
+    """Format a sample value without losing precision: integers exactly, floats round-trip."""
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class ScanMetrics:
+    """Thread-safe counters, gauges and latency samples of a running scan."""
+
+    def __init__(self, rate_window: float = 60.0, latency_samples: int = 1000):
+        """
+        Initialize empty metrics.
+
+        Args:
+            rate_window: Seconds over which per-second rates are computed
+            latency_samples: Number of recent grammar backend calls kept for quantiles
+        """
+        self.rate_window = rate_window
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.lines = 0
+        self.pages = 0
+        self.errors = {category: 0 for category in CATEGORIES}
+        self.current_file: Optional[str] = None
+        self.unit = 'line'
+        self.remaining = 0
+
+        self.grammar_calls = 0
+        self.grammar_seconds = 0.0
+        self._latencies = deque(maxlen=latency_samples)
+
+        self.queue_units: Dict[str, int] = {}
+        self._detectors: List[Any] = []
+
+        # (time, lines, pages, errors by category) samples for sliding-window rates
+        self._history = deque([(self.started, 0, 0, dict(self.errors))])
+
+    def watch(self, detector):
+        """
+        Report the cache statistics of an error detector.
+
+        Args:
+            detector: ErrorDetector whose caches are read when metrics are rendered
+        """
+        with self._lock:
+            self._detectors.append(detector)
+
+    def start_file(self, path: str, unit: str, total: int):
+        """
+        Mark the start of a file.
+
+        Args:
+            path: Path of the scanned file
+            unit: 'line' or 'page'
+            total: Number of lines or pages left to check in the file
+        """
+        with self._lock:
+            self.current_file = path
+            self.unit = unit
+            self.remaining = total
+
+    def observe_line(self, errors: Dict[str, List[Any]]):
+        """
+        Count one checked line and its errors.
+
+        Args:
+            errors: Dictionary of errors by type
+        """
+        with self._lock:
+            self.lines += 1
+            self.remaining = max(0, self.remaining - 1)
+            for category, category_errors in errors.items():
+                self.errors[category] = self.errors.get(category, 0) + len(category_errors)
+
+    def observe_page(self, errors: Dict[str, List[Any]]):
+        """
+        Count one checked page and its errors.
+
+        Args:
+            errors: Dictionary of errors by type
+        """
+        with self._lock:
+            self.pages += 1
+            self.remaining = max(0, self.remaining - 1)
+            for category, category_errors in errors.items():
+                self.errors[category] = self.errors.get(category, 0) + len(category_errors)
+
+    def observe_grammar(self, seconds: float):
+        """
+        Record the duration of one grammar backend call.
+
+        Args:
+            seconds: Duration of the call
+        """
+        with self._lock:
+            self.grammar_calls += 1
+            self.grammar_seconds += seconds
+            self._latencies.append(seconds)
+
+    def set_queue_units(self, counts: Dict[str, int]):
+        """
+        Record the number of work queue units by status.
+
+        Args:
+            counts: Dictionary mapping status to number of units
+        """
+        with self._lock:
+            self.queue_units = dict(counts)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the current values of all metrics.
+
+        Returns:
+            Dictionary with totals, sliding-window rates, latency quantiles,
+            queue depths and cache hit rates
+        """
+        now = time.monotonic()
+        with self._lock:
+            # Rates over the oldest sample still inside the window
+            self._history.append((now, self.lines, self.pages, dict(self.errors)))
+            while len(self._history) > 2 and now - self._history[1][0] >= self.rate_window:
+                self._history.popleft()
+            then, lines, pages, errors = self._history[0]
+            elapsed = max(now - then, 1e-9)
+
+            latencies = sorted(self._latencies)
+            quantiles = {}
+            for quantile in LATENCY_QUANTILES:
+                if latencies:
+                    quantiles[quantile] = latencies[min(len(latencies) - 1, int(quantile * len(latencies)))]
+
+            snapshot = {
+                'uptime': now - self.started,
+                'file': self.current_file,
+                'unit': self.unit,
+                'remaining': self.remaining,
+                'lines': self.lines,
+                'pages': self.pages,
+                'errors': dict(self.errors),
+                'lines_per_second': (self.lines - lines) / elapsed,
+                'pages_per_second': (self.pages - pages) / elapsed,
+                'errors_per_second': {
+                    category: (count - errors.get(category, 0)) / elapsed
+                    for category, count in self.errors.items()
+                },
+                'grammar_calls': self.grammar_calls,
+                'grammar_seconds': self.grammar_seconds,
+                'grammar_latency': quantiles,
+                'queue_units': dict(self.queue_units),
+            }
+            detectors = list(self._detectors)
+
+        caches = {}
+        for detector in detectors:
+            caches['line'] = detector.cache_stats()['hit_rate']
+            checker = getattr(detector, 'turkish_checker', None)
+            stripper = getattr(checker, 'suffix_stripper', None) if checker else None
+            if stripper is not None:
+                caches['stem'] = stripper.cache_stats()['hit_rate']
+        snapshot['cache_hit_rate'] = caches
+        return snapshot
+
+    def render(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            Exposition text ending with a newline
+        """
+        snapshot = self.snapshot()
+        out: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[Tuple[str, float]]):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                out.append(f"{name}{labels} {_sample_value(value)}")
+
+        file_label = f'{{file="{_label_value(snapshot["file"])}"}}' if snapshot['file'] else ''
+        metric('scan_uptime_seconds', 'gauge', 'Seconds since the scan started',
+               [('', snapshot['uptime'])])
+        metric('scan_lines_total', 'counter', 'Lines checked', [('', snapshot['lines'])])
+        metric('scan_pages_total', 'counter', 'PDF pages checked', [('', snapshot['pages'])])
+        metric('scan_remaining_units', 'gauge', 'Lines or pages left to check in the current file',
+               [(file_label, snapshot['remaining'])])
+        metric('scan_errors_total', 'counter', 'Errors found by category',
+               [(f'{{category="{category}"}}', count) for category, count in snapshot['errors'].items()])
+        metric('scan_lines_per_second', 'gauge', f'Lines checked per second over the last {self.rate_window:g}s',
+               [('', snapshot['lines_per_second'])])
+        metric('scan_pages_per_second', 'gauge', f'Pages checked per second over the last {self.rate_window:g}s',
+               [('', snapshot['pages_per_second'])])
+        metric('scan_errors_per_second', 'gauge', f'Errors found per second over the last {self.rate_window:g}s',
+               [(f'{{category="{category}"}}', rate) for category, rate in snapshot['errors_per_second'].items()])
+
+        out.append('# HELP scan_grammar_latency_seconds Grammar backend call duration (recent calls)')
+        out.append('# TYPE scan_grammar_latency_seconds summary')
+        for quantile, value in snapshot['grammar_latency'].items():
+            out.append(f'scan_grammar_latency_seconds{{quantile="{quantile}"}} {_sample_value(value)}')
+        out.append(f"scan_grammar_latency_seconds_sum {_sample_value(snapshot['grammar_seconds'])}")
+        out.append(f"scan_grammar_latency_seconds_count {_sample_value(snapshot['grammar_calls'])}")
+
+        if snapshot['queue_units']:
+            metric('scan_queue_units', 'gauge', 'Work queue units by status',
+                   [(f'{{status="{status}"}}', count) for status, count in snapshot['queue_units'].items()])
+        if snapshot['cache_hit_rate']:
+            metric('scan_cache_hit_ratio', 'gauge', 'Cache hit rate',
+                   [(f'{{cache="{cache}"}}', rate) for cache, rate in snapshot['cache_hit_rate'].items()])
+
+        return '\n'.join(out) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serve the metrics of the server's ScanMetrics at /metrics."""
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the scan output
+        pass
+
+
+class MetricsExporter:
+    """Write metrics to a file periodically and/or serve them over HTTP."""
+
+    def __init__(self, metrics: ScanMetrics, path: Optional[str] = None, port: Optional[int] = None,
+                 interval: float = 15.0, host: str = '127.0.0.1'):
+        """
+        Configure the exporter.
+
+        Args:
+            metrics: Metrics to export
+            path: File to rewrite with the metrics every interval seconds
+            port: Port of the HTTP endpoint (0 picks a free port)
+            interval: Seconds between file writes
+            host: Address the HTTP endpoint listens on
+        """
+        self.metrics = metrics
+        self.path = path
+        self.port = port
+        self.interval = interval
+        self.host = host
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> 'MetricsExporter':
+        """
+        Start the file writer and HTTP server threads.
+
+        Returns:
+            self, for chaining
+        """
+        if self.port is not None:
+            self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+            self._server.daemon_threads = True
+            self._server.metrics = self.metrics
+            self.port = self._server.server_address[1]
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            print(f"Serving metrics at http://{self.host}:{self.port}/metrics")
+        if self.path:
+            self.write()
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+            print(f"Writing metrics to {self.path} every {self.interval:g}s")
+        return self
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self):
+        """Write the current metrics to the file, replacing it atomically."""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.metrics.render())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write metrics to {self.path}: {e}")
+
+    def stop(self):
+        """Stop the threads and write the final metrics."""
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join()
+            self.write()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self) -> 'MetricsExporter':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
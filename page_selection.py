@@ -0,0 +1,162 @@
+"""
+Page selection for partial PDF scans: explicit page ranges and stratified
+random samples, with error-rate estimates extrapolated from a sample.
+"""
+import math
+import random
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+
+# Two-sided 95% critical values of Student's t for 1-30 degrees of freedom
+_T_975 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+
+
+def parse_page_spec(spec: str) -> List[Tuple[int, Optional[int]]]:
+    """
+    Parse the ranges of a page selection such as "120-180,300".
+
+    Args:
+        spec: Comma-separated page numbers and inclusive ranges (1-indexed);
+            open ranges such as "300-" run to the last page
+
+    Returns:
+        List of (first, last) page ranges; last is None for open ranges
+
+    Raises:
+        ValueError: If the selection is malformed or empty
+    """
+    ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                first, last = part.split('-', 1)
+                first = int(first) if first.strip() else 1
+                last = int(last) if last.strip() else None
+            else:
+                first = last = int(part)
+        except ValueError:
+            raise ValueError(f"Invalid page range '{part}' (expected e.g. 120-180,300)")
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"Invalid page range '{part}'")
+        ranges.append((first, last))
+
+    if not ranges:
+        raise ValueError(f"Page selection '{spec}' is empty")
+    return ranges
+
+
+def parse_page_ranges(spec: str, page_count: int) -> List[int]:
+    """
+    Parse a page selection such as "120-180,300".
+
+    Args:
+        spec: Comma-separated page numbers and inclusive ranges (1-indexed);
+            open ranges such as "300-" run to the last page
+        page_count: Number of pages in the document
+
+    Returns:
+        Sorted list of distinct page numbers within the document
+
+    Raises:
+        ValueError: If the selection is malformed or selects no pages
+    """
+    pages = set()
+    for first, last in parse_page_spec(spec):
+        pages.update(range(first, (page_count if last is None else min(last, page_count)) + 1))
+
+    if not pages:
+        raise ValueError(f"Page selection '{spec}' contains no pages of this document ({page_count} pages)")
+    return sorted(pages)
+
+
+def stratified_sample(page_count: int, sample_size: int, seed: int = 0) -> List[int]:
+    """
+    Pick pages spread over the whole document.
+
+    The document is split into sample_size strata of consecutive pages and
+    one page is drawn at random from each, so every part of the book is
+    represented. The same seed always selects the same pages.
+
+    Args:
+        page_count: Number of pages in the document
+        sample_size: Number of pages to select
+        seed: Random seed
+
+    Returns:
+        Sorted list of page numbers (all pages if sample_size >= page_count)
+    """
+    if sample_size >= page_count:
+        return list(range(1, page_count + 1))
+    if sample_size < 1:
+        raise ValueError("Sample size must be at least 1")
+
+    rng = random.Random(seed)
+    pages = []
+    for stratum in range(sample_size):
+        first = stratum * page_count // sample_size + 1
+        last = (stratum + 1) * page_count // sample_size
+        pages.append(rng.randint(first, last))
+    return pages
+
+
+def _interval(values: Sequence[float], population: int) -> Dict[str, float]:
+    """Mean of a sample with a 95% confidence interval, corrected for the finite population."""
+    n = len(values)
+    mean = sum(values) / n
+    if n < 2:
+        return {'mean': mean, 'low': mean, 'high': mean, 'margin': 0.0}
+
+    variance = sum((value - mean) ** 2 for value in values) / (n - 1)
+    finite_correction = max(0.0, 1 - n / population)
+    standard_error = math.sqrt(variance / n * finite_correction)
+    critical = _T_975[n - 2] if n - 1 <= len(_T_975) else 1.96
+    margin = critical * standard_error
+    return {'mean': mean, 'low': max(0.0, mean - margin), 'high': mean + margin, 'margin': margin}
+
+
+def estimate_error_rates(page_results: List[Dict[str, Any]], page_count: int,
+                         categories: Sequence[str]) -> Dict[str, Any]:
+    """
+    Extrapolate document-wide error rates from sampled pages.
+
+    Args:
+        page_results: Page result entries of the sampled pages
+        page_count: Number of pages in the whole document
+        categories: Error categories to estimate separately
+
+    Returns:
+        Dictionary with the sample size, errors per page and estimated total
+        errors (each with a 95% confidence interval), the share of pages with
+        errors, and estimated totals per category
+    """
+    n = len(page_results)
+    if n == 0:
+        return {'sampled_pages': 0, 'total_pages': page_count}
+
+    def rounded(interval: Dict[str, float], scale: float = 1.0) -> Dict[str, float]:
+        return {key: round(value * scale, 2) for key, value in interval.items()}
+
+    per_page = _interval([page['total_errors'] for page in page_results], page_count)
+    with_errors = _interval([1.0 if page['total_errors'] > 0 else 0.0 for page in page_results], page_count)
+
+    by_category = {}
+    for category in categories:
+        counts = [len(page.get('errors', {}).get(category, [])) for page in page_results]
+        by_category[category] = rounded(_interval(counts, page_count), page_count)
+
+    return {
+        'sampled_pages': n,
+        'total_pages': page_count,
+        'confidence': 0.95,
+        'errors_per_page': rounded(per_page),
+        'estimated_total_errors': rounded(per_page, page_count),
+        'share_of_pages_with_errors': rounded(with_errors),
+        'estimated_errors_by_category': by_category,
+    }
@@ -0,0 +1,166 @@
+"""
+Sharded multi-process analysis of a single large text file.
+
+The file is split into byte ranges that start and end on line boundaries.
+Each shard is analyzed in a process pool whose workers keep one warm
+TextAnalyzer, and the shard results are merged in file order, so the
+merged results match a sequential TextAnalyzer.analyze_file run.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from pathlib import Path
+from error_store import ErrorStore
+from line_classifier import LINE_CLASSES
+from line_index import MappedTextFile
+
+
+# Analyzer owned by each worker process, created once by _init_worker
+_worker_analyzer = None
+
+
+def plan_shards(source: MappedTextFile, shard_bytes: int) -> List[Tuple[int, int, int]]:
+    """
+    Split a file into byte ranges aligned to line boundaries.
+
+    Args:
+        source: Mapped text file with its line index
+        shard_bytes: Target size of each shard in bytes
+
+    Returns:
+        List of (start_offset, end_offset, first_line) tuples; first_line is 1-indexed
+    """
+    shards = []
+    total_lines = len(source)
+    line_index = 0
+
+    while line_index < total_lines:
+        start, _ = source.line_span(line_index)
+        # Extend to the end of the line containing the last byte of the target range
+        end_line = source.line_at_offset(start + max(1, shard_bytes) - 1)
+        end_line = min(max(end_line, line_index + 1), total_lines)
+        _, end = source.line_span(end_line - 1)
+
+        shards.append((start, end, line_index + 1))
+        line_index = end_line
+
+    return shards
+
+
+def _init_worker(enable_grammar: bool, enable_turkish: bool, config: Optional[Dict[str, Any]]):
+    """Create the worker's analyzer once, when the process starts."""
+    global _worker_analyzer
+    from text_analyzer import TextAnalyzer
+    _worker_analyzer = TextAnalyzer(enable_grammar=enable_grammar, enable_turkish=enable_turkish, config=config)
+
+
+def _analyze_shard(task: Tuple[str, int, int, int]) -> Dict[str, Any]:
+    """
+    Analyze one shard in a worker process.
+
+    Args:
+        task: Tuple of (file_path, start_offset, end_offset, first_line)
+
+    Returns:
+        Partial results with global line numbers
+    """
+    file_path, start, end, first_line = task
+
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        raw = f.read(end - start)
+
+    # Decode like open(..., 'r', encoding='utf-8') so lines match readlines()
+    lines = io.TextIOWrapper(io.BytesIO(raw), encoding='utf-8').readlines()
+
+    results = {'lines_with_errors': [], 'total_errors': 0}
+    hits, misses = _worker_analyzer.detector.cache_hits, _worker_analyzer.detector.cache_misses
+    class_counts = dict(_worker_analyzer.detector.class_counts)
+    _worker_analyzer._analyze_lines(lines, results, first_line=first_line)
+
+    # Report only this shard's share of the worker's cache and routing activity
+    results['cache_stats']['hits'] -= hits
+    results['cache_stats']['misses'] -= misses
+    for line_class, count in class_counts.items():
+        results['line_classes'][line_class] -= count
+    return results
+
+
+def analyze_file_sharded(file_path: str, workers: Optional[int] = None, shard_bytes: Optional[int] = None,
+                         enable_grammar: bool = True, enable_turkish: bool = True,
+                         config: Optional[Dict[str, Any]] = None,
+                         line_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                         collect_lines: bool = True) -> Dict[str, Any]:
+    """
+    Analyze a text file line by line using several processes.
+
+    Args:
+        file_path: Path to the text file
+        workers: Number of worker processes (default: CPU count)
+        shard_bytes: Target shard size in bytes (default: about four shards per worker)
+        enable_grammar: Whether to enable grammar checking
+        enable_turkish: Whether to enable Turkish-specific checks
+        config: Optional configuration dictionary
+        line_callback: Optional function called with each line entry that has errors, in file order
+        collect_lines: Whether to keep line entries in results['lines_with_errors']
+
+    Returns:
+        Dictionary containing analysis results with line numbers, as from TextAnalyzer.analyze_file
+    """
+    if not Path(file_path).exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    workers = workers or os.cpu_count() or 1
+
+    with MappedTextFile(file_path) as source:
+        total_lines = len(source)
+        if shard_bytes is None:
+            shard_bytes = -(-source.size // (workers * 4)) or 1
+        shards = plan_shards(source, shard_bytes)
+
+    results = {
+        'file_path': file_path,
+        'total_lines': total_lines,
+        'lines_with_errors': [],
+        'error_summary': {},
+        'total_errors': 0
+    }
+    store = ErrorStore()
+    cache_hits = 0
+    cache_misses = 0
+    line_classes = {line_class: 0 for line_class in LINE_CLASSES}
+
+    tasks = [(file_path, start, end, first_line) for start, end, first_line in shards]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(enable_grammar, enable_turkish, config)) as pool:
+        # map() yields shard results in file order
+        for shard_results in pool.map(_analyze_shard, tasks):
+            for line_data in shard_results['lines_with_errors']:
+                if collect_lines:
+                    results['lines_with_errors'].append(line_data)
+                if line_callback:
+                    line_callback(line_data)
+                store.add_errors(line_data['errors'], line=line_data['line_number'])
+            results['total_errors'] += shard_results['total_errors']
+            cache_hits += shard_results['cache_stats']['hits']
+            cache_misses += shard_results['cache_stats']['misses']
+            for line_class, count in shard_results['line_classes'].items():
+                line_classes[line_class] += count
+
+    # Summaries come from grouped queries over the merged error store
+    results['error_summary'] = store.error_summary()
+    results['severity_summary'] = store.severity_summary()
+    results['top_rules'] = store.top_rules()
+    lookups = cache_hits + cache_misses
+    results['cache_stats'] = {
+        'hits': cache_hits,
+        'misses': cache_misses,
+        'hit_rate': round(cache_hits / lookups, 4) if lookups else 0.0,
+        'workers': workers,
+        'shards': len(shards)
+    }
+    results['line_classes'] = line_classes
+    store.close()
+
+    return results
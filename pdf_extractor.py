@@ -1,21 +1,124 @@
 """
 PDF text extraction module for extracting text from PDF files page by page.
 """
+import hashlib
 import pdfplumber
-from typing import List, Dict, Optional, Any
+from pdfminer.pdftypes import PDFObjRef, PDFStream, resolve1
+from typing import List, Dict, Iterator, Optional, Any, Set
+from column_layout import columns_text
+
+
+# 'plain' reads lines across the whole page; 'columns' rebuilds column reading order
+LAYOUTS = ['plain', 'columns']
+
+
+def _hash_object(obj, digest, cache: Dict[int, bytes], active: Set[int]) -> None:
+    """
+    Hash a PDF object and everything it references.
+    
+    Indirect objects are hashed once and their digests cached by object id, so
+    fonts and images shared by many pages are only read once per document.
+    
+    Args:
+        obj: PDF object (reference, stream, dictionary, array or simple value)
+        digest: hashlib object to update
+        cache: Digests of indirect objects hashed so far, by object id
+        active: Ids of the indirect objects being hashed (to stop at cycles)
+    """
+    if isinstance(obj, PDFObjRef):
+        objid = obj.objid
+        if objid in active:
+            digest.update(b'cycle')
+            return
+        if objid not in cache:
+            active.add(objid)
+            referenced = hashlib.sha1()
+            _hash_object(obj.resolve(), referenced, cache, active)
+            active.discard(objid)
+            cache[objid] = referenced.digest()
+        digest.update(cache[objid])
+    elif isinstance(obj, PDFStream):
+        digest.update(b'stream')
+        _hash_object(obj.attrs, digest, cache, active)
+        data = obj.get_rawdata()
+        digest.update(data if data is not None else obj.get_data())
+    elif isinstance(obj, dict):
+        digest.update(b'dict %d' % len(obj))
+        for key in sorted(obj, key=str):
+            digest.update(str(key).encode('utf-8'))
+            _hash_object(obj[key], digest, cache, active)
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b'array %d' % len(obj))
+        for item in obj:
+            _hash_object(item, digest, cache, active)
+    else:
+        digest.update(repr(obj).encode('utf-8', 'backslashreplace'))
+
+
+def _content_fingerprint(page, salt: str = '', cache: Optional[Dict[int, bytes]] = None) -> Optional[str]:
+    """
+    Hash the raw content streams, resources and page box of a pdfplumber page.
+    
+    The resources are hashed with everything they reference (fonts with their
+    ToUnicode maps and embedded font files, form XObjects with their own
+    content and resources, images), since they change the extracted text as
+    much as the content streams do.
+    
+    Args:
+        page: pdfplumber page
+        salt: Extra text mixed into the hash
+        cache: Digests of indirect objects already hashed for earlier pages
+        
+    Returns:
+        SHA-1 hex digest, or None if the content streams cannot be read
+    """
+    digest = hashlib.sha1(salt.encode('utf-8'))
+    digest.update(repr(page.mediabox).encode('ascii'))
+    if cache is None:
+        cache = {}
+    try:
+        for stream in page.page_obj.contents or []:
+            stream = resolve1(stream)
+            data = stream.get_rawdata()
+            digest.update(data if data is not None else stream.get_data())
+        digest.update(b'resources')
+        _hash_object(page.page_obj.resources or {}, digest, cache, set())
+    except Exception:
+        return None
+    return digest.hexdigest()
 
 
 class PDFExtractor:
     """Extract text from PDF files page by page."""
     
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, layout: str = 'plain'):
         """
         Initialize the PDF extractor.
         
         Args:
             pdf_path: Path to the PDF file
+            layout: 'plain' for pdfplumber's text extraction, or 'columns' to
+                detect column gutters and extract multi-column pages in reading order
         """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}' (expected one of {', '.join(LAYOUTS)})")
         self.pdf_path = pdf_path
+        self.layout = layout
+    
+    def _page_text(self, page) -> Optional[str]:
+        """
+        Extract the text of an open pdfplumber page in the configured layout.
+        
+        Args:
+            page: pdfplumber page
+            
+        Returns:
+            Extracted text (may be None or empty for pages without text)
+        """
+        if self.layout == 'columns':
+            # page.chars is parsed once; gutters and lines are computed from it directly
+            return columns_text(page.chars, float(page.width))
+        return page.extract_text()
     
     def extract_page(self, page_number: int) -> Optional[str]:
         """
@@ -31,7 +134,7 @@ class PDFExtractor:
             with pdfplumber.open(self.pdf_path) as pdf:
                 if page_number < len(pdf.pages):
                     page = pdf.pages[page_number]
-                    return page.extract_text()
+                    return self._page_text(page)
                 return None
         except Exception as e:
             print(f"Error extracting page {page_number}: {e}")
@@ -48,7 +151,7 @@ class PDFExtractor:
         try:
             with pdfplumber.open(self.pdf_path) as pdf:
                 for i, page in enumerate(pdf.pages):
-                    text = page.extract_text()
+                    text = self._page_text(page)
                     pages_data.append({
                         'page_number': i + 1,
                         'text': text if text else ""
@@ -58,6 +161,102 @@ class PDFExtractor:
         
         return pages_data
     
+    def extract_page_range(self, first_page: int, last_page: int) -> List[Dict[str, Any]]:
+        """
+        Extract text from a range of pages.
+        
+        Args:
+            first_page: First page number (1-indexed)
+            last_page: Last page number (1-indexed, inclusive)
+            
+        Returns:
+            List of dictionaries containing page number and text
+        """
+        return self.extract_pages(list(range(first_page, last_page + 1)))
+    
+    def extract_pages(self, page_numbers: List[int]) -> List[Dict[str, Any]]:
+        """
+        Extract text from selected pages.
+        
+        Args:
+            page_numbers: Page numbers to extract (1-indexed, ascending)
+            
+        Returns:
+            List of dictionaries containing page number and text
+        """
+        pages_data = []
+        if not page_numbers:
+            return pages_data
+        
+        try:
+            # Only the requested pages are loaded
+            with pdfplumber.open(self.pdf_path, pages=page_numbers) as pdf:
+                for page in pdf.pages:
+                    text = self._page_text(page)
+                    pages_data.append({
+                        'page_number': page.page_number,
+                        'text': text if text else ""
+                    })
+        except Exception as e:
+            print(f"Error extracting pages {page_numbers[0]}-{page_numbers[-1]}: {e}")
+        
+        return pages_data
+    
+    def iter_pages(self, page_numbers: List[int]) -> Iterator[Dict[str, Any]]:
+        """
+        Extract selected pages one at a time, as they are consumed.
+        
+        Args:
+            page_numbers: Page numbers to extract (1-indexed, ascending)
+            
+        Yields:
+            Dictionaries containing page number and text
+        """
+        if not page_numbers:
+            return
+        
+        try:
+            with pdfplumber.open(self.pdf_path, pages=page_numbers) as pdf:
+                for page in pdf.pages:
+                    text = self._page_text(page)
+                    yield {
+                        'page_number': page.page_number,
+                        'text': text if text else ""
+                    }
+        except Exception as e:
+            print(f"Error extracting pages {page_numbers[0]}-{page_numbers[-1]}: {e}")
+    
+    def page_fingerprints(self, salt: str = '', page_numbers: Optional[List[int]] = None) -> Dict[int, Optional[str]]:
+        """
+        Fingerprint pages from their raw content streams and resources.
+        
+        The streams are hashed as stored in the file (still compressed), so no
+        text is extracted or decoded. Pages with the same fingerprint in two
+        revisions of a document draw the same content.
+        
+        Args:
+            salt: Extra text mixed into every fingerprint (e.g. scan options),
+                so results are only matched between scans with the same options
+            page_numbers: Pages to fingerprint (1-indexed, ascending; default: all)
+            
+        Returns:
+            Dictionary mapping page numbers to SHA-1 hex digests (None if a
+            page could not be read)
+        """
+        fingerprints = {}
+        if page_numbers is not None and not page_numbers:
+            return fingerprints
+        
+        cache = {}
+        try:
+            with pdfplumber.open(self.pdf_path, pages=page_numbers) as pdf:
+                for page in pdf.pages:
+                    fingerprints[page.page_number] = _content_fingerprint(page, salt, cache)
+        except Exception as e:
+            print(f"Error fingerprinting pages: {e}")
+        
+        return fingerprints
+    
     def get_page_count(self) -> int:
         """
         Get the total number of pages in the PDF.
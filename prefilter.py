@@ -0,0 +1,97 @@
+"""
+Cheap character-presence prefilters for skipping rules that cannot match a line.
+
+Each rule declares the characters it needs as a tuple of groups. A rule can
+only match when the line contains at least one character from every group.
+The character signature of a line is computed once and shared by all checkers.
+"""
+import re
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+Requirement = Tuple[FrozenSet[str], ...]
+
+# Characters matched by the regex classes \s and \d (Unicode aware)
+WHITESPACE = frozenset(c for c in map(chr, range(0x3001)) if re.match(r'\s', c))
+DIGITS = frozenset(c for c in map(chr, range(0x20000)) if c.isdecimal())
+OPERATORS = frozenset('+-*/')
+
+# Letters that re.IGNORECASE folds to non-ASCII characters (İ, ı, ſ, K)
+_UNSAFE_FOLD_LETTERS = frozenset('iIkKsS')
+
+
+def char_signature(text: str) -> FrozenSet[str]:
+    """
+    Compute the character-presence signature of a text.
+
+    Args:
+        text: Text to summarize
+
+    Returns:
+        Set of distinct characters in the text
+    """
+    return frozenset(text)
+
+
+def requires(*groups: Iterable[str]) -> Requirement:
+    """
+    Build a requirement from character groups.
+
+    Args:
+        groups: Each group is an iterable of characters, one of which must be present
+
+    Returns:
+        Requirement tuple
+    """
+    return tuple(frozenset(group) for group in groups)
+
+
+def literal_requires(literal: str) -> Requirement:
+    """
+    Build a requirement for a case-sensitive literal: every character must be present.
+
+    Args:
+        literal: Literal text the rule searches for
+
+    Returns:
+        Requirement tuple
+    """
+    return tuple(frozenset(c) for c in sorted(set(literal)))
+
+
+def ignorecase_requires(literal: str) -> Optional[Requirement]:
+    """
+    Build a requirement for a case-insensitive literal.
+
+    Only ASCII letters with simple case pairs are used, since re.IGNORECASE
+    also matches characters such as dotted/dotless I for 'i'.
+
+    Args:
+        literal: Literal text the rule searches for
+
+    Returns:
+        Requirement tuple, or None when no character is safe to require
+    """
+    groups = []
+    for c in sorted(set(literal.lower())):
+        if c.isascii() and c.isalpha() and c not in _UNSAFE_FOLD_LETTERS:
+            groups.append(frozenset((c, c.upper())))
+    return tuple(groups) if groups else None
+
+
+def may_match(signature: FrozenSet[str], requirement: Optional[Requirement]) -> bool:
+    """
+    Check whether a rule could match a text with the given signature.
+
+    Args:
+        signature: Character signature of the text
+        requirement: Rule requirement, or None for rules without a prefilter
+
+    Returns:
+        False if the rule certainly cannot match, True otherwise
+    """
+    if not requirement:
+        return True
+    for group in requirement:
+        if signature.isdisjoint(group):
+            return False
+    return True
@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+"""
+Compressed and binary formats for error reports.
+
+The original report is one indented JSON document. For noisy books it is
+hundreds of MB, and writing it goes through the slow pure-Python encoder
+that indentation requires. The other formats write the report as a stream:
+
+- jsonl: a header line holding the report without its line or page entries,
+  then one compact JSON line per entry
+- jsonl.gz, jsonl.zst: the same, compressed with gzip or Zstandard while it
+  is written (zst requires zstandard)
+- bin, bin.gz, bin.zst: a compact binary encoding. Errors are fixed-size
+  records, and their type, message, severity, rule and suggestion strings are
+  stored once and referenced by number
+
+Readers detect the format from the first bytes of the file, so
+load_report() and ReportReader accept any of them. Every format decodes to
+the same dictionary json.load() returns for the JSON report, and
+`python report_formats.py REPORT` converts a report back to JSON.
+"""
+import io
+import sys
+import json
+import gzip
+import struct
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, TextIO, Tuple
+from error_record import ErrorRecord, to_json
+
+try:
+    import zstandard
+    ZSTANDARD_AVAILABLE = True
+except ImportError:
+    ZSTANDARD_AVAILABLE = False
+
+
+REPORT_FORMATS = ['json', 'jsonl', 'jsonl.gz', 'jsonl.zst', 'bin', 'bin.gz', 'bin.zst']
+FORMAT_VERSION = 1
+
+# Report keys holding one entry per line or page; streamed formats write them one by one
+ENTRY_KEYS = ['lines_with_errors', 'pages']
+
+# Fast levels: repetitive reports shrink about tenfold even at gzip level 1,
+# while higher levels add more write time than they save in I/O
+GZIP_LEVEL = 1
+ZSTD_LEVEL = 3
+_WRITE_BUFFER = 1 << 20
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+_BINARY_MAGIC = b'ERPT'
+_JSONL_PREFIX = b'{"report_format"'
+
+# Binary records: a tag byte, then the record
+_HEADER = b'H'   # u32 length, JSON header
+_STRING = b'S'   # u32 length, UTF-8 string appended to the string table
+_ENTRY = b'E'    # u32 length, entry JSON with errors null; u32 categories; per category
+                 # u32 name, u32 count and the errors
+_JSON_ENTRY = b'J'  # u32 length, entry JSON (entries without an errors dictionary)
+
+# Keys of an error in the order of ErrorRecord's dict view; bit i of the mask marks key i
+ERROR_KEYS = ErrorRecord._VIEW_KEYS
+_JSON_ERROR = 1 << len(ERROR_KEYS)  # Mask of errors stored as JSON (other keys or values)
+
+# mask, type, message, severity, rule, offset, length, context bytes, suggestions
+_ERROR = struct.Struct('<HIIIIiiIH')
+_U32 = struct.Struct('<I')
+
+_TYPE, _MESSAGE, _CONTEXT, _OFFSET, _LENGTH, _SUGGESTIONS, _SEVERITY, _RULE = (1 << i for i in range(len(ERROR_KEYS)))
+
+# Key tuples of dict errors that the fixed record can hold, by mask
+_MASK_KEYS = {
+    mask: tuple(key for i, key in enumerate(ERROR_KEYS) if mask & (1 << i))
+    for mask in range(1 << len(ERROR_KEYS))
+}
+_KEYS_MASK = {keys: mask for mask, keys in _MASK_KEYS.items()}
+
+
+def resolve_format(report_format: str) -> str:
+    """
+    Check that a report format can be written here.
+
+    Args:
+        report_format: One of REPORT_FORMATS
+
+    Returns:
+        The format, or its gzip variant if it needs zstandard and zstandard
+        is not installed
+    """
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {report_format}")
+    if report_format.endswith('.zst') and not ZSTANDARD_AVAILABLE:
+        fallback = report_format[:-len('.zst')] + '.gz'
+        print(f"Warning: zstandard not available. Install with 'pip install zstandard' for {report_format}; "
+              f"writing {fallback} instead.")
+        return fallback
+    return report_format
+
+
+def is_report_file(path: Any) -> bool:
+    """
+    Check whether a file name is that of an error report in any format.
+
+    Args:
+        path: File path
+
+    Returns:
+        True for names like book_errors_20260109_120000.json or .bin.gz
+    """
+    name = Path(path).name
+    return '_errors_' in name and any(name.endswith(f".{report_format}") for report_format in REPORT_FORMATS)
+
+
+def find_report_files(directory: Any, stem: str = '*') -> List[Path]:
+    """
+    Find the error reports in a directory.
+
+    Args:
+        directory: Directory to search
+        stem: File name stem of the scanned file ('*' for all)
+
+    Returns:
+        Sorted list of report paths; reports of one file sort by timestamp
+    """
+    return sorted(path for path in Path(directory).glob(f"{stem}_errors_*") if is_report_file(path))
+
+
+class EntrySpool:
+    """
+    Line or page entries kept in a temporary file instead of in memory.
+
+    Paged runs hand each entry to the paged report as soon as it is found,
+    but the JSON report can only be written once the totals are known. A
+    spool stands in for the entry list in the results until then: entries
+    are stored as JSON lines, and write_report() copies them into any format.
+    """
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self._count = 0
+
+    def append(self, entry: Dict[str, Any]):
+        """
+        Add an entry at the end of the spool.
+
+        Args:
+            entry: Line or page entry (errors may be ErrorRecords)
+        """
+        self._file.seek(0, io.SEEK_END)
+        self._file.write(json.dumps(entry, ensure_ascii=False, default=to_json).encode('utf-8') + b'\n')
+        self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def raw_lines(self) -> Iterator[bytes]:
+        """Iterate over the entries as stored, one JSON line each."""
+        self._file.flush()
+        position = 0
+        for _ in range(self._count):
+            # Seek per entry so that appends between entries do not move the reader
+            self._file.seek(position)
+            line = self._file.readline()
+            position = self._file.tell()
+            yield line
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for line in self.raw_lines():
+            yield json.loads(line)
+
+    def close(self):
+        """Delete the spooled entries."""
+        self._file.close()
+
+
+def _write_json(results: Dict[str, Any], f):
+    """Write a report as indented JSON, streaming spooled entries."""
+    if not any(isinstance(value, EntrySpool) for value in results.values()):
+        json.dump(results, f, indent=2, ensure_ascii=False, default=to_json)
+        return
+
+    # Same text as json.dump(indent=2); newlines only occur between tokens, as
+    # newlines inside strings are escaped
+    for index, (key, value) in enumerate(results.items()):
+        f.write(',\n  ' if index else '{\n  ')
+        f.write(json.dumps(key, ensure_ascii=False) + ': ')
+        if not isinstance(value, EntrySpool):
+            f.write(json.dumps(value, indent=2, ensure_ascii=False, default=to_json).replace('\n', '\n  '))
+        elif not len(value):
+            f.write('[]')
+        else:
+            for number, entry in enumerate(value):
+                f.write(',\n    ' if number else '[\n    ')
+                f.write(json.dumps(entry, indent=2, ensure_ascii=False).replace('\n', '\n    '))
+            f.write('\n  ]')
+    f.write('\n}')
+
+
+def _open_output(path: Any, report_format: str) -> BinaryIO:
+    if report_format.endswith('.gz'):
+        return gzip.open(path, 'wb', compresslevel=GZIP_LEVEL)
+    if report_format.endswith('.zst'):
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(open(path, 'wb'), closefd=True)
+    return open(path, 'wb')
+
+
+def compression_suffix(report_format: str) -> str:
+    """
+    Get the compression suffix of a report format.
+
+    Args:
+        report_format: One of REPORT_FORMATS
+
+    Returns:
+        '.gz', '.zst' or '' for uncompressed formats
+    """
+    for suffix in ('.gz', '.zst'):
+        if report_format.endswith(suffix):
+            return suffix
+    return ''
+
+
+def open_text_output(path: Any, report_format: str) -> TextIO:
+    """
+    Open a UTF-8 text file for writing, compressed like reports in a format.
+
+    Used for files written next to a report (e.g. its text summary), so
+    compressed reports do not come with large uncompressed companions.
+
+    Args:
+        path: File to write (give it the compression_suffix() of the format)
+        report_format: Report format whose compression to use
+
+    Returns:
+        Text file object
+    """
+    return io.TextIOWrapper(_open_output(path, compression_suffix(report_format)), encoding='utf-8')
+
+
+def _split_report(results: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Tuple[str, List[Any]]]]:
+    """Separate the entry lists of a report from the rest."""
+    entries = [(key, results[key]) for key in ENTRY_KEYS if isinstance(results.get(key), (list, EntrySpool))]
+    report = dict(results)
+    for key, _ in entries:
+        # Kept as null so the key keeps its position when the report is rebuilt
+        report[key] = None
+    header = {
+        'report_format': FORMAT_VERSION,
+        'entries': {key: len(values) for key, values in entries},
+        'report': report,
+    }
+    return header, entries
+
+
+def write_report(results: Dict[str, Any], path: Any, report_format: str = 'json') -> Path:
+    """
+    Write a report in one of REPORT_FORMATS.
+
+    Args:
+        results: Scan results dictionary (errors may be ErrorRecords; entry
+            lists may be EntrySpools)
+        path: File to write
+        report_format: Format to write; zst formats need zstandard (see resolve_format)
+
+    Returns:
+        Path of the written file
+    """
+    if report_format == 'json':
+        with open(path, 'w', encoding='utf-8') as f:
+            _write_json(results, f)
+        return Path(path)
+
+    header, entries = _split_report(results)
+    with _open_output(path, report_format) as raw:
+        # Few large writes; each write to a compressor has a fixed cost
+        f = io.BufferedWriter(raw, buffer_size=_WRITE_BUFFER) if report_format.endswith(('.gz', '.zst')) else raw
+        if report_format.startswith('jsonl'):
+            f.write(json.dumps(header, ensure_ascii=False, default=to_json).encode('utf-8') + b'\n')
+            for _, values in entries:
+                if isinstance(values, EntrySpool):
+                    # Spooled entries are stored as JSON lines already
+                    for line in values.raw_lines():
+                        f.write(line)
+                    continue
+                for entry in values:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=to_json).encode('utf-8') + b'\n')
+        else:
+            _BinaryWriter(f).write(header, entries)
+        if f is not raw:
+            f.flush()
+            f.detach()
+    return Path(path)
+
+
+class _BinaryWriter:
+    """Encode a report in the binary format."""
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.strings: Dict[str, int] = {}
+        self.new_strings: List[str] = []
+
+    def _ref(self, value: str) -> int:
+        ref = self.strings.get(value)
+        if ref is None:
+            if not isinstance(value, str):
+                raise TypeError(f"Expected a string, got {type(value).__name__}")
+            ref = self.strings[value] = len(self.strings)
+            self.new_strings.append(value)
+        return ref
+
+    def _blob(self, tag: bytes, value: Any) -> bytes:
+        data = json.dumps(value, ensure_ascii=False, default=to_json).encode('utf-8')
+        return tag + _U32.pack(len(data)) + data
+
+    def write(self, header: Dict[str, Any], entries: List[Tuple[str, List[Any]]]):
+        self.f.write(_BINARY_MAGIC)
+        self.f.write(self._blob(_HEADER, header))
+        for _, values in entries:
+            for entry in values:
+                record = self._entry(entry)
+                # Strings are defined before the first record using them
+                if self.new_strings:
+                    for value in self.new_strings:
+                        data = value.encode('utf-8')
+                        self.f.write(_STRING + _U32.pack(len(data)) + data)
+                    self.new_strings = []
+                self.f.write(record)
+
+    def _entry(self, entry: Any) -> bytes:
+        errors = entry.get('errors') if isinstance(entry, dict) else None
+        if not isinstance(errors, dict) or not all(isinstance(value, list) for value in errors.values()):
+            return self._blob(_JSON_ENTRY, entry)
+
+        out = bytearray(self._blob(_ENTRY, {**entry, 'errors': None}))
+        out += _U32.pack(len(errors))
+        for category, category_errors in errors.items():
+            out += _U32.pack(self._ref(category))
+            out += _U32.pack(len(category_errors))
+            for error in category_errors:
+                out += self._error(error)
+        return bytes(out)
+
+    def _error(self, error: Any) -> bytes:
+        try:
+            if isinstance(error, ErrorRecord):
+                type_, message, context = error.type, error.message, error.context
+                offset, length, suggestions = error.offset, error.length, error.suggestions
+                severity, rule = error.severity, error.rule
+                # Type and message are required by the record; None falls back to JSON in _ref()
+                mask = _TYPE | _MESSAGE | _CONTEXT
+                if offset is not None:
+                    mask |= _OFFSET
+                if length is not None:
+                    mask |= _LENGTH
+                if suggestions is not None:
+                    mask |= _SUGGESTIONS
+                if severity is not None:
+                    mask |= _SEVERITY
+                if rule is not None:
+                    mask |= _RULE
+            else:
+                mask = _KEYS_MASK.get(tuple(error), 0)
+                if mask & (_TYPE | _MESSAGE | _CONTEXT) != _TYPE | _MESSAGE | _CONTEXT:
+                    raise TypeError('Error keys do not fit the record')
+                get = error.get
+                type_, message, context = error['type'], error['message'], error['context']
+                offset, length, suggestions = get('offset'), get('length'), get('suggestions')
+                severity, rule = get('severity'), get('rule')
+
+            if not mask & _OFFSET:
+                offset = 0
+            if not mask & _LENGTH:
+                length = 0
+            if type(offset) is not int or type(length) is not int:
+                raise TypeError('Offset and length must be integers')
+
+            # Strings are referenced by number; _ref() rejects anything but strings
+            strings = self.strings
+            refs = []
+            for bit, value in ((_TYPE, type_), (_MESSAGE, message), (_SEVERITY, severity), (_RULE, rule)):
+                ref = strings.get(value) if mask & bit else 0
+                refs.append(ref if ref is not None else self._ref(value))
+            if mask & _SUGGESTIONS:
+                if not isinstance(suggestions, list):
+                    raise TypeError('Suggestions are not a list')
+                refs.extend(self._ref(value) for value in suggestions)
+            else:
+                suggestions = ()
+
+            context = context.encode('utf-8')
+            record = _ERROR.pack(mask, refs[0], refs[1], refs[2], refs[3],
+                                 offset, length, len(context), len(suggestions))
+            if len(refs) > 4:
+                return record + context + struct.pack(f'<{len(suggestions)}I', *refs[4:])
+            return record + context
+        except (TypeError, AttributeError, struct.error):
+            data = json.dumps(error, ensure_ascii=False, default=to_json).encode('utf-8')
+            return _ERROR.pack(_JSON_ERROR, 0, 0, 0, 0, 0, 0, len(data), 0) + data
+
+
+def _open_input(path: Any) -> Tuple[BinaryIO, str]:
+    """Open a report for reading, decompressing it if needed."""
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    if magic.startswith(_GZIP_MAGIC):
+        stream, compression = gzip.open(path, 'rb'), '.gz'
+    elif magic == _ZSTD_MAGIC:
+        if not ZSTANDARD_AVAILABLE:
+            raise ValueError(f"{path} is compressed with Zstandard; install zstandard to read it")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        # Buffered, so read(n) returns n bytes unless the stream ends
+        stream, compression = io.BufferedReader(reader), '.zst'
+    else:
+        stream, compression = open(path, 'rb'), ''
+    return stream, compression
+
+
+class ReportReader:
+    """Read an error report in any of REPORT_FORMATS."""
+
+    def __init__(self, path: Any):
+        """
+        Open a report and read its header.
+
+        Args:
+            path: Report file
+
+        Raises:
+            ValueError: If the file is not a readable report
+        """
+        self.path = path
+        self._stream, compression = _open_input(path)
+        self._strings: List[str] = []
+        self._report: Optional[Dict[str, Any]] = None
+        try:
+            self._read_header(compression)
+        except Exception:
+            self._stream.close()
+            raise
+
+    def _read_header(self, compression: str):
+        stream = self._stream
+        head = stream.peek(len(_JSONL_PREFIX))[:len(_JSONL_PREFIX)] if hasattr(stream, 'peek') else b''
+        if head.startswith(_BINARY_MAGIC):
+            stream.read(len(_BINARY_MAGIC))
+            if stream.read(1) != _HEADER:
+                raise ValueError(f"{self.path} has no report header")
+            header = json.loads(self._read_sized())
+            self.format = f"bin{compression}"
+        elif head.startswith(_JSONL_PREFIX):
+            header = json.loads(stream.readline())
+            self.format = f"jsonl{compression}"
+        else:
+            # A whole JSON document
+            self._report = json.load(io.TextIOWrapper(stream, encoding='utf-8'))
+            if not isinstance(self._report, dict):
+                raise ValueError(f"{self.path} is not an error report")
+            header = {
+                'report_format': FORMAT_VERSION,
+                'entries': {key: len(self._report[key]) for key in ENTRY_KEYS
+                            if isinstance(self._report.get(key), list)},
+                'report': {key: None if key in ENTRY_KEYS and isinstance(value, list) else value
+                           for key, value in self._report.items()},
+            }
+            self.format = f"json{compression}"
+
+        if header.get('report_format') != FORMAT_VERSION:
+            raise ValueError(f"{self.path} has unsupported report format version {header.get('report_format')}")
+        self.entry_counts: Dict[str, int] = header['entries']
+        # Report without its entries (entry keys hold None)
+        self.header: Dict[str, Any] = header['report']
+
+    def _read_sized(self) -> bytes:
+        size = _U32.unpack(self._stream.read(4))[0]
+        data = self._stream.read(size)
+        if len(data) != size:
+            raise ValueError(f"{self.path} ends in the middle of a record")
+        return data
+
+    def entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Iterate over the line or page entries without loading them all.
+
+        Yields:
+            (entry key, entry) pairs, e.g. ('pages', page dictionary)
+
+        Raises:
+            ValueError: If the report is truncated or corrupt
+        """
+        for key, count in self.entry_counts.items():
+            if self._report is not None:
+                for entry in self._report[key]:
+                    yield key, entry
+            elif self.format.startswith('jsonl'):
+                for _ in range(count):
+                    yield key, json.loads(self._stream.readline())
+            else:
+                for _ in range(count):
+                    try:
+                        entry = self._read_binary_entry()
+                    except (struct.error, IndexError, UnicodeDecodeError) as e:
+                        raise ValueError(f"{self.path} is truncated or corrupt: {e}") from e
+                    yield key, entry
+
+    def _read_binary_entry(self) -> Any:
+        stream = self._stream
+        strings = self._strings
+        while True:
+            tag = stream.read(1)
+            if tag == _STRING:
+                strings.append(self._read_sized().decode('utf-8'))
+            elif tag == _JSON_ENTRY:
+                return json.loads(self._read_sized())
+            elif tag == _ENTRY:
+                break
+            else:
+                raise ValueError(f"{self.path} has an unknown or truncated record")
+
+        entry = json.loads(self._read_sized())
+        errors = {}
+        categories = _U32.unpack(stream.read(4))[0]
+        for _ in range(categories):
+            category, count = struct.unpack('<II', stream.read(8))
+            category_errors = []
+            for _ in range(count):
+                mask, type_, message, severity, rule, offset, length, context_size, suggestion_count = \
+                    _ERROR.unpack(stream.read(_ERROR.size))
+                context = stream.read(context_size).decode('utf-8')
+                if mask == _JSON_ERROR:
+                    category_errors.append(json.loads(context))
+                    continue
+                error = {'type': strings[type_], 'message': strings[message], 'context': context}
+                if mask & _OFFSET:
+                    error['offset'] = offset
+                if mask & _LENGTH:
+                    error['length'] = length
+                if mask & _SUGGESTIONS:
+                    refs = struct.unpack(f'<{suggestion_count}I', stream.read(4 * suggestion_count))
+                    error['suggestions'] = [strings[ref] for ref in refs]
+                if mask & _SEVERITY:
+                    error['severity'] = strings[severity]
+                if mask & _RULE:
+                    error['rule'] = strings[rule]
+                category_errors.append(error)
+            errors[strings[category]] = category_errors
+        entry['errors'] = errors
+        return entry
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Read the whole report.
+
+        Returns:
+            Report dictionary in the schema of the JSON report
+        """
+        if self._report is not None:
+            return self._report
+        report = dict(self.header)
+        for key in self.entry_counts:
+            report[key] = []
+        for key, entry in self.entries():
+            report[key].append(entry)
+        return report
+
+    def close(self):
+        """Close the report file."""
+        self._stream.close()
+
+    def __enter__(self) -> 'ReportReader':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def load_report(path: Any) -> Dict[str, Any]:
+    """
+    Read an error report in any of REPORT_FORMATS.
+
+    Args:
+        path: Report file
+
+    Returns:
+        Report dictionary in the schema of the JSON report
+    """
+    with ReportReader(path) as reader:
+        return reader.load()
+
+
+def _strip_format(name: str) -> str:
+    for report_format in sorted(REPORT_FORMATS, key=len, reverse=True):
+        if name.endswith(f".{report_format}"):
+            return name[:-len(report_format) - 1]
+    return name
+
+
+def main():
+    """Convert an error report between formats."""
+    parser = argparse.ArgumentParser(
+        description='Convert an error report between the JSON, JSON Lines and binary formats',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Convert a compressed report back to the indented JSON report
+  python report_formats.py error_reports/book_errors_20260109_120000.jsonl.gz
+
+  # Re-encode an old JSON report in the binary format
+  python report_formats.py error_reports/book_errors_20260109_120000.json --format bin.zst
+        """
+    )
+    parser.add_argument('report', help='Report file in any format')
+    parser.add_argument('-f', '--format', choices=REPORT_FORMATS, default='json',
+                        help='Format to write (default: json)')
+    parser.add_argument('-o', '--output', help='Output file (default: the report name with the new format)')
+    args = parser.parse_args()
+
+    try:
+        results = load_report(args.report)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read report '{args.report}': {e}")
+        sys.exit(1)
+
+    report_format = resolve_format(args.format)
+    output = args.output or f"{_strip_format(str(args.report))}.{report_format}"
+    if Path(output).resolve() == Path(args.report).resolve():
+        print(f"Error: '{args.report}' is already in {report_format} format")
+        sys.exit(1)
+    if not args.output and Path(output).exists():
+        print(f"Error: '{output}' already exists; choose another file with --output")
+        sys.exit(1)
+    write_report(results, output, report_format)
+    print(f"Report saved to: {output}")
+
+
+if __name__ == '__main__':
+    main()
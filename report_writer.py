@@ -0,0 +1,345 @@
+"""
+Streaming, paged report writer for large HTML and Markdown error reports.
+
+Line entries are written as they arrive and split into pages with a bounded
+number of errors. Each HTML page is stored as a JSON chunk that the index
+page loads on demand, so browsers never have to render the whole report.
+"""
+import json
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from error_record import to_json
+from line_index import MappedTextFile
+
+
+# Section titles for each error category
+CATEGORY_TITLES = {
+    'grammar_punctuation': 'Grammar/Punctuation',
+    'mathematical': 'Mathematical',
+    'turkish': 'Turkish-specific',
+    'spacing': 'Spacing',
+}
+
+
+def write_markdown_line(f, line_data: Dict[str, Any], source: Optional[MappedTextFile] = None,
+                        context_lines: int = 0, max_context_chars: int = 0):
+    """
+    Write the Markdown section for one line with errors.
+
+    Args:
+        f: File handle
+        line_data: Line entry with line_number, text and errors
+        source: Mapped source file used to show surrounding lines
+        context_lines: Number of surrounding lines to show before and after
+        max_context_chars: Truncate surrounding lines to this length (0 for no limit)
+    """
+    line_num = line_data['line_number']
+    f.write(f"### Line {line_num}\n\n")
+    f.write(f"```\n{line_data['text']}\n```\n\n")
+
+    if source is not None and context_lines > 0:
+        start, _, lines = source.get_line_context(line_num, context_lines)
+        f.write(f"Surrounding lines:\n\n```\n")
+        for number, text in enumerate(lines, start):
+            text = text.rstrip('\n')
+            if max_context_chars and len(text) > max_context_chars:
+                text = text[:max_context_chars] + '...'
+            marker = '>' if number == line_num else ' '
+            f.write(f"{marker}{number:>6} | {text}\n")
+        f.write(f"```\n\n")
+
+    for error_type, title in CATEGORY_TITLES.items():
+        errors = line_data['errors'].get(error_type)
+        if not errors:
+            continue
+
+        f.write(f"#### {title} Errors\n\n")
+        for i, error in enumerate(errors, 1):
+            f.write(f"{i}. **{error['message']}**\n")
+            f.write(f"   - Context: `{error['context']}`\n")
+            if error_type != 'grammar_punctuation':
+                f.write(f"   - Severity: {error.get('severity', 'N/A')}\n")
+            if error.get('suggestions') and error_type != 'spacing':
+                f.write(f"   - Suggestions: {', '.join(error['suggestions'])}\n")
+            f.write(f"\n")
+
+
+class PagedReportWriter:
+    """Write HTML and Markdown reports incrementally in bounded pages."""
+
+    def __init__(self, output_dir: str, base_name: str, page_size: int = 1000,
+                 formats: Optional[List[str]] = None, source: Optional[MappedTextFile] = None,
+                 context_lines: int = 0, max_context_chars: int = 0):
+        """
+        Initialize the paged report writer.
+
+        Args:
+            output_dir: Directory in which the report directory is created
+            base_name: Name of the report directory
+            page_size: Maximum number of errors per page
+            formats: Formats to write ('html' and/or 'markdown')
+            source: Mapped source file used to show surrounding lines in Markdown pages
+            context_lines: Number of surrounding lines to show before and after
+            max_context_chars: Truncate surrounding lines to this length (0 for no limit)
+        """
+        self.report_dir = Path(output_dir) / base_name
+        self.page_size = max(1, page_size)
+        self.formats = formats if formats is not None else ['html', 'markdown']
+        self.source = source
+        self.context_lines = context_lines
+        self.max_context_chars = max_context_chars
+
+        self.chunk_dir = self.report_dir / 'chunks'
+        self.markdown_dir = self.report_dir / 'pages'
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        if 'html' in self.formats:
+            self.chunk_dir.mkdir(exist_ok=True)
+        if 'markdown' in self.formats:
+            self.markdown_dir.mkdir(exist_ok=True)
+
+        # Index entries for finished pages
+        self.pages = []
+        self.lines_written = 0
+
+        # State of the page being written
+        self._page_lines = []
+        self._page_errors = 0
+        self._first_line = None
+        self._last_line = None
+        self._markdown_file = None
+
+    def add_line(self, line_data: Dict[str, Any]):
+        """
+        Add a line entry with errors to the report.
+
+        Args:
+            line_data: Line entry with line_number, text, errors and error_count
+        """
+        if self._markdown_file is None and 'markdown' in self.formats:
+            page_number = len(self.pages) + 1
+            self._markdown_file = open(self.markdown_dir / f"page_{page_number:04d}.md", 'w', encoding='utf-8')
+            self._markdown_file.write(f"# Error Report - Page {page_number}\n\n")
+            self._markdown_file.write(f"[Back to index](../index.md)\n\n")
+
+        if self._markdown_file is not None:
+            write_markdown_line(self._markdown_file, line_data, self.source,
+                                self.context_lines, self.max_context_chars)
+        if 'html' in self.formats:
+            self._page_lines.append(line_data)
+
+        if self._first_line is None:
+            self._first_line = line_data['line_number']
+        self._last_line = line_data['line_number']
+        self._page_errors += line_data['error_count']
+        self.lines_written += 1
+
+        if self._page_errors >= self.page_size:
+            self._flush_page()
+
+    def _flush_page(self):
+        """Finish the current page and write its chunk."""
+        if self._page_errors == 0:
+            return
+
+        page_number = len(self.pages) + 1
+        entry = {
+            'page': page_number,
+            'first_line': self._first_line,
+            'last_line': self._last_line,
+            'error_count': self._page_errors,
+        }
+
+        if 'html' in self.formats:
+            chunk_name = f"chunk_{page_number:04d}.json"
+            with open(self.chunk_dir / chunk_name, 'w', encoding='utf-8') as f:
+                json.dump({'page': page_number, 'lines': self._page_lines}, f, ensure_ascii=False, default=to_json)
+            entry['chunk'] = f"chunks/{chunk_name}"
+
+        if self._markdown_file is not None:
+            self._markdown_file.close()
+            self._markdown_file = None
+            entry['markdown'] = f"pages/page_{page_number:04d}.md"
+
+        self.pages.append(entry)
+        self._page_lines = []
+        self._page_errors = 0
+        self._first_line = None
+
+    def close(self, results: Dict[str, Any]) -> Path:
+        """
+        Flush the last page and write the index pages.
+
+        Args:
+            results: Analysis results with totals and summaries
+
+        Returns:
+            Path to the report directory
+        """
+        self._flush_page()
+
+        if 'html' in self.formats:
+            self._write_html_index(results)
+        if 'markdown' in self.formats:
+            self._write_markdown_index(results)
+
+        return self.report_dir
+
+    def _write_markdown_index(self, results: Dict[str, Any]):
+        """Write index.md with the summary and links to every page."""
+        with open(self.report_dir / 'index.md', 'w', encoding='utf-8') as f:
+            f.write(f"# Error Detection Report\n\n")
+            f.write(f"**File:** {results.get('file_path', 'N/A')}\n\n")
+            f.write(f"**Analysis Date:** {results.get('analysis_date', 'N/A')}\n\n")
+            f.write(f"**Total Lines:** {results['total_lines']}\n\n")
+            f.write(f"**Lines with Errors:** {self.lines_written}\n\n")
+            f.write(f"**Total Errors:** {results['total_errors']}\n\n")
+
+            f.write(f"## Error Summary\n\n")
+            f.write(f"| Error Type | Count |\n")
+            f.write(f"|------------|-------|\n")
+            for error_type, title in CATEGORY_TITLES.items():
+                f.write(f"| {title} | {results['error_summary'].get(error_type, 0)} |\n")
+            f.write(f"\n")
+
+            f.write(f"## Pages\n\n")
+            f.write(f"| Page | Lines | Errors |\n")
+            f.write(f"|------|-------|--------|\n")
+            for page in self.pages:
+                f.write(f"| [{page['page']}]({page['markdown']}) | {page['first_line']}-{page['last_line']} | {page['error_count']} |\n")
+
+    def _write_html_index(self, results: Dict[str, Any]):
+        """Write index.html, which loads page chunks lazily."""
+        summary = {
+            'file_path': results.get('file_path', 'N/A'),
+            'analysis_date': results.get('analysis_date', 'N/A'),
+            'total_lines': results['total_lines'],
+            'lines_with_errors': self.lines_written,
+            'total_errors': results['total_errors'],
+            'error_summary': results['error_summary'],
+            'pages': self.pages,
+        }
+        summary_json = json.dumps(summary, ensure_ascii=False).replace('</', '<\\/')
+
+        with open(self.report_dir / 'index.html', 'w', encoding='utf-8') as f:
+            f.write(_HTML_INDEX_TEMPLATE.replace('__SUMMARY_JSON__', summary_json))
+
+
+_HTML_INDEX_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Error Detection Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; max-width: 1200px; margin: 0 auto; padding: 20px; background-color: #f5f5f5; }
+        h1 { color: #333; border-bottom: 3px solid #4CAF50; padding-bottom: 10px; }
+        h2 { color: #555; margin-top: 30px; }
+        .panel { background-color: #fff; padding: 15px; border-radius: 5px; margin-bottom: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        table { width: 100%; border-collapse: collapse; }
+        th, td { padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }
+        th { background-color: #4CAF50; color: white; }
+        .nav button { margin: 2px; }
+        .nav button.active { background-color: #4CAF50; color: white; }
+        .error-line { background-color: #fff; padding: 15px; border-radius: 5px; margin-bottom: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        .line-number { font-weight: bold; color: #4CAF50; font-size: 1.2em; }
+        .line-text { background-color: #f9f9f9; padding: 10px; border-left: 3px solid #4CAF50; margin: 10px 0; font-family: monospace; white-space: pre-wrap; }
+        .error-item { margin: 10px 0; padding: 10px; border-left: 3px solid #ff9800; background-color: #fff8f0; }
+        .error-type { font-weight: bold; color: #d84315; margin-bottom: 10px; }
+        .error-message { font-weight: bold; color: #555; }
+        .context { color: #666; font-family: monospace; font-size: 0.9em; }
+        .severity-high { border-left-color: #d32f2f; }
+        .severity-medium { border-left-color: #ff9800; }
+        .severity-low { border-left-color: #ffc107; }
+    </style>
+</head>
+<body>
+    <h1>Error Detection Report</h1>
+    <div class="panel" id="metadata"></div>
+    <div class="panel"><h2>Error Summary</h2><table id="summary"></table></div>
+    <h2>Detailed Errors</h2>
+    <div class="panel nav" id="nav"></div>
+    <div id="page"></div>
+    <script>
+    const report = __SUMMARY_JSON__;
+    const titles = {grammar_punctuation: 'Grammar/Punctuation', mathematical: 'Mathematical', turkish: 'Turkish-specific', spacing: 'Spacing'};
+
+    function el(tag, cls, text) {
+        const node = document.createElement(tag);
+        if (cls) node.className = cls;
+        if (text !== undefined) node.textContent = text;
+        return node;
+    }
+
+    function renderHeader() {
+        const meta = document.getElementById('metadata');
+        [['File', report.file_path], ['Analysis Date', report.analysis_date], ['Total Lines', report.total_lines],
+         ['Lines with Errors', report.lines_with_errors], ['Total Errors', report.total_errors]].forEach(([k, v]) => {
+            const p = el('p');
+            p.appendChild(el('strong', null, k + ': '));
+            p.appendChild(document.createTextNode(v));
+            meta.appendChild(p);
+        });
+        const table = document.getElementById('summary');
+        const head = el('tr');
+        head.appendChild(el('th', null, 'Error Type'));
+        head.appendChild(el('th', null, 'Count'));
+        table.appendChild(head);
+        Object.keys(titles).forEach(key => {
+            const row = el('tr');
+            row.appendChild(el('td', null, titles[key]));
+            row.appendChild(el('td', null, report.error_summary[key] || 0));
+            table.appendChild(row);
+        });
+        const nav = document.getElementById('nav');
+        report.pages.forEach(page => {
+            const button = el('button', null, 'Lines ' + page.first_line + '-' + page.last_line + ' (' + page.error_count + ')');
+            button.id = 'nav-' + page.page;
+            button.onclick = () => loadPage(page.page);
+            nav.appendChild(button);
+        });
+    }
+
+    function renderLine(line) {
+        const box = el('div', 'error-line');
+        box.appendChild(el('div', 'line-number', 'Line ' + line.line_number));
+        box.appendChild(el('div', 'line-text', line.text));
+        Object.keys(line.errors).forEach(type => {
+            const errors = line.errors[type];
+            if (!errors.length) return;
+            box.appendChild(el('div', 'error-type', (titles[type] || type) + ' Errors'));
+            errors.forEach(error => {
+                const item = el('div', 'error-item severity-' + (error.severity || 'medium'));
+                item.appendChild(el('div', 'error-message', error.message));
+                item.appendChild(el('div', 'context', 'Context: ' + (error.context || 'N/A')));
+                if (error.suggestions && error.suggestions.length) {
+                    item.appendChild(el('div', null, 'Suggestions: ' + error.suggestions.join(', ')));
+                }
+                box.appendChild(item);
+            });
+        });
+        return box;
+    }
+
+    function loadPage(number) {
+        const page = report.pages[number - 1];
+        const target = document.getElementById('page');
+        document.querySelectorAll('.nav button').forEach(b => b.classList.remove('active'));
+        document.getElementById('nav-' + number).classList.add('active');
+        target.textContent = 'Loading...';
+        fetch(page.chunk)
+            .then(response => response.json())
+            .then(chunk => {
+                target.textContent = '';
+                chunk.lines.forEach(line => target.appendChild(renderLine(line)));
+            })
+            .catch(() => {
+                target.textContent = 'Could not load ' + page.chunk + '. Browsers block local file access; serve this directory with "python -m http.server" and open it over HTTP.';
+            });
+    }
+
+    renderHeader();
+    if (report.pages.length) loadPage(1);
+    </script>
+</body>
+</html>
+"""
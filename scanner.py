@@ -5,12 +5,26 @@ Main script for scanning PDF and text files and detecting errors.
 import os
 import sys
 import json
+import time
+import socket
 import argparse
+import threading
+import multiprocessing
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
-from pdf_extractor import PDFExtractor
-from error_detector import ErrorDetector
+from typing import List, Dict, Any, Optional
+from pdf_extractor import LAYOUTS, PDFExtractor
+from error_detector import RULESET_VERSION, ErrorDetector
+from error_store import CATEGORIES, ErrorStore
+from memory_profile import MemoryProfiler, format_memory_profile
+from metrics import MetricsExporter, ScanMetrics
+from checkpoint import checkpoint_path, file_fingerprint, open_checkpoint
+from page_selection import estimate_error_rates, parse_page_ranges, parse_page_spec, stratified_sample
+from report_formats import REPORT_FORMATS, ReportReader, compression_suffix, find_report_files, open_text_output, resolve_format, write_report
+from text_analyzer import TextAnalyzer
+from time_budget import BudgetedScan, format_coverage
+from tracing import start_tracing, stop_tracing
+from work_queue import WorkQueue
 
 try:
     from tqdm import tqdm
@@ -20,7 +34,10 @@ except ImportError:
     print("Warning: tqdm not available. Install with 'pip install tqdm' for progress bars.")
 
 
-def scan_text_file(file_path: str, output_dir: str = 'error_reports', enable_grammar: bool = True, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def scan_text_file(file_path: str, output_dir: str = 'error_reports', enable_grammar: bool = True, config: Optional[Dict[str, Any]] = None,
+                   resume: bool = False, checkpoint_interval: float = 30.0,
+                   time_budget: Optional[float] = None, metrics: Optional[ScanMetrics] = None,
+                   memprofile: bool = False, report_format: str = 'json') -> Dict[str, Any]:
     """
     Scan a text file for errors line by line.
     
@@ -29,6 +46,13 @@ def scan_text_file(file_path: str, output_dir: str = 'error_reports', enable_gra
         output_dir: Directory to save error reports
         enable_grammar: Whether to enable grammar checking
         config: Optional configuration dictionary
+        resume: Whether to continue from the last checkpoint of this file
+        checkpoint_interval: Seconds between checkpoints
+        time_budget: Seconds to spend checking; cheap, high-severity checks run
+            over the whole file first and grammar checking fills the rest
+        metrics: Optional live metrics updated as lines are checked
+        memprofile: Whether to record memory per stage in results['memory_profile']
+        report_format: Format of the report file (one of REPORT_FORMATS)
         
     Returns:
         Dictionary containing scan results
@@ -37,10 +61,16 @@ def scan_text_file(file_path: str, output_dir: str = 'error_reports', enable_gra
     print(f"Scanning Text File: {file_path}")
     print(f"{'='*60}\n")
     
+    profiler = MemoryProfiler() if memprofile else None
+    if profiler is not None:
+        profiler.mark('setup')
+    
     # Initialize detector
-    detector = ErrorDetector(enable_grammar_check=enable_grammar, enable_turkish=True, config=config)
+    detector = ErrorDetector(enable_grammar_check=enable_grammar, enable_turkish=True, config=config, metrics=metrics)
     
     # Read file
+    if profiler is not None:
+        profiler.mark('read')
     with open(file_path, 'r', encoding='utf-8') as f:
         lines = f.readlines()
     
@@ -49,62 +79,104 @@ def scan_text_file(file_path: str, output_dir: str = 'error_reports', enable_gra
     
     if total_lines == 0:
         print("Error: File is empty.")
+        if profiler is not None:
+            profiler.finish()
         return None
     
+    # Restore finished lines from the checkpoint when resuming
+    checkpoint, scan_date, restored_lines, start_line = open_checkpoint(
+        checkpoint_path(output_dir, file_path),
+        file_fingerprint(file_path, enable_grammar=enable_grammar, config=config, time_budget=time_budget),
+        resume, checkpoint_interval
+    )
+    
     # Scan results
     results = {
         'file': file_path,
-        'scan_date': datetime.now().isoformat(),
+        'scan_date': scan_date,
         'total_lines': total_lines,
-        'lines_with_errors': []
+        'lines_with_errors': restored_lines
     }
     
     total_errors = 0
-    error_summary = {
-        'grammar_punctuation': 0,
-        'mathematical': 0,
-        'turkish': 0,
-        'spacing': 0
-    }
+    store = ErrorStore()
+    for line_data in restored_lines:
+        total_errors += line_data['error_count']
+        store.add_errors(line_data['errors'], line=line_data['line_number'])
     
     # Prepare iterator with optional progress bar
+    if profiler is not None:
+        profiler.mark('checking')
+    remaining_lines = enumerate(lines[start_line - 1:], start=start_line)
+    if metrics is not None:
+        metrics.start_file(file_path, 'line', total_lines - start_line + 1)
+    budget = None
+    if time_budget is not None:
+        # Check all remaining lines category by category, most important first, until the deadline
+        budget = BudgetedScan(detector, time_budget, unit='line').run(
+            ((line_num, line_text.rstrip('\n')) for line_num, line_text in remaining_lines),
+            total=total_lines - start_line + 1
+        )
+        remaining_lines = enumerate(lines[start_line - 1:], start=start_line)
     if TQDM_AVAILABLE:
-        line_iterator = tqdm(enumerate(lines, start=1), total=total_lines, desc="Scanning lines")
+        line_iterator = tqdm(remaining_lines, total=total_lines, initial=start_line - 1, desc="Scanning lines")
     else:
-        line_iterator = enumerate(lines, start=1)
+        line_iterator = remaining_lines
     
     # Scan each line
-    for line_num, line_text in line_iterator:
-        line_text = line_text.rstrip('\n')
-        
-        if not line_text.strip():
-            continue
-        
-        # Detect errors
-        errors = detector.check_all_errors(line_text)
-        
-        # Count total errors for this line
-        line_error_count = sum(len(errs) for errs in errors.values())
-        
-        if line_error_count > 0:
-            total_errors += line_error_count
+    next_line = start_line
+    try:
+        for line_num, line_text in line_iterator:
+            checkpoint.maybe_commit(line_num)
+            next_line = line_num
+            line_text = line_text.rstrip('\n')
+            
+            if not line_text.strip():
+                if metrics is not None:
+                    metrics.observe_line({})
+                continue
+            
+            # Detect errors
+            errors = budget.errors(line_num) if budget is not None else detector.check_all_errors(line_text)
+            if metrics is not None:
+                metrics.observe_line(errors)
             
-            # Update summary
-            error_summary['grammar_punctuation'] += len(errors.get('grammar_punctuation', []))
-            error_summary['mathematical'] += len(errors.get('mathematical', []))
-            error_summary['turkish'] += len(errors.get('turkish', []))
-            error_summary['spacing'] += len(errors.get('spacing', []))
+            # Count total errors for this line
+            line_error_count = sum(len(errs) for errs in errors.values())
             
-            # Store line results
-            results['lines_with_errors'].append({
-                'line_number': line_num,
-                'text': line_text,
-                'errors': errors,
-                'error_count': line_error_count
-            })
+            if line_error_count > 0:
+                total_errors += line_error_count
+                store.add_errors(errors, line=line_num)
+                
+                # Store line results
+                line_data = {
+                    'line_number': line_num,
+                    'text': line_text,
+                    'errors': errors,
+                    'error_count': line_error_count
+                }
+                results['lines_with_errors'].append(line_data)
+                checkpoint.add(line_data)
+                next_line = line_num + 1
+    except BaseException:
+        # Keep the finished lines for --resume
+        checkpoint.commit(next_line)
+        checkpoint.close()
+        raise
     
+    # Summaries come from grouped queries over the error store
+    if profiler is not None:
+        profiler.mark('summaries')
+    error_summary = store.error_summary()
     results['total_errors'] = total_errors
     results['error_summary'] = error_summary
+    results['severity_summary'] = store.severity_summary()
+    results['top_rules'] = store.top_rules()
+    results['cache_stats'] = detector.cache_stats()
+    results['line_classes'] = dict(detector.class_counts)
+    if budget is not None:
+        results['time_budget'] = budget.coverage()
+    store.close()
     
     # Clean up
     detector.close()
@@ -116,15 +188,24 @@ def scan_text_file(file_path: str, output_dir: str = 'error_reports', enable_gra
     print(f"  - Mathematical: {error_summary['mathematical']}")
     print(f"  - Turkish-specific: {error_summary['turkish']}")
     print(f"  - Spacing: {error_summary['spacing']}")
+    print(f"Repeated-line cache hit rate: {results['cache_stats']['hit_rate']:.1%}")
+    if 'time_budget' in results:
+        print_coverage(results['time_budget'])
     print(f"{'='*60}\n")
     
     # Save report
-    save_report(results, output_dir, is_text_file=True)
+    save_report(results, output_dir, is_text_file=True, profiler=profiler, report_format=report_format)
+    checkpoint.remove()
     
     return results
 
 
-def scan_pdf(pdf_path: str, output_dir: str = 'error_reports', enable_grammar: bool = True, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def scan_pdf(pdf_path: str, output_dir: str = 'error_reports', enable_grammar: bool = True, config: Optional[Dict[str, Any]] = None,
+             resume: bool = False, checkpoint_interval: float = 30.0, layout: str = 'plain',
+             previous: Optional[str] = None, pages: Optional[str] = None,
+             sample: Optional[int] = None, seed: int = 0,
+             time_budget: Optional[float] = None, metrics: Optional[ScanMetrics] = None,
+             memprofile: bool = False, report_format: str = 'json') -> Dict[str, Any]:
     """
     Scan a PDF file for errors page by page.
     
@@ -133,6 +214,21 @@ def scan_pdf(pdf_path: str, output_dir: str = 'error_reports', enable_grammar: b
         output_dir: Directory to save error reports
         enable_grammar: Whether to enable grammar checking
         config: Optional configuration dictionary
+        resume: Whether to continue from the last checkpoint of this file
+        checkpoint_interval: Seconds between checkpoints
+        layout: PDF text layout ('plain' or 'columns' for multi-column pages)
+        previous: Earlier JSON report of this PDF (or a directory of reports);
+            results of pages whose content is unchanged are reused
+        pages: Pages to scan, e.g. "120-180,300" (default: all pages)
+        sample: Scan only this many pages, drawn at random from evenly sized
+            parts of the document, and estimate document-wide error rates
+        seed: Random seed for the sample
+        time_budget: Seconds to spend extracting and checking pages; cheap,
+            high-severity checks run over all pages first and grammar checking
+            fills the rest
+        metrics: Optional live metrics updated as pages are checked
+        memprofile: Whether to record memory per stage in results['memory_profile']
+        report_format: Format of the report file (one of REPORT_FORMATS)
         
     Returns:
         Dictionary containing scan results
@@ -141,85 +237,179 @@ def scan_pdf(pdf_path: str, output_dir: str = 'error_reports', enable_grammar: b
     print(f"Scanning PDF: {pdf_path}")
     print(f"{'='*60}\n")
     
+    profiler = MemoryProfiler() if memprofile else None
+    if profiler is not None:
+        profiler.mark('setup')
+    
     # Initialize extractor and detector
-    extractor = PDFExtractor(pdf_path)
-    detector = ErrorDetector(enable_grammar_check=enable_grammar, enable_turkish=True, config=config)
+    extractor = PDFExtractor(pdf_path, layout)
+    detector = ErrorDetector(enable_grammar_check=enable_grammar, enable_turkish=True, config=config, metrics=metrics)
     
     # Get page count
+    if profiler is not None:
+        profiler.mark('open')
     page_count = extractor.get_page_count()
     print(f"Total pages: {page_count}\n")
     
     if page_count == 0:
         print("Error: Could not read PDF or PDF is empty.")
+        if profiler is not None:
+            profiler.finish()
         return None
     
+    # Select the pages to scan: a page range, a stratified sample or the whole document
+    selected = None
+    if pages:
+        try:
+            selected = parse_page_ranges(pages, page_count)
+        except ValueError as e:
+            # A selection past the end of a short PDF skips it; directory scans go on
+            print(f"Skipping {pdf_path}: {e}")
+            detector.close()
+            if profiler is not None:
+                profiler.finish()
+            return None
+    elif sample:
+        selected = stratified_sample(page_count, sample, seed)
+    if selected is not None:
+        print(f"Selected pages: {len(selected)} of {page_count}\n")
+    
+    # Restore finished pages from the checkpoint when resuming
+    checkpoint, scan_date, restored_pages, start_page = open_checkpoint(
+        checkpoint_path(output_dir, pdf_path),
+        file_fingerprint(pdf_path, enable_grammar=enable_grammar, config=config, layout=layout,
+                         pages=pages, sample=sample, seed=seed, time_budget=time_budget),
+        resume, checkpoint_interval
+    )
+    
     # Scan results
     results = {
         'pdf_file': pdf_path,
-        'scan_date': datetime.now().isoformat(),
+        'scan_date': scan_date,
         'total_pages': page_count,
-        'pages': []
+        'pages': restored_pages
     }
     
     total_errors = 0
+    store = ErrorStore()
+    for page_result in restored_pages:
+        total_errors += page_result['total_errors']
+        store.add_errors(page_result['errors'], page=page_result['page_number'])
     
-    # Extract and check each page
-    pages_data = extractor.extract_all_pages()
+    page_numbers = selected if selected is not None else list(range(1, page_count + 1))
+    remaining = [page_num for page_num in page_numbers if page_num >= start_page]
     
-    # Prepare iterator with optional progress bar
-    if TQDM_AVAILABLE:
-        page_iterator = tqdm(pages_data, desc="Scanning pages")
-    else:
-        page_iterator = pages_data
+    # Fingerprint pages from their raw content streams and reuse results of unchanged pages
+    if profiler is not None:
+        profiler.mark('fingerprints')
+    fingerprints = extractor.page_fingerprints(_page_fingerprint_salt(enable_grammar, layout, config), remaining)
+    previous_pages = load_previous_pages(previous, pdf_path) if previous else {}
+    reused = {}
+    for page_num in remaining:
+        fingerprint = fingerprints.get(page_num)
+        if fingerprint is not None and fingerprint in previous_pages:
+            reused[page_num] = previous_pages[fingerprint]
+    if previous_pages:
+        print(f"Reusing results of {len(reused)} unchanged page(s)\n")
+    if metrics is not None:
+        metrics.start_file(pdf_path, 'page', len(remaining) - len(reused))
     
-    for page_data in page_iterator:
-        page_num = page_data['page_number']
-        text = page_data['text']
+    next_page = start_page
+    budget = None
+    try:
+        # Extract and check each remaining page that changed; only those pages are loaded
+        if profiler is not None:
+            profiler.mark('extraction')
+        if time_budget is not None:
+            # Pages are extracted as the first phase reaches them, so extraction counts
+            # against the budget; pages not reached before the deadline are left out
+            to_check = [page_num for page_num in remaining if page_num not in reused]
+            budget = BudgetedScan(detector, time_budget, unit='page').run(
+                ((page_data['page_number'], page_data['text']) for page_data in extractor.iter_pages(to_check)),
+                total=len(to_check)
+            )
+            fully_checked = budget.fully_checked()
+            pages_data = [{'page_number': page_num, 'text': text} for page_num, text in budget.units]
+            pages_data.extend({'page_number': page_num} for page_num in reused)
+            pages_data.sort(key=lambda page_data: page_data['page_number'])
+        elif selected is None and start_page == 1 and not reused:
+            pages_data = extractor.extract_all_pages()
+        else:
+            pages_data = extractor.extract_pages(
+                [page_num for page_num in remaining if page_num not in reused]
+            )
+            pages_data.extend({'page_number': page_num} for page_num in reused)
+            pages_data.sort(key=lambda page_data: page_data['page_number'])
         
-        if not TQDM_AVAILABLE:
-            print(f"Scanning page {page_num}...")
+        # Prepare iterator with optional progress bar
+        if profiler is not None:
+            profiler.mark('checking')
+        if TQDM_AVAILABLE:
+            page_iterator = tqdm(pages_data, total=len(page_numbers), initial=len(page_numbers) - len(remaining),
+                                 desc="Scanning pages")
+        else:
+            page_iterator = pages_data
         
-        if not text or not text.strip():
+        for page_data in page_iterator:
+            page_num = page_data['page_number']
+            checkpoint.maybe_commit(page_num)
+            
+            if page_num in reused:
+                if not TQDM_AVAILABLE:
+                    print(f"Reusing page {page_num} (unchanged)...")
+                page_result = dict(reused[page_num], page_number=page_num, reused=True)
+            else:
+                if not TQDM_AVAILABLE:
+                    print(f"Scanning page {page_num}...")
+                page_result = check_page(detector, page_data,
+                                         budget.errors(page_num) if budget is not None else None)
+            # Pages the budget cut short keep no fingerprint, so a later --previous run checks them again
+            if page_num in fingerprints and (budget is None or page_num in reused or page_num in fully_checked):
+                page_result['fingerprint'] = fingerprints[page_num]
+            results['pages'].append(page_result)
+            checkpoint.add(page_result)
+            next_page = page_num + 1
+            
+            if 'note' in page_result:
+                if not TQDM_AVAILABLE:
+                    print(f"  Warning: Page {page_num} is empty or could not be extracted.")
+                continue
+            
+            errors = page_result['errors']
+            page_error_count = page_result['total_errors']
+            total_errors += page_error_count
+            store.add_errors(errors, page=page_num)
+            
             if not TQDM_AVAILABLE:
-                print(f"  Warning: Page {page_num} is empty or could not be extracted.")
-            results['pages'].append({
-                'page_number': page_num,
-                'text_length': 0,
-                'errors': {},
-                'total_errors': 0,
-                'note': 'Empty or unreadable page'
-            })
-            continue
-        
-        # Detect errors
-        errors = detector.check_all_errors(text)
-        
-        # Count total errors for this page
-        page_error_count = (
-            len(errors.get('grammar_punctuation', [])) + 
-            len(errors.get('mathematical', [])) +
-            len(errors.get('turkish', [])) +
-            len(errors.get('spacing', []))
-        )
-        
-        total_errors += page_error_count
-        
-        if not TQDM_AVAILABLE:
-            print(f"  Found {page_error_count} error(s)")
-            print(f"    - Grammar/Punctuation: {len(errors.get('grammar_punctuation', []))}")
-            print(f"    - Mathematical: {len(errors.get('mathematical', []))}")
-            print(f"    - Turkish-specific: {len(errors.get('turkish', []))}")
-            print(f"    - Spacing: {len(errors.get('spacing', []))}")
-        
-        # Store page results
-        results['pages'].append({
-            'page_number': page_num,
-            'text_length': len(text),
-            'errors': errors,
-            'total_errors': page_error_count
-        })
+                print(f"  Found {page_error_count} error(s)")
+                print(f"    - Grammar/Punctuation: {len(errors.get('grammar_punctuation', []))}")
+                print(f"    - Mathematical: {len(errors.get('mathematical', []))}")
+                print(f"    - Turkish-specific: {len(errors.get('turkish', []))}")
+                print(f"    - Spacing: {len(errors.get('spacing', []))}")
+    except BaseException:
+        # Keep the finished pages for --resume
+        checkpoint.commit(next_page)
+        checkpoint.close()
+        raise
     
+    if profiler is not None:
+        profiler.mark('summaries')
     results['total_errors'] = total_errors
+    results['error_summary'] = store.error_summary()
+    results['severity_summary'] = store.severity_summary()
+    results['top_rules'] = store.top_rules()
+    results['errors_per_page'] = store.page_histogram()
+    results['cache_stats'] = detector.cache_stats()
+    results['line_classes'] = dict(detector.class_counts)
+    results['reused_pages'] = [page['page_number'] for page in results['pages'] if page.get('reused')]
+    if budget is not None:
+        results['time_budget'] = budget.coverage()
+    if selected is not None:
+        results['selected_pages'] = selected
+    if sample and selected is not None:
+        results['sample'] = {'size': len(selected), 'seed': seed}
+        results['estimate'] = estimate_error_rates(results['pages'], page_count, CATEGORIES)
+    store.close()
     
     # Clean up
     detector.close()
@@ -227,15 +417,137 @@ def scan_pdf(pdf_path: str, output_dir: str = 'error_reports', enable_grammar: b
     print(f"\n{'='*60}")
     print(f"Scan Complete!")
     print(f"Total errors found: {total_errors}")
+    if results['reused_pages']:
+        print(f"Pages reused from the earlier report: {len(results['reused_pages'])} of {page_count}")
+    if 'estimate' in results:
+        _print_estimate(results['estimate'])
+    if 'time_budget' in results:
+        print_coverage(results['time_budget'])
     print(f"{'='*60}\n")
     
     # Save report
-    save_report(results, output_dir, is_text_file=False)
+    save_report(results, output_dir, is_text_file=False, profiler=profiler, report_format=report_format)
+    checkpoint.remove()
     
     return results
 
 
-def save_report(results: Dict[str, Any], output_dir: str, is_text_file: bool = False):
+def _format_estimate(estimate: Dict[str, Any]) -> List[str]:
+    """Format a sample error-rate estimate as report lines."""
+    per_page = estimate['errors_per_page']
+    total = estimate['estimated_total_errors']
+    share = estimate['share_of_pages_with_errors']
+    confidence = f"{estimate['confidence']:.0%} CI"
+    return [
+        f"Sampled pages: {estimate['sampled_pages']} of {estimate['total_pages']}",
+        f"Errors per page: {per_page['mean']:.2f} ({confidence} {per_page['low']:.2f}-{per_page['high']:.2f})",
+        f"Estimated total errors: {total['mean']:.0f} ({confidence} {total['low']:.0f}-{total['high']:.0f})",
+        f"Pages with errors: {share['mean']:.0%} ({confidence} {share['low']:.0%}-{min(share['high'], 1.0):.0%})",
+    ]
+
+
+def _print_estimate(estimate: Dict[str, Any]):
+    """Print a sample error-rate estimate."""
+    print("Sample estimate for the whole document:")
+    for line in _format_estimate(estimate):
+        print(f"  {line}")
+
+
+def print_coverage(coverage: Dict[str, Any]):
+    """
+    Print which checks a time-budgeted scan covered.
+    
+    Args:
+        coverage: Coverage dictionary from results['time_budget']
+    """
+    state = 'deadline reached' if coverage['deadline_reached'] else 'all checks complete'
+    print(f"Time budget: {coverage['elapsed']:g}s of {coverage['seconds']:g}s ({state})")
+    for line in format_coverage(coverage):
+        print(f"  - {line}")
+
+
+def _page_fingerprint_salt(enable_grammar: bool, layout: str, config: Optional[Dict[str, Any]]) -> str:
+    """Describe the scan options that page results depend on, for mixing into page fingerprints."""
+    options = {'ruleset': RULESET_VERSION, 'enable_grammar': enable_grammar, 'layout': layout, 'config': config}
+    return json.dumps(options, sort_keys=True, default=str)
+
+
+def load_previous_pages(previous: str, pdf_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Index the pages of an earlier PDF report by page fingerprint.
+    
+    Args:
+        previous: Earlier report (in any of REPORT_FORMATS), or a directory of
+            reports in which the newest report of pdf_path is used
+        pdf_path: Path to the PDF file being scanned
+        
+    Returns:
+        Dictionary mapping page fingerprints to page result entries
+    """
+    report_path = Path(previous)
+    if report_path.is_dir():
+        # Report names end in a sortable timestamp
+        reports = find_report_files(report_path, Path(pdf_path).stem)
+        if not reports:
+            print(f"Warning: No earlier report of {pdf_path} in {previous}")
+            return {}
+        report_path = reports[-1]
+    
+    pages = {}
+    try:
+        with ReportReader(report_path) as reader:
+            for key, page in reader.entries():
+                if key == 'pages' and page.get('fingerprint'):
+                    pages.setdefault(page['fingerprint'], page)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read earlier report '{report_path}': {e}")
+        return {}
+    print(f"Loaded {len(pages)} page fingerprint(s) from {report_path}")
+    return pages
+
+
+def check_page(detector: ErrorDetector, page_data: Dict[str, Any],
+               errors: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Check the text of one PDF page for errors.
+    
+    Args:
+        detector: Error detector to use
+        page_data: Dictionary with page_number and text
+        errors: Errors already found in the page (e.g. by a budgeted scan);
+            the page is not checked again
+        
+    Returns:
+        Page result entry as stored in results['pages']
+    """
+    page_num = page_data['page_number']
+    text = page_data['text']
+    
+    if not text or not text.strip():
+        return {
+            'page_number': page_num,
+            'text_length': 0,
+            'errors': {},
+            'total_errors': 0,
+            'note': 'Empty or unreadable page'
+        }
+    
+    # Detect errors
+    if errors is None:
+        errors = detector.check_all_errors(text)
+    if detector.metrics is not None:
+        detector.metrics.observe_page(errors)
+    
+    return {
+        'page_number': page_num,
+        'text_length': len(text),
+        'errors': errors,
+        'total_errors': sum(len(errs) for errs in errors.values())
+    }
+
+
+def save_report(results: Dict[str, Any], output_dir: str, is_text_file: bool = False,
+                profiler: Optional[MemoryProfiler] = None, report_format: str = 'json'):
     """
     Save error report to a JSON file.
     
@@ -243,7 +555,15 @@ def save_report(results: Dict[str, Any], output_dir: str, is_text_file: bool = F
         results: Scan results dictionary
         output_dir: Directory to save the report
         is_text_file: Whether the scan was for a text file (vs PDF)
+        profiler: Memory profiler of the scan; report writing is profiled as
+            the last stage and the profile is added to the JSON report
+        report_format: Format of the report file (one of REPORT_FORMATS);
+            compressed and binary reports are read back with report_formats.load_report,
+            and the text summary is compressed the same way
     """
+    if profiler is not None:
+        profiler.mark('report')
+    
     # Create output directory if it doesn't exist
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
@@ -254,20 +574,20 @@ def save_report(results: Dict[str, Any], output_dir: str, is_text_file: bool = F
         file_name = Path(results['pdf_file']).stem
     
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    report_filename = f"{file_name}_errors_{timestamp}.json"
+    report_format = resolve_format(report_format)
+    report_filename = f"{file_name}_errors_{timestamp}.{report_format}"
     report_path = Path(output_dir) / report_filename
     
     # Save report
-    with open(report_path, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    write_report(results, report_path, report_format)
     
     print(f"Report saved to: {report_path}")
     
     # Also create a human-readable summary
-    summary_filename = f"{file_name}_summary_{timestamp}.txt"
+    summary_filename = f"{file_name}_summary_{timestamp}.txt{compression_suffix(report_format)}"
     summary_path = Path(output_dir) / summary_filename
     
-    with open(summary_path, 'w', encoding='utf-8') as f:
+    with open_text_output(summary_path, report_format) as f:
         f.write(f"Error Detection Report\n")
         f.write(f"{'='*60}\n\n")
         
@@ -277,6 +597,9 @@ def save_report(results: Dict[str, Any], output_dir: str, is_text_file: bool = F
             f.write(f"Total Lines: {results['total_lines']}\n")
             f.write(f"Total Errors: {results['total_errors']}\n\n")
             
+            if 'time_budget' in results:
+                _write_coverage_to_summary(f, results['time_budget'])
+            
             if 'error_summary' in results:
                 f.write(f"Error Summary:\n")
                 f.write(f"  - Grammar/Punctuation: {results['error_summary']['grammar_punctuation']}\n")
@@ -295,8 +618,21 @@ def save_report(results: Dict[str, Any], output_dir: str, is_text_file: bool = F
             f.write(f"PDF File: {results['pdf_file']}\n")
             f.write(f"Scan Date: {results['scan_date']}\n")
             f.write(f"Total Pages: {results['total_pages']}\n")
+            if results.get('reused_pages'):
+                f.write(f"Reused Pages: {', '.join(str(page) for page in results['reused_pages'])}\n")
+            if 'selected_pages' in results:
+                f.write(f"Scanned Pages: {len(results['selected_pages'])}\n")
             f.write(f"Total Errors: {results['total_errors']}\n\n")
             
+            if 'time_budget' in results:
+                _write_coverage_to_summary(f, results['time_budget'])
+            
+            if 'estimate' in results:
+                f.write("Sample Estimate for the Whole Document:\n")
+                for line in _format_estimate(results['estimate']):
+                    f.write(f"  - {line}\n")
+                f.write("\n")
+            
             for page in results['pages']:
                 if page['total_errors'] > 0:
                     f.write(f"\nPage {page['page_number']} - {page['total_errors']} error(s)\n")
@@ -305,6 +641,29 @@ def save_report(results: Dict[str, Any], output_dir: str, is_text_file: bool = F
                     _write_errors_to_summary(f, page['errors'])
     
     print(f"Summary saved to: {summary_path}")
+    
+    if profiler is not None:
+        # The profile includes writing the report, so the report is written again with it
+        results['memory_profile'] = profiler.finish()
+        write_report(results, report_path, report_format)
+        print("Memory profile:")
+        for line in format_memory_profile(results['memory_profile']):
+            print(f"  - {line}")
+
+
+def _write_coverage_to_summary(f, coverage: Dict[str, Any]):
+    """
+    Write the coverage of a time-budgeted scan to the summary file.
+    
+    Args:
+        f: File handle
+        coverage: Coverage dictionary from results['time_budget']
+    """
+    state = 'deadline reached' if coverage['deadline_reached'] else 'all checks complete'
+    f.write(f"Time Budget: {coverage['elapsed']:g}s of {coverage['seconds']:g}s ({state})\n")
+    for line in format_coverage(coverage):
+        f.write(f"  - {line}\n")
+    f.write("\n")
 
 
 def _write_errors_to_summary(f, errors: Dict[str, Any]):
@@ -357,7 +716,12 @@ def _write_errors_to_summary(f, errors: Dict[str, Any]):
             f.write(f"\n")
 
 
-def scan_directory(directory: str, output_dir: str = 'error_reports', enable_grammar: bool = True, scan_text: bool = False, config: Optional[Dict[str, Any]] = None):
+def scan_directory(directory: str, output_dir: str = 'error_reports', enable_grammar: bool = True, scan_text: bool = False, config: Optional[Dict[str, Any]] = None,
+                   resume: bool = False, checkpoint_interval: float = 30.0, layout: str = 'plain',
+                   previous: Optional[str] = None, pages: Optional[str] = None,
+                   sample: Optional[int] = None, seed: int = 0, time_budget: Optional[float] = None,
+                   metrics: Optional[ScanMetrics] = None, memprofile: bool = False,
+                   report_format: str = 'json'):
     """
     Scan all PDF or text files in a directory.
     
@@ -367,6 +731,17 @@ def scan_directory(directory: str, output_dir: str = 'error_reports', enable_gra
         enable_grammar: Whether to enable grammar checking
         scan_text: Whether to scan text files instead of PDFs
         config: Optional configuration dictionary
+        resume: Whether to skip finished files and resume the interrupted one
+        checkpoint_interval: Seconds between checkpoints within a file
+        layout: PDF text layout ('plain' or 'columns' for multi-column pages)
+        previous: Directory of earlier reports whose unchanged PDF pages are reused
+        pages: Pages to scan in each PDF, e.g. "1-20" (default: all pages)
+        sample: Number of pages to sample from each PDF for error-rate estimates
+        seed: Random seed for the samples
+        time_budget: Seconds to spend checking each file
+        metrics: Optional live metrics updated as files are scanned
+        memprofile: Whether to record memory per stage in each report
+        report_format: Format of the report files (one of REPORT_FORMATS)
     """
     if scan_text:
         files = list(Path(directory).glob('*.txt'))
@@ -381,12 +756,276 @@ def scan_directory(directory: str, output_dir: str = 'error_reports', enable_gra
     
     print(f"Found {len(files)} {file_type} file(s) to scan\n")
     
-    for file_path in files:
-        if scan_text:
-            scan_text_file(str(file_path), output_dir, enable_grammar, config)
-        else:
-            scan_pdf(str(file_path), output_dir, enable_grammar, config)
-        print()
+    # The directory checkpoint records finished files; each file has its own checkpoint
+    fingerprint = {
+        'directory': str(Path(directory).resolve()),
+        'files': sorted(file_path.name for file_path in files),
+        'scan_text': scan_text,
+        'enable_grammar': enable_grammar,
+        'layout': layout,
+        'pages': pages,
+        'sample': sample,
+        'seed': seed,
+        'time_budget': time_budget,
+        'config': config
+    }
+    checkpoint, _, finished, _ = open_checkpoint(
+        checkpoint_path(output_dir, directory), fingerprint, resume, start=0
+    )
+    finished_files = {entry['file'] for entry in finished}
+    
+    try:
+        for file_path in files:
+            if file_path.name in finished_files:
+                print(f"Skipping {file_path} (already scanned)\n")
+                continue
+            
+            if scan_text:
+                scan_text_file(str(file_path), output_dir, enable_grammar, config, resume, checkpoint_interval,
+                               time_budget, metrics, memprofile, report_format)
+            else:
+                scan_pdf(str(file_path), output_dir, enable_grammar, config, resume, checkpoint_interval, layout,
+                         previous, pages, sample, seed, time_budget, metrics, memprofile, report_format)
+            print()
+            
+            finished_files.add(file_path.name)
+            checkpoint.add({'file': file_path.name})
+            checkpoint.commit(len(finished_files))
+    finally:
+        checkpoint.close()
+    
+    checkpoint.remove()
+
+
+def enqueue_scan(queue_path: str, files: List[str], scan_text: bool = False, pages_per_unit: int = 50) -> int:
+    """
+    Add files to a shared work queue.
+    
+    Args:
+        queue_path: Path to the SQLite queue file
+        files: Files to scan
+        scan_text: Whether to treat all files as text files
+        pages_per_unit: Number of PDF pages per work unit (0 for whole files)
+        
+    Returns:
+        Number of work units added
+    """
+    queue = WorkQueue(queue_path)
+    added = 0
+    
+    try:
+        for file_path in files:
+            # Workers on other hosts need the same absolute path on shared storage
+            path = str(Path(file_path).resolve())
+            
+            if scan_text or path.endswith('.txt'):
+                queue.add_unit(path, 'text')
+                added += 1
+                continue
+            
+            page_count = PDFExtractor(path).get_page_count()
+            if page_count == 0:
+                print(f"Warning: Skipping '{path}' (could not read PDF or PDF is empty)")
+                continue
+            
+            step = pages_per_unit if pages_per_unit > 0 else page_count
+            for first_page in range(1, page_count + 1, step):
+                last_page = min(first_page + step - 1, page_count)
+                queue.add_unit(path, 'pdf', first_page, last_page, page_count)
+                added += 1
+    finally:
+        queue.close()
+    
+    print(f"Queued {added} work unit(s) in {queue_path}")
+    return added
+
+
+def _heartbeat_loop(queue_path: str, unit_id: int, worker_id: str, interval: float, stop: threading.Event):
+    """Send heartbeats for a unit until stopped (runs in a background thread)."""
+    queue = WorkQueue(queue_path)
+    try:
+        while not stop.wait(interval):
+            queue.heartbeat(unit_id, worker_id)
+    finally:
+        queue.close()
+
+
+def process_unit(unit: Dict[str, Any], analyzer: TextAnalyzer, layout: str = 'plain') -> Dict[str, Any]:
+    """
+    Scan one work unit.
+    
+    Args:
+        unit: Work unit claimed from the queue
+        analyzer: Text analyzer whose detector is also used for PDF pages
+        layout: PDF text layout ('plain' or 'columns' for multi-column pages)
+        
+    Returns:
+        Unit results dictionary
+    """
+    if unit['kind'] == 'text':
+        return analyzer.analyze_file(unit['path'])
+    
+    extractor = PDFExtractor(unit['path'], layout)
+    if analyzer.metrics is not None:
+        analyzer.metrics.start_file(unit['path'], 'page', unit['last_page'] - unit['first_page'] + 1)
+    pages_data = extractor.extract_page_range(unit['first_page'], unit['last_page'])
+    if len(pages_data) != unit['last_page'] - unit['first_page'] + 1:
+        raise RuntimeError(f"Could not extract pages {unit['first_page']}-{unit['last_page']}")
+    
+    return {'pages': [check_page(analyzer.detector, page_data) for page_data in pages_data]}
+
+
+def run_worker(queue_path: str, enable_grammar: bool = True, config: Optional[Dict[str, Any]] = None,
+               worker_id: Optional[str] = None, heartbeat_interval: float = 10.0, poll_interval: float = 5.0,
+               stale_after: float = 120.0, layout: str = 'plain', metrics: Optional[ScanMetrics] = None) -> int:
+    """
+    Process work units from a shared queue until no work is left.
+    
+    Args:
+        queue_path: Path to the SQLite queue file
+        enable_grammar: Whether to enable grammar checking
+        config: Optional configuration dictionary
+        worker_id: Unique worker name (default: hostname and process ID)
+        heartbeat_interval: Seconds between heartbeats while a unit is processed
+        poll_interval: Seconds to wait while other workers still hold units
+        stale_after: Seconds without a heartbeat after which a unit is re-queued
+        layout: PDF text layout ('plain' or 'columns' for multi-column pages)
+        metrics: Optional live metrics, including the queue depths
+        
+    Returns:
+        Number of units completed by this worker
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    queue = WorkQueue(queue_path, stale_after=stale_after)
+    analyzer = TextAnalyzer(enable_grammar=enable_grammar, enable_turkish=True, config=config, metrics=metrics)
+    completed = 0
+    
+    print(f"Worker {worker_id} started")
+    try:
+        while True:
+            unit = queue.claim(worker_id)
+            if metrics is not None:
+                metrics.set_queue_units(queue.counts())
+            if unit is None:
+                # Wait while other workers hold units; they are re-queued if those workers die
+                if queue.counts()['running'] == 0:
+                    break
+                time.sleep(poll_interval)
+                continue
+            
+            print(f"Worker {worker_id}: unit {unit['id']} {unit['path']}"
+                  + (f" pages {unit['first_page']}-{unit['last_page']}" if unit['kind'] == 'pdf' else ''))
+            
+            stop = threading.Event()
+            heartbeat = threading.Thread(
+                target=_heartbeat_loop,
+                args=(queue_path, unit['id'], worker_id, heartbeat_interval, stop),
+                daemon=True
+            )
+            heartbeat.start()
+            try:
+                result = process_unit(unit, analyzer, layout)
+                if queue.complete(unit['id'], worker_id, result):
+                    completed += 1
+            except Exception as e:
+                print(f"Worker {worker_id}: unit {unit['id']} failed: {e}")
+                queue.fail(unit['id'], worker_id, str(e))
+            finally:
+                stop.set()
+                heartbeat.join()
+    finally:
+        analyzer.close()
+        queue.close()
+    
+    print(f"Worker {worker_id} finished ({completed} unit(s) completed)")
+    return completed
+
+
+def run_local_workers(queue_path: str, workers: int, enable_grammar: bool = True,
+                      config: Optional[Dict[str, Any]] = None, layout: str = 'plain'):
+    """
+    Run several queue workers as local processes and wait for them.
+    
+    Args:
+        queue_path: Path to the SQLite queue file
+        workers: Number of worker processes
+        enable_grammar: Whether to enable grammar checking
+        config: Optional configuration dictionary
+        layout: PDF text layout ('plain' or 'columns' for multi-column pages)
+    """
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(queue_path, enable_grammar, config),
+                                kwargs={'layout': layout})
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def collect_queue_results(queue_path: str, output_dir: str = 'error_reports',
+                          report_format: str = 'json') -> List[Dict[str, Any]]:
+    """
+    Merge finished work units into one report per file.
+    
+    Args:
+        queue_path: Path to the SQLite queue file
+        output_dir: Directory to save error reports
+        report_format: Format of the report files (one of REPORT_FORMATS)
+        
+    Returns:
+        List of merged results for every fully scanned file
+    """
+    queue = WorkQueue(queue_path)
+    collected = []
+    
+    try:
+        counts = queue.counts()
+        print(f"Queue status: {counts['done']} done, {counts['running']} running, "
+              f"{counts['pending']} pending, {counts['failed']} failed")
+        
+        for path in queue.paths():
+            units = queue.units_for(path)
+            unfinished = [unit for unit in units if unit['status'] != 'done']
+            if unfinished:
+                print(f"Skipping '{path}': {len(unfinished)} of {len(units)} unit(s) not finished")
+                continue
+            
+            if units[0]['kind'] == 'text':
+                unit_results = units[0]['result']
+                results = {
+                    'file': path,
+                    'scan_date': datetime.now().isoformat(),
+                    'total_lines': unit_results['total_lines'],
+                    'lines_with_errors': unit_results['lines_with_errors'],
+                    'total_errors': unit_results['total_errors']
+                }
+            else:
+                pages = [page for unit in units for page in unit['result']['pages']]
+                results = {
+                    'pdf_file': path,
+                    'scan_date': datetime.now().isoformat(),
+                    'total_pages': units[0]['total_pages'],
+                    'pages': pages,
+                    'total_errors': sum(page['total_errors'] for page in pages)
+                }
+            
+            # Summaries come from grouped queries over the merged errors
+            store = ErrorStore.from_results(results)
+            results['error_summary'] = store.error_summary()
+            results['severity_summary'] = store.severity_summary()
+            results['top_rules'] = store.top_rules()
+            if units[0]['kind'] == 'pdf':
+                results['errors_per_page'] = store.page_histogram()
+            store.close()
+            
+            save_report(results, output_dir, is_text_file=units[0]['kind'] == 'text', report_format=report_format)
+            collected.append(results)
+    finally:
+        queue.close()
+    
+    return collected
 
 
 def main():
@@ -410,6 +1049,36 @@ Examples:
   
   # Scan with custom output directory
   python scanner.py book.pdf --output ./my_reports
+  
+  # Scan a two-column exam in column reading order
+  python scanner.py exam.pdf --layout columns
+  
+  # Rescan a new edition, reusing results of unchanged pages from earlier reports
+  python scanner.py book.pdf --previous ./error_reports
+  
+  # Scan selected pages, or estimate error rates of each book from 30 sampled pages
+  python scanner.py book.pdf --pages 120-180,300
+  python scanner.py --directory ./incoming --sample 30
+  
+  # Stay within a CI time limit: important checks first, grammar as time allows
+  python scanner.py book.pdf --time-budget 60
+  
+  # Export live throughput metrics for Prometheus (file and/or HTTP endpoint)
+  python scanner.py --directory ./books --metrics-file /var/lib/node_exporter/scan.prom --metrics-port 9464
+  
+  # Record a Chrome trace of every stage (open in chrome://tracing or ui.perfetto.dev)
+  python scanner.py book.pdf --trace scan_trace.json
+  
+  # Record peak and retained memory per stage in the JSON report
+  python scanner.py book.pdf --memprofile
+  
+  # Write a compressed JSON Lines report (convert back with report_formats.py)
+  python scanner.py book.pdf --report-format jsonl.gz
+  
+  # Distributed scan through a queue file on shared storage
+  python scanner.py --queue /shared/scan.db --enqueue --directory /shared/books
+  python scanner.py --queue /shared/scan.db --worker --workers 4   # on each host
+  python scanner.py --queue /shared/scan.db --collect --output ./my_reports
         """
     )
     
@@ -442,19 +1111,184 @@ Examples:
         help='Scan text files instead of PDFs'
     )
     
+    parser.add_argument(
+        '--queue',
+        help='SQLite work queue file (on shared storage) for distributed scans'
+    )
+    
+    parser.add_argument(
+        '--enqueue',
+        action='store_true',
+        help='Add the file or directory to the work queue instead of scanning it'
+    )
+    
+    parser.add_argument(
+        '--worker',
+        action='store_true',
+        help='Process work units from the queue until it is empty'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of local worker processes to run with --worker (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--collect',
+        action='store_true',
+        help='Write reports for all files whose work units are finished'
+    )
+    
+    parser.add_argument(
+        '--pages-per-unit',
+        type=int,
+        default=50,
+        help='PDF pages per work unit when enqueueing (0 for whole files, default: 50)'
+    )
+    
+    parser.add_argument(
+        '--layout',
+        choices=LAYOUTS,
+        default='plain',
+        help="PDF text layout: 'columns' extracts multi-column pages column by column (default: plain)"
+    )
+    
+    parser.add_argument(
+        '--previous',
+        help='Earlier JSON report (or directory of reports) of the PDF; unchanged pages reuse its results'
+    )
+    
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument(
+        '--pages',
+        help='Scan only these PDF pages, e.g. "120-180,300"'
+    )
+    
+    selection.add_argument(
+        '--sample',
+        type=int,
+        help='Scan N pages spread over each PDF and estimate its error rate'
+    )
+    
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed for --sample (default: 0)'
+    )
+    
+    parser.add_argument(
+        '--time-budget',
+        type=float,
+        help='Seconds to spend checking each file; bracket, reference and spelling checks run first'
+    )
+    
+    parser.add_argument(
+        '--metrics-file',
+        help='Write live scan metrics in Prometheus text format to this file'
+    )
+    
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        help='Serve live scan metrics at http://127.0.0.1:PORT/metrics'
+    )
+    
+    parser.add_argument(
+        '--metrics-interval',
+        type=float,
+        default=15.0,
+        help='Seconds between metrics file writes (default: 15)'
+    )
+    
+    parser.add_argument(
+        '--trace',
+        help='Write a Chrome trace (JSON) of PDF extraction, checkers and report writing to this file'
+    )
+    
+    parser.add_argument(
+        '--memprofile',
+        action='store_true',
+        help='Profile memory per stage (tracemalloc and RSS) and add it to the JSON report (slower)'
+    )
+    
+    parser.add_argument(
+        '--report-format',
+        choices=REPORT_FORMATS,
+        default='json',
+        help='Report file format: indented JSON (default), JSON Lines, or compact binary, '
+             'optionally gzip- or zstd-compressed'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted scan from its last checkpoint'
+    )
+    
+    parser.add_argument(
+        '--checkpoint-interval',
+        type=float,
+        default=30.0,
+        help='Seconds between checkpoints (default: 30)'
+    )
+    
     args = parser.parse_args()
     
+    queue_mode = args.enqueue or args.worker or args.collect
+    if queue_mode and not args.queue:
+        parser.error('--enqueue, --worker and --collect require --queue')
+    if args.pages:
+        try:
+            parse_page_spec(args.pages)
+        except ValueError as e:
+            parser.error(f"--pages: {e}")
+    if args.sample is not None and args.sample < 1:
+        parser.error('--sample must be at least 1')
+    
     # Check if we have either a file or directory
-    if not args.file and not args.directory:
+    if not args.file and not args.directory and not (args.worker or args.collect):
         parser.print_help()
         sys.exit(1)
     
+    # Live metrics of this process (local worker processes are not covered)
+    metrics = None
+    exporter = None
+    if args.metrics_file or args.metrics_port is not None:
+        if args.worker and args.workers > 1:
+            print("Note: metrics are only exported for a single worker process; ignoring --metrics-*")
+        else:
+            metrics = ScanMetrics()
+            exporter = MetricsExporter(metrics, args.metrics_file, args.metrics_port, args.metrics_interval).start()
+    
+    # Spans of this process only; worker processes are not traced
+    tracer = start_tracing(args.trace, sys.modules[__name__]) if args.trace else None
+    
     try:
         enable_grammar = not args.no_grammar
         config = None  # Could load from config.yaml if needed
         
-        if args.directory:
-            scan_directory(args.directory, args.output, enable_grammar, args.text, config)
+        if args.enqueue:
+            if args.directory:
+                pattern = '*.txt' if args.text else '*.pdf'
+                files = [str(path) for path in sorted(Path(args.directory).glob(pattern))]
+            else:
+                files = [args.file]
+            enqueue_scan(args.queue, files, args.text, args.pages_per_unit)
+        elif args.worker:
+            if args.workers > 1:
+                run_local_workers(args.queue, args.workers, enable_grammar, config, args.layout)
+            else:
+                run_worker(args.queue, enable_grammar, config, layout=args.layout, metrics=metrics)
+        elif args.collect:
+            collect_queue_results(args.queue, args.output, args.report_format)
+        elif args.directory:
+            scan_directory(args.directory, args.output, enable_grammar, args.text, config,
+                           args.resume, args.checkpoint_interval, args.layout, args.previous,
+                           args.pages, args.sample, args.seed, args.time_budget, metrics, args.memprofile,
+                           args.report_format)
         else:
             if not os.path.exists(args.file):
                 print(f"Error: File '{args.file}' not found")
@@ -462,17 +1296,29 @@ Examples:
             
             # Determine file type
             if args.text or args.file.endswith('.txt'):
-                scan_text_file(args.file, args.output, enable_grammar, config)
+                scan_text_file(args.file, args.output, enable_grammar, config,
+                               args.resume, args.checkpoint_interval, args.time_budget, metrics, args.memprofile,
+                               args.report_format)
             else:
-                scan_pdf(args.file, args.output, enable_grammar, config)
+                scan_pdf(args.file, args.output, enable_grammar, config,
+                         args.resume, args.checkpoint_interval, args.layout, args.previous,
+                         args.pages, args.sample, args.seed, args.time_budget, metrics, args.memprofile,
+                         args.report_format)
     except KeyboardInterrupt:
         print("\n\nScan interrupted by user.")
+        if not queue_mode:
+            print("Progress was checkpointed; run the same command with --resume to continue.")
         sys.exit(0)
     except Exception as e:
         print(f"\nError during scan: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if tracer is not None:
+            stop_tracing(tracer)
+        if exporter is not None:
+            exporter.stop()
 
 
 if __name__ == '__main__':
@@ -2,7 +2,11 @@
 Simple offline grammar and spelling checker using pattern matching.
 """
 import re
-from typing import List, Dict, Any
+from typing import List, FrozenSet, Optional
+from error_record import ErrorRecord
+from prefilter import WHITESPACE, char_signature, requires, ignorecase_requires, may_match
+from casefold import casefold
+from tokenizer import WORD, Token, tokenize
 
 
 class SimpleGrammarChecker:
@@ -15,30 +19,41 @@ class SimpleGrammarChecker:
             {
                 'pattern': r'\ba\s+[aeiou]',  # "a" before vowel
                 'message': 'Use "an" before words starting with a vowel sound',
-                'suggestion': lambda m: m.group().replace('a ', 'an ')
+                'suggestion': lambda m: m.replace('a ', 'an '),
+                'ignorecase': True,
+                'requires': requires('aA', WHITESPACE)
             },
             {
                 'pattern': r'\ban\s+[^aeiou]',  # "an" before consonant
                 'message': 'Use "a" before words starting with a consonant sound',
-                'suggestion': lambda m: m.group().replace('an ', 'a ')
+                'suggestion': lambda m: m.replace('an ', 'a '),
+                'ignorecase': True,
+                'requires': requires('aA', 'nN', WHITESPACE)
             },
             {
                 'pattern': r'\s{2,}',  # Multiple spaces
                 'message': 'Multiple consecutive spaces found',
-                'suggestion': lambda m: ' '
+                'suggestion': lambda m: ' ',
+                'requires': requires(WHITESPACE)
             },
             {
                 'pattern': r'[,;:]\S',  # Missing space after punctuation
                 'message': 'Missing space after punctuation',
-                'suggestion': lambda m: m.group()[0] + ' ' + m.group()[1]
+                'suggestion': lambda m: m[0] + ' ' + m[1],
+                'requires': requires(',;:')
             },
             {
                 'pattern': r'\s[,;:.]',  # Space before punctuation
                 'message': 'Unexpected space before punctuation',
-                'suggestion': lambda m: m.group().strip()
+                'suggestion': lambda m: m.strip(),
+                'requires': requires(WHITESPACE, ',;:.')
             },
         ]
         
+        # Case-insensitive rules match lowercase patterns against the case-folded line
+        for rule in self.grammar_rules:
+            rule['regex'] = re.compile(rule['pattern'])
+        
         # Common spelling mistakes (small list)
         self.common_misspellings = {
             'recieve': 'receive',
@@ -54,13 +69,26 @@ class SimpleGrammarChecker:
             'adn': 'and',
             'taht': 'that',
         }
+        
+        # Characters each misspelling needs before it is worth searching for
+        self.misspelling_prefilters = {
+            misspelling: ignorecase_requires(misspelling)
+            for misspelling in self.common_misspellings
+        }
+        self.misspelling_keys = {
+            casefold(misspelling, turkish=False): misspelling
+            for misspelling in self.common_misspellings
+        }
     
-    def check(self, text: str) -> List[Dict[str, Any]]:
+    def check(self, text: str, signature: Optional[FrozenSet[str]] = None,
+              tokens: Optional[List[Token]] = None) -> List[ErrorRecord]:
         """
         Check text for grammar and spelling errors.
         
         Args:
             text: Text to check
+            signature: Precomputed character signature of the text
+            tokens: Precomputed tokens of the text
             
         Returns:
             List of detected errors with details
@@ -70,48 +98,79 @@ class SimpleGrammarChecker:
         if not text:
             return errors
         
+        if signature is None:
+            signature = char_signature(text)
+        
         # Check grammar rules
+        folded = None
         for rule in self.grammar_rules:
-            pattern = re.compile(rule['pattern'], re.IGNORECASE)
-            for match in pattern.finditer(text):
+            if not may_match(signature, rule.get('requires')):
+                continue
+            
+            if rule.get('ignorecase'):
+                if folded is None:
+                    folded = casefold(text, turkish=False)
+                matches = rule['regex'].finditer(folded)
+            else:
+                matches = rule['regex'].finditer(text)
+            
+            for match in matches:
                 start = max(0, match.start() - 20)
                 end = min(len(text), match.end() + 20)
-                context = text[start:end]
                 
+                # Folding keeps offsets, so the original text is at the same span
                 try:
-                    suggestion = rule['suggestion'](match)
-                except (TypeError, KeyError):
+                    suggestion = rule['suggestion'](text[match.start():match.end()])
+                except (TypeError, KeyError, IndexError):
                     suggestion = ''
                 
-                errors.append({
-                    'type': 'grammar/punctuation',
-                    'message': rule['message'],
-                    'context': f'...{context}...',
-                    'offset': match.start(),
-                    'length': match.end() - match.start(),
-                    'suggestions': [suggestion] if suggestion else [],
-                    'rule': 'simple_grammar'
-                })
+                errors.append(ErrorRecord(
+                    type='grammar/punctuation',
+                    message=rule['message'],
+                    source=text,
+                    context_start=start,
+                    context_end=end,
+                    offset=match.start(),
+                    length=match.end() - match.start(),
+                    suggestions=[suggestion] if suggestion else [],
+                    rule='simple_grammar'
+                ))
         
         # Check spelling
-        words = re.findall(r'\b\w+\b', text.lower())
-        for misspelling, correction in self.common_misspellings.items():
-            if misspelling in words:
-                # Find position in text
-                pattern = re.compile(r'\b' + misspelling + r'\b', re.IGNORECASE)
-                for match in pattern.finditer(text):
-                    start = max(0, match.start() - 20)
-                    end = min(len(text), match.end() + 20)
-                    context = text[start:end]
-                    
-                    errors.append({
-                        'type': 'grammar/punctuation',
-                        'message': f'Possible spelling mistake: "{match.group()}"',
-                        'context': f'...{context}...',
-                        'offset': match.start(),
-                        'length': match.end() - match.start(),
-                        'suggestions': [correction],
-                        'rule': 'spelling'
-                    })
+        candidates = [
+            (misspelling, correction)
+            for misspelling, correction in self.common_misspellings.items()
+            if may_match(signature, self.misspelling_prefilters[misspelling])
+        ]
+        if not candidates:
+            return errors
+        
+        if tokens is None:
+            tokens = tokenize(text)
+        
+        # Collect the words that are misspellings in one pass over the tokens
+        found = {}
+        for token in tokens:
+            if token.kind == WORD:
+                misspelling = self.misspelling_keys.get(casefold(token.text, turkish=False))
+                if misspelling is not None:
+                    found.setdefault(misspelling, []).append(token)
+        
+        for misspelling, correction in candidates:
+            for token in found.get(misspelling, []):
+                start = max(0, token.start - 20)
+                end = min(len(text), token.end + 20)
+                
+                errors.append(ErrorRecord(
+                    type='grammar/punctuation',
+                    message=f'Possible spelling mistake: "{token.text}"',
+                    source=text,
+                    context_start=start,
+                    context_end=end,
+                    offset=token.start,
+                    length=token.end - token.start,
+                    suggestions=[correction],
+                    rule='spelling'
+                ))
         
         return errors
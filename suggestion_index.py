@@ -0,0 +1,302 @@
+"""
+Spelling suggestions from a precomputed symmetric-delete index.
+
+Every dictionary word is stored under each string obtained by deleting up to
+max_edit_distance characters from its prefix. At lookup time the same deletes
+are generated for the unknown word, so candidate corrections are found with a
+handful of indexed key lookups instead of comparing against the whole word
+list. Candidates are then ranked by Damerau-Levenshtein distance and word
+frequency.
+
+The index is a SQLite file built once from a word list and opened read-only,
+so startup costs nothing and parallel workers share the page cache.
+"""
+import os
+import sqlite3
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from casefold import casefold
+
+
+DEFAULT_MAX_EDIT_DISTANCE = 2
+DEFAULT_PREFIX_LENGTH = 7
+
+
+def generate_deletes(word: str, max_edit_distance: int, prefix_length: int) -> Set[str]:
+    """
+    Generate all strings made by deleting up to max_edit_distance characters.
+
+    Args:
+        word: Word to generate deletes for
+        max_edit_distance: Maximum number of deleted characters
+        prefix_length: Only the first prefix_length characters are used
+
+    Returns:
+        Set of delete strings, including the (truncated) word itself
+    """
+    word = word[:prefix_length]
+    deletes = {word}
+    current = {word}
+    for _ in range(max_edit_distance):
+        following = set()
+        for item in current:
+            if len(item) <= 1:
+                continue
+            for i in range(len(item)):
+                following.add(item[:i] + item[i + 1:])
+        following -= deletes
+        deletes |= following
+        current = following
+    return deletes
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Damerau-Levenshtein distance (optimal string alignment) with a cutoff.
+
+    Args:
+        a: First string
+        b: Second string
+        limit: Maximum distance of interest
+
+    Returns:
+        Distance between a and b, or limit + 1 if it is larger than limit
+    """
+    # Common prefixes and suffixes never change the distance
+    prefix = 0
+    while prefix < len(a) and prefix < len(b) and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < len(a) - prefix and suffix < len(b) - prefix
+           and a[-1 - suffix] == b[-1 - suffix]):
+        suffix += 1
+    a = a[prefix:len(a) - suffix]
+    b = b[prefix:len(b) - suffix]
+
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if not a or not b:
+        return max(len(a), len(b))
+
+    # Only cells within limit of the diagonal can stay within limit
+    too_far = limit + 1
+    previous_previous = None
+    previous = [j if j <= limit else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [too_far] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        row_min = too_far
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return too_far
+        previous_previous, previous = previous, current
+
+    return min(previous[-1], too_far)
+
+
+def _read_word_list(lines: Iterable[str]) -> Dict[str, int]:
+    """Parse 'word' or 'word count' lines into case-folded word counts."""
+    counts: Dict[str, int] = {}
+    for line in lines:
+        parts = line.split()
+        if not parts:
+            continue
+        count = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 1
+        word = casefold(parts[0])
+        counts[word] = counts.get(word, 0) + count
+    return counts
+
+
+def build_index(lines: Iterable[str], output_path: str,
+                max_edit_distance: int = DEFAULT_MAX_EDIT_DISTANCE,
+                prefix_length: int = DEFAULT_PREFIX_LENGTH) -> int:
+    """
+    Build a suggestion index file from a word list.
+
+    Args:
+        lines: Lines with a word and an optional frequency count ("word" or "word 120")
+        output_path: Path of the SQLite index file
+        max_edit_distance: Largest edit distance suggestions can have
+        prefix_length: Number of leading characters used for the delete keys
+
+    Returns:
+        Number of distinct words indexed
+    """
+    counts = _read_word_list(lines)
+
+    tmp_path = f"{output_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+    conn.execute('CREATE TABLE words (id INTEGER PRIMARY KEY, word TEXT NOT NULL, count INTEGER NOT NULL)')
+    conn.execute('CREATE TABLE deletes (key TEXT NOT NULL, word_id INTEGER NOT NULL)')
+    conn.executemany('INSERT INTO meta VALUES (?, ?)', [
+        ('max_edit_distance', str(max_edit_distance)),
+        ('prefix_length', str(prefix_length)),
+    ])
+
+    rows: List[Tuple[str, int]] = []
+    for word_id, (word, count) in enumerate(sorted(counts.items()), 1):
+        conn.execute('INSERT INTO words VALUES (?, ?, ?)', (word_id, word, count))
+        rows.extend((key, word_id) for key in generate_deletes(word, max_edit_distance, prefix_length))
+        if len(rows) >= 100000:
+            conn.executemany('INSERT INTO deletes VALUES (?, ?)', rows)
+            rows = []
+    conn.executemany('INSERT INTO deletes VALUES (?, ?)', rows)
+
+    # Index after loading; one sorted build is much faster than incremental inserts
+    conn.execute('CREATE INDEX deletes_key ON deletes (key, word_id)')
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, output_path)
+
+    return len(counts)
+
+
+def _match_case(suggestion: str, word: str) -> str:
+    """Give a (lowercase) suggestion the capitalization of the original word."""
+    if word.isupper():
+        return suggestion.replace('i', 'İ').replace('ı', 'I').upper()
+    if word[:1].isupper():
+        first = {'i': 'İ', 'ı': 'I'}.get(suggestion[:1], suggestion[:1].upper())
+        return first + suggestion[1:]
+    return suggestion
+
+
+class SuggestionIndex:
+    """Read-only symmetric-delete index for spelling suggestions."""
+
+    def __init__(self, path: str, cache_size: int = 10000):
+        """
+        Open a suggestion index file.
+
+        Args:
+            path: Path of the SQLite index file
+            cache_size: Number of recent lookups to remember (0 disables)
+        """
+        if not os.path.isfile(path):
+            raise ValueError(f"Suggestion index not found: {path}")
+
+        self.path = path
+        self.cache_size = cache_size
+        self._cache: Dict[Tuple[str, int], List[str]] = {}
+        uri = f"{Path(path).resolve().as_uri()}?mode=ro"
+        self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        try:
+            meta = dict(self.conn.execute('SELECT key, value FROM meta'))
+            self.max_edit_distance = int(meta['max_edit_distance'])
+            self.prefix_length = int(meta['prefix_length'])
+        except (sqlite3.DatabaseError, KeyError, ValueError):
+            self.conn.close()
+            raise ValueError(f"Not a valid suggestion index: {path}")
+
+    def suggest(self, word: str, max_suggestions: int = 3,
+                max_edit_distance: Optional[int] = None) -> List[str]:
+        """
+        Get the closest dictionary words.
+
+        Args:
+            word: Word to correct
+            max_suggestions: Maximum number of suggestions to return
+            max_edit_distance: Largest edit distance to accept (at most the index's distance)
+
+        Returns:
+            Suggestions ordered by edit distance, then by word frequency, in the
+            capitalization of word; the word itself is never suggested
+        """
+        if max_edit_distance is None or max_edit_distance > self.max_edit_distance:
+            max_edit_distance = self.max_edit_distance
+
+        key = (word, max_edit_distance)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._lookup(casefold(word), max_edit_distance)
+            if self.cache_size > 0:
+                if len(self._cache) >= self.cache_size:
+                    self._cache.clear()
+                self._cache[key] = cached
+        return [_match_case(suggestion, word) for suggestion in cached[:max_suggestions]]
+
+    def _lookup(self, word: str, max_edit_distance: int) -> List[str]:
+        keys = list(generate_deletes(word, max_edit_distance, self.prefix_length))
+        placeholders = ', '.join('?' * len(keys))
+        rows = self.conn.execute(
+            'SELECT DISTINCT w.word, w.count FROM deletes d JOIN words w ON w.id = d.word_id '
+            f'WHERE d.key IN ({placeholders})',
+            keys
+        ).fetchall()
+
+        ranked = []
+        for candidate, count in rows:
+            if candidate == word:
+                continue
+            distance = edit_distance(word, candidate, max_edit_distance)
+            if distance <= max_edit_distance:
+                ranked.append((distance, -count, candidate))
+        ranked.sort()
+        return [candidate for _, _, candidate in ranked]
+
+    def close(self):
+        """Close the index file."""
+        self.conn.close()
+
+    def __enter__(self) -> 'SuggestionIndex':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def load_suggestion_index(path: Optional[str]) -> Optional[SuggestionIndex]:
+    """
+    Open a suggestion index if it is configured and readable.
+
+    Args:
+        path: Path of the SQLite index file, or None
+
+    Returns:
+        SuggestionIndex, or None if no usable index is available
+    """
+    if not path:
+        return None
+    try:
+        return SuggestionIndex(path)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"Warning: Could not load suggestion index '{path}': {e}")
+        return None
+
+
+def main():
+    """Build a suggestion index from a word list (one word per line, optionally with a count)."""
+    parser = argparse.ArgumentParser(description='Build a spelling suggestion index from a word list')
+    parser.add_argument('word_list', help='UTF-8 text file with one word (and optional frequency) per line')
+    parser.add_argument('output', help='Path of the index file to write')
+    parser.add_argument('--max-edit-distance', type=int, default=DEFAULT_MAX_EDIT_DISTANCE,
+                        help=f'Largest edit distance of suggestions (default: {DEFAULT_MAX_EDIT_DISTANCE})')
+    parser.add_argument('--prefix-length', type=int, default=DEFAULT_PREFIX_LENGTH,
+                        help=f'Leading characters used for index keys (default: {DEFAULT_PREFIX_LENGTH})')
+    args = parser.parse_args()
+
+    with open(args.word_list, 'r', encoding='utf-8') as f:
+        word_count = build_index(f, args.output, args.max_edit_distance, args.prefix_length)
+
+    size = os.path.getsize(args.output)
+    print(f"Indexed {word_count} words in {args.output} ({size / 1024 / 1024:.1f} MiB)")
+
+
+if __name__ == '__main__':
+    main()
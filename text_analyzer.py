@@ -3,15 +3,19 @@ Text analyzer module for analyzing text files line by line.
 Tracks line numbers for precise error reporting.
 """
 import re
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Callable, Sequence, Tuple, Optional
 from pathlib import Path
 from error_detector import ErrorDetector
+from error_store import ErrorStore
+from metrics import ScanMetrics
+from time_budget import BudgetedScan
 
 
 class TextAnalyzer:
     """Analyze text files line by line for errors."""
     
-    def __init__(self, enable_grammar: bool = True, enable_turkish: bool = True, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, enable_grammar: bool = True, enable_turkish: bool = True, config: Optional[Dict[str, Any]] = None,
+                 metrics: Optional[ScanMetrics] = None):
         """
         Initialize the text analyzer.
         
@@ -19,16 +23,24 @@ class TextAnalyzer:
             enable_grammar: Whether to enable grammar checking
             enable_turkish: Whether to enable Turkish-specific checks
             config: Optional configuration dictionary
+            metrics: Optional live metrics updated as lines are checked
         """
-        self.detector = ErrorDetector(enable_grammar_check=enable_grammar, enable_turkish=enable_turkish, config=config)
+        self.detector = ErrorDetector(enable_grammar_check=enable_grammar, enable_turkish=enable_turkish, config=config,
+                                      metrics=metrics)
+        self.metrics = metrics
         self.config = config or {}
     
-    def analyze_file(self, file_path: str) -> Dict[str, Any]:
+    def analyze_file(self, file_path: str, line_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     collect_lines: bool = True, time_budget: Optional[float] = None) -> Dict[str, Any]:
         """
         Analyze a text file line by line.
         
         Args:
             file_path: Path to the text file
+            line_callback: Optional function called with each line entry that has errors
+            collect_lines: Whether to keep line entries in results['lines_with_errors']
+            time_budget: Seconds to spend checking; the most important checks run
+                over the whole file first (see time_budget.py)
             
         Returns:
             Dictionary containing analysis results with line numbers
@@ -40,6 +52,9 @@ class TextAnalyzer:
         with open(file_path, 'r', encoding='utf-8') as f:
             lines = f.readlines()
         
+        if self.metrics is not None:
+            self.metrics.start_file(file_path, 'line', len(lines))
+        
         results = {
             'file_path': file_path,
             'total_lines': len(lines),
@@ -53,33 +68,7 @@ class TextAnalyzer:
             'total_errors': 0
         }
         
-        # Analyze each line
-        for line_num, line in enumerate(lines, start=1):
-            line_text = line.rstrip('\n')
-            
-            if not line_text.strip():
-                continue
-            
-            # Detect errors in this line
-            errors = self.detector.check_all_errors(line_text)
-            
-            # Count errors
-            line_error_count = sum(len(errs) for errs in errors.values())
-            
-            if line_error_count > 0:
-                results['lines_with_errors'].append({
-                    'line_number': line_num,
-                    'text': line_text,
-                    'errors': errors,
-                    'error_count': line_error_count
-                })
-                
-                # Update summary
-                results['error_summary']['grammar_punctuation'] += len(errors.get('grammar_punctuation', []))
-                results['error_summary']['mathematical'] += len(errors.get('mathematical', []))
-                results['error_summary']['turkish'] += len(errors.get('turkish', []))
-                results['error_summary']['spacing'] += len(errors.get('spacing', []))
-                results['total_errors'] += line_error_count
+        self._analyze_lines(lines, results, line_callback, collect_lines, time_budget=time_budget)
         
         return results
     
@@ -107,42 +96,87 @@ class TextAnalyzer:
             'total_errors': 0
         }
         
+        self._analyze_lines(lines, results)
+        
+        return results
+    
+    def _analyze_lines(self, lines: List[str], results: Dict[str, Any],
+                       line_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                       collect_lines: bool = True, first_line: int = 1,
+                       time_budget: Optional[float] = None):
+        """
+        Check each line and accumulate errors into a results dictionary.
+        
+        Args:
+            lines: Lines to analyze
+            results: Results dictionary to update
+            line_callback: Optional function called with each line entry that has errors
+            collect_lines: Whether to keep line entries in results['lines_with_errors']
+            first_line: Line number of the first line (for shards of a larger file)
+            time_budget: Seconds to spend checking, or None for a full check
+        """
+        store = ErrorStore()
+        
+        budget = None
+        if time_budget is not None:
+            # Check all lines category by category, most important first, until the deadline
+            budget = BudgetedScan(self.detector, time_budget, unit='line').run(
+                ((line_num, line.rstrip('\n')) for line_num, line in enumerate(lines, start=first_line)),
+                total=len(lines)
+            )
+        
         # Analyze each line
-        for line_num, line in enumerate(lines, start=1):
+        for line_num, line in enumerate(lines, start=first_line):
             line_text = line.rstrip('\n')
             
             if not line_text.strip():
+                if self.metrics is not None:
+                    self.metrics.observe_line({})
                 continue
             
             # Detect errors in this line
-            errors = self.detector.check_all_errors(line_text)
+            errors = budget.errors(line_num) if budget is not None else self.detector.check_all_errors(line_text)
+            if self.metrics is not None:
+                self.metrics.observe_line(errors)
             
             # Count errors
             line_error_count = sum(len(errs) for errs in errors.values())
             
             if line_error_count > 0:
-                results['lines_with_errors'].append({
+                for line_errors in errors.values():
+                    for error in line_errors:
+                        error.line_number = line_num
+                
+                line_data = {
                     'line_number': line_num,
                     'text': line_text,
                     'errors': errors,
                     'error_count': line_error_count
-                })
+                }
+                if collect_lines:
+                    results['lines_with_errors'].append(line_data)
+                if line_callback:
+                    line_callback(line_data)
                 
-                # Update summary
-                results['error_summary']['grammar_punctuation'] += len(errors.get('grammar_punctuation', []))
-                results['error_summary']['mathematical'] += len(errors.get('mathematical', []))
-                results['error_summary']['turkish'] += len(errors.get('turkish', []))
-                results['error_summary']['spacing'] += len(errors.get('spacing', []))
+                store.add_errors(errors, line=line_num)
                 results['total_errors'] += line_error_count
         
-        return results
+        # Summaries come from grouped queries over the error store
+        results['error_summary'] = store.error_summary()
+        results['severity_summary'] = store.severity_summary()
+        results['top_rules'] = store.top_rules()
+        results['cache_stats'] = self.detector.cache_stats()
+        results['line_classes'] = dict(self.detector.class_counts)
+        if budget is not None:
+            results['time_budget'] = budget.coverage()
+        store.close()
     
-    def get_line_context(self, lines: List[str], line_num: int, context_lines: int = 2) -> Tuple[int, int, List[str]]:
+    def get_line_context(self, lines: Sequence[str], line_num: int, context_lines: int = 2) -> Tuple[int, int, List[str]]:
         """
         Get context lines around a specific line.
         
         Args:
-            lines: List of all lines
+            lines: List of all lines, or a MappedTextFile for random access without loading the file
             line_num: Target line number (1-indexed)
             context_lines: Number of lines to include before and after
             
@@ -0,0 +1,198 @@
+"""
+Time-budgeted checking: cheap, high-severity checks over the whole document
+first, expensive checks in whatever time is left.
+
+A budgeted scan runs the error categories in phases instead of running every
+checker on a line before moving to the next. The first phase finds unmatched
+brackets, broken references and misspelled Turkish words in every line (or
+page); spacing follows, and grammar checking, by far the slowest checker,
+only fills the remaining time. Before each unit the scan checks whether the
+average unit time still fits before the deadline, so it stops on time and
+reports exactly which checks covered which range.
+"""
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from error_detector import ErrorDetector
+from error_record import ErrorRecord
+from error_store import CATEGORIES
+
+
+# Error categories in the order they are checked under a time budget
+PHASES: List[Tuple[str, ...]] = [
+    ('mathematical', 'turkish'),
+    ('spacing',),
+    ('grammar_punctuation',),
+]
+
+
+class BudgetedScan:
+    """Check units of text in prioritized phases until a deadline."""
+
+    def __init__(self, detector: ErrorDetector, seconds: float, unit: str = 'line',
+                 phases: Sequence[Tuple[str, ...]] = PHASES):
+        """
+        Start the clock for a budgeted scan.
+
+        Args:
+            detector: Error detector to use
+            seconds: Time budget in seconds, counted from now
+            unit: Name of the units being checked ('line' or 'page'), for reports
+            phases: Error categories to check in each phase, most important first
+        """
+        self.detector = detector
+        self.seconds = seconds
+        self.unit = unit
+        self.phases = [tuple(phase) for phase in phases]
+        self.started = time.monotonic()
+        self.deadline = self.started + seconds
+        self.finished: Optional[float] = None
+        self.deadline_reached = False
+
+        # Units read in the first phase and their errors so far
+        self.units: List[Tuple[int, str]] = []
+        self.units_total: Optional[int] = None
+        self._errors: Dict[int, Dict[str, List[ErrorRecord]]] = {}
+        self._progress: List[Dict[str, Any]] = []
+
+    def run(self, units: Iterable[Tuple[int, str]], total: Optional[int] = None) -> 'BudgetedScan':
+        """
+        Check units phase by phase until all phases are done or time is up.
+
+        The first phase reads units from the iterable as it goes, so time spent
+        producing them (e.g. extracting PDF pages) counts against the budget.
+
+        Args:
+            units: (line or page number, text) pairs in document order
+            total: Number of units, if known in advance
+
+        Returns:
+            self, for chaining
+        """
+        self.units_total = total
+        for index, categories in enumerate(self.phases):
+            source = iter(units) if index == 0 else iter(self.units)
+            complete = self._run_phase(index, categories, source)
+            if not complete:
+                self.deadline_reached = True
+                break
+            if index == 0:
+                self.units_total = len(self.units)
+        self.finished = time.monotonic()
+        return self
+
+    def _run_phase(self, index: int, categories: Tuple[str, ...], source: Iterator[Tuple[int, str]]) -> bool:
+        progress = {'checks': list(categories), 'units_checked': 0, 'first': None, 'last': None}
+        self._progress.append(progress)
+        phase_started = time.monotonic()
+
+        while True:
+            # Stop before a unit that would most likely run past the deadline
+            checked = progress['units_checked']
+            average = (time.monotonic() - phase_started) / checked if checked else 0.0
+            if time.monotonic() + average > self.deadline:
+                return False
+
+            try:
+                number, text = next(source)
+            except StopIteration:
+                return True
+
+            if index == 0:
+                self.units.append((number, text))
+            if text and text.strip():
+                errors = self.detector.check_all_errors(text, categories, count_classes=(index == 0))
+                found = {category: errors[category] for category in categories if errors[category]}
+                if found:
+                    self._errors.setdefault(number, {}).update(found)
+
+            progress['units_checked'] += 1
+            if progress['first'] is None:
+                progress['first'] = number
+            progress['last'] = number
+
+    def errors(self, number: int) -> Dict[str, List[ErrorRecord]]:
+        """
+        Get the errors found in one unit.
+
+        Args:
+            number: Line or page number
+
+        Returns:
+            Dictionary of errors by type, as returned by check_all_errors
+            (categories not checked for this unit are empty)
+        """
+        found = self._errors.get(number, {})
+        return {category: found.get(category, []) for category in CATEGORIES}
+
+    def fully_checked(self) -> Set[int]:
+        """
+        Get the units that every phase checked.
+
+        Returns:
+            Line or page numbers whose results are as complete as an unbudgeted scan
+        """
+        if len(self._progress) < len(self.phases):
+            return set()
+        checked = self._progress[-1]['units_checked']
+        return {number for number, _ in self.units[:checked]}
+
+    @property
+    def complete(self) -> bool:
+        """Whether every phase covered every unit."""
+        return not self.deadline_reached and len(self._progress) == len(self.phases)
+
+    def coverage(self) -> Dict[str, Any]:
+        """
+        Describe what the scan covered.
+
+        Returns:
+            Dictionary with the budget, elapsed seconds, whether the deadline
+            was reached, and per phase the checks run, the number of units
+            checked out of the total and the covered [first, last] range
+        """
+        end = self.finished if self.finished is not None else time.monotonic()
+        phases = []
+        for index, categories in enumerate(self.phases):
+            progress = self._progress[index] if index < len(self._progress) else None
+            checked = progress['units_checked'] if progress else 0
+            phases.append({
+                'checks': list(categories),
+                'units_checked': checked,
+                'units_total': self.units_total,
+                'complete': progress is not None and (index < len(self._progress) - 1 or not self.deadline_reached),
+                'covered': [progress['first'], progress['last']] if progress and checked else None,
+            })
+
+        return {
+            'seconds': self.seconds,
+            'elapsed': round(end - self.started, 2),
+            'deadline_reached': self.deadline_reached,
+            'unit': self.unit,
+            'phases': phases,
+        }
+
+
+def format_coverage(coverage: Dict[str, Any]) -> List[str]:
+    """
+    Describe the coverage of a budgeted scan in readable lines.
+
+    Args:
+        coverage: Dictionary returned by BudgetedScan.coverage()
+
+    Returns:
+        One line per phase
+    """
+    unit = coverage['unit']
+    lines = []
+    for phase in coverage['phases']:
+        checks = ', '.join(phase['checks'])
+        total = phase['units_total']
+        if phase['complete']:
+            lines.append(f"{checks}: complete ({phase['units_checked']} {unit}s)")
+        elif phase['covered'] is None:
+            lines.append(f"{checks}: not run")
+        else:
+            first, last = phase['covered']
+            of_total = f" of {total}" if total is not None else ''
+            lines.append(f"{checks}: {unit}s {first}-{last} only ({phase['units_checked']}{of_total} {unit}s)")
+    return lines
@@ -0,0 +1,56 @@
+"""
+Shared tokenizer for a single pass over each line or page.
+
+The token stream is computed once per text and consumed by the line
+classifier and the word-level checkers, so no checker re-scans the text for
+words or numbers. Whitespace is not tokenized: the gap between two tokens is
+always whitespace (possibly empty).
+"""
+import re
+from typing import List, NamedTuple
+from casefold import casefold
+
+
+WORD = 'word'
+NUMBER = 'number'
+PUNCTUATION = 'punctuation'
+MATH_SYMBOL = 'math_symbol'
+
+MATH_SYMBOLS = frozenset('=+-−*/^<>≤≥≠≈±×÷∪∩∅∈∉⊂⊆⊃⊇∑∏∫√∞∂∆∇|!')
+
+# Words are the same runs of word characters that the regex \b\w+\b finds
+_TOKEN = re.compile(r'\w+|[^\w\s]')
+
+
+class Token(NamedTuple):
+    """A word, number, punctuation mark or math symbol with its position."""
+    text: str
+    kind: str
+    start: int
+    end: int
+    lower: str
+
+
+def tokenize(text: str) -> List[Token]:
+    """
+    Split text into tokens.
+
+    Args:
+        text: Line or page text
+
+    Returns:
+        List of tokens in text order; words carry their Turkish case-folded form
+    """
+    # Fold the whole text once; folding keeps offsets, so each word's form is a slice
+    folded = casefold(text)
+    tokens = []
+    for match in _TOKEN.finditer(text):
+        token_text = match.group()
+        if token_text.isdecimal():
+            tokens.append(Token(token_text, NUMBER, match.start(), match.end(), token_text))
+        elif token_text[0].isalnum() or token_text[0] == '_':
+            tokens.append(Token(token_text, WORD, match.start(), match.end(), folded[match.start():match.end()]))
+        else:
+            kind = MATH_SYMBOL if token_text in MATH_SYMBOLS else PUNCTUATION
+            tokens.append(Token(token_text, kind, match.start(), match.end(), token_text))
+    return tokens
@@ -0,0 +1,249 @@
+"""
+Optional tracing of scan stages in the Chrome trace event format.
+
+Tracing works by wrapping the pipeline's methods and functions when it is
+started, so a scan without tracing runs the original, unwrapped code and pays
+nothing for it. Each call becomes a complete ("X") event with its start and
+duration; a trace viewer (chrome://tracing or https://ui.perfetto.dev) nests
+the spans by time, showing every page or line with the checkers and Turkish
+sub-checks it ran, PDF extraction and report writing.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import functools
+import importlib
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Classes and methods traced in the library modules: module -> class -> methods
+TRACED_METHODS = {
+    'pdf_extractor': {
+        'PDFExtractor': ['get_page_count', 'extract_page', 'extract_all_pages', 'extract_page_range',
+                         'extract_pages', 'page_fingerprints', '_page_text'],
+    },
+    'error_detector': {
+        'ErrorDetector': ['check_all_errors', 'check_grammar_punctuation', 'check_mathematical_errors',
+                          'check_turkish_errors', 'check_spacing_errors'],
+    },
+    'turkish_grammar': {
+        'TurkishGrammarChecker': ['check_spelling', 'check_comma_spacing', 'check_turkish_patterns',
+                                  'check_broken_references', 'check_unknown_words'],
+    },
+    'text_analyzer': {
+        'TextAnalyzer': ['analyze_file'],
+    },
+}
+
+# Module-level functions traced in the entry script
+TRACED_FUNCTIONS = ['scan_pdf', 'scan_text_file', 'check_page', 'process_unit', 'save_report',
+                    'analyze_text_file', 'save_reports']
+
+# Span arguments taken from call arguments, so pages and lines can be told apart
+_PREVIEW_CHARS = 40
+
+
+def _span_args(name: str, args: Tuple, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Describe the unit of work of a traced call."""
+    if name == 'check_all_errors' and len(args) > 1:
+        return {'chars': len(args[1]), 'text': args[1][:_PREVIEW_CHARS]}
+    if name == 'check_page' and len(args) > 1:
+        return {'page': args[1].get('page_number')}
+    if name == '_page_text' and len(args) > 1:
+        return {'page': getattr(args[1], 'page_number', None)}
+    if name in ('scan_pdf', 'scan_text_file', 'analyze_text_file', 'analyze_file') and args:
+        path = args[1] if name == 'analyze_file' and len(args) > 1 else args[0]
+        return {'file': str(path)}
+    if name == 'process_unit' and args:
+        return {'unit': args[0].get('id'), 'file': args[0].get('path')}
+    return None
+
+
+class Tracer:
+    """Collect spans of traced calls and write them as a Chrome trace file."""
+
+    def __init__(self, path: str, max_events: int = 2000000):
+        """
+        Initialize an empty trace.
+
+        Args:
+            path: Trace file to write when tracing stops
+            max_events: Largest number of spans kept; later spans are counted but dropped
+        """
+        self.path = path
+        self.max_events = max_events
+        self.run_id = uuid.uuid4().hex[:12]
+        self.pid = os.getpid()
+        self.started = datetime.now().isoformat()
+        self.events: List[Tuple[str, str, int, int, int, Optional[Dict[str, Any]]]] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._patched: List[Tuple[Any, str, Any]] = []
+
+    def wrap(self, func: Callable, name: str, category: str) -> Callable:
+        """
+        Wrap a function so each call records a span.
+
+        Args:
+            func: Function or method to wrap
+            name: Span name
+            category: Span category (e.g. the module name)
+
+        Returns:
+            Wrapped function
+        """
+        tracer = self
+
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tracer.record(name, category, start, time.perf_counter_ns() - start,
+                              _span_args(name, args, kwargs))
+
+        return traced
+
+    def record(self, name: str, category: str, start_ns: int, duration_ns: int,
+               args: Optional[Dict[str, Any]] = None):
+        """
+        Record a finished span.
+
+        Args:
+            name: Span name
+            category: Span category
+            start_ns: Start time from time.perf_counter_ns()
+            duration_ns: Duration in nanoseconds
+            args: Optional details shown with the span
+        """
+        with self._lock:
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.events.append((name, category, start_ns, duration_ns, threading.get_ident(), args))
+
+    def patch(self, owner: Any, attribute: str, name: str, category: str):
+        """
+        Replace a function attribute of a class or module with a traced wrapper.
+
+        Args:
+            owner: Class or module holding the function
+            attribute: Attribute name
+            name: Span name
+            category: Span category
+        """
+        original = owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+        self._patched.append((owner, attribute, original))
+        setattr(owner, attribute, self.wrap(original, name, category))
+
+    def instrument(self, entry_module: Any):
+        """
+        Trace the pipeline's library methods and the entry script's stage functions.
+
+        Args:
+            entry_module: Module object of the running script (scanner or analyze_text_file),
+                whose module-level stage functions are traced
+        """
+        for module_name, classes in TRACED_METHODS.items():
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                # e.g. pdf_extractor without pdfplumber in text-only runs
+                continue
+            for class_name, methods in classes.items():
+                owner = getattr(module, class_name, None)
+                if owner is None:
+                    continue
+                for method in methods:
+                    if method in owner.__dict__:
+                        self.patch(owner, method, method, f"{module_name}.{class_name}")
+        for function in TRACED_FUNCTIONS:
+            if callable(getattr(entry_module, function, None)):
+                self.patch(entry_module, function, function, 'stage')
+
+    def restore(self):
+        """Put back the original, untraced functions."""
+        for owner, attribute, original in reversed(self._patched):
+            setattr(owner, attribute, original)
+        self._patched = []
+
+    def write(self) -> str:
+        """
+        Write the trace file.
+
+        Returns:
+            Path of the trace file
+        """
+        with self._lock:
+            events = list(self.events)
+            dropped = self.dropped
+
+        # Spans are recorded as they end; viewers expect enclosing spans first
+        events.sort(key=lambda event: (event[2], -event[3]))
+        base = events[0][2] if events else 0
+        trace_events: List[Dict[str, Any]] = [
+            {'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'args': {'name': f"scan {self.run_id}"}},
+        ]
+        for name, category, start_ns, duration_ns, tid, args in events:
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': (start_ns - base) / 1000,
+                'dur': duration_ns / 1000,
+                'pid': self.pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = args
+            trace_events.append(event)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'traceEvents': trace_events,
+                'displayTimeUnit': 'ms',
+                'otherData': {
+                    'run_id': self.run_id,
+                    'started': self.started,
+                    'command': ' '.join(sys.argv),
+                    'dropped_events': dropped,
+                },
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        return self.path
+
+
+def start_tracing(path: str, entry_module: Any) -> Tracer:
+    """
+    Start tracing the scan pipeline.
+
+    Args:
+        path: Trace file to write when tracing stops
+        entry_module: Module object of the running script
+
+    Returns:
+        Tracer to pass to stop_tracing
+    """
+    tracer = Tracer(path)
+    tracer.instrument(entry_module)
+    print(f"Tracing run {tracer.run_id} to {path}")
+    return tracer
+
+
+def stop_tracing(tracer: Tracer):
+    """
+    Stop tracing and write the trace file.
+
+    Args:
+        tracer: Tracer returned by start_tracing
+    """
+    tracer.restore()
+    path = tracer.write()
+    dropped = f" ({tracer.dropped} spans dropped)" if tracer.dropped else ''
+    print(f"Trace with {len(tracer.events)} spans saved to: {path}{dropped}")
@@ -2,7 +2,18 @@
 Turkish grammar and spelling checker for detecting Turkish-specific errors.
 """
 import re
-from typing import List, Dict, Any, Optional
+import unicodedata
+from typing import List, Dict, Any, FrozenSet, Optional
+from error_record import ErrorRecord
+from prefilter import WHITESPACE, char_signature, requires, literal_requires, ignorecase_requires, may_match
+from casefold import casefold
+from lexicon import load_lexicon
+from suggestion_index import load_suggestion_index
+from turkish_morphology import SuffixStripper
+from tokenizer import WORD, Token, tokenize
+
+# Word pieces after these are suffixes (e.g. N’nin), not standalone words
+APOSTROPHES = frozenset("'’")
 
 
 class TurkishGrammarChecker:
@@ -17,6 +28,22 @@ class TurkishGrammarChecker:
         """
         self.config = config or {}
         self._load_default_rules()
+        
+        # Optional lexicon of known words; unknown words become spelling findings
+        self.lexicon = load_lexicon(self.config.get('lexicon_path'))
+        self.min_unknown_word_length = self.config.get('min_unknown_word_length', 3)
+        
+        # Inflected words are known if a stem left after suffix stripping is in the lexicon
+        self.suffix_stripper = None
+        if self.lexicon is not None and self.config.get('strip_suffixes', True):
+            self.suffix_stripper = SuffixStripper(
+                min_stem_length=self.config.get('min_stem_length', 2),
+                cache_size=self.config.get('stem_cache_size', 50000)
+            )
+        
+        # Optional index of corrections offered for unknown words
+        self.suggestion_index = load_suggestion_index(self.config.get('suggestion_index_path'))
+        self.max_suggestions = self.config.get('max_suggestions', 3)
     
     def _load_default_rules(self):
         """Load default Turkish grammar rules."""
@@ -28,43 +55,62 @@ class TurkishGrammarChecker:
             'olsuturur': 'oluşturur',
         }
         
+        # Characters each misspelling needs before it is worth searching for
+        self.spelling_prefilters = {
+            misspelling: ignorecase_requires(misspelling)
+            for misspelling in self.spelling_errors
+        }
+        self.spelling_keys = {
+            casefold(misspelling): misspelling
+            for misspelling in self.spelling_errors
+        }
+        self.comma_prefilter = requires(',')
+        
         # Turkish-specific patterns
         self.turkish_patterns = [
             {
                 'pattern': r'adalandırılan',
                 'correction': 'adlandırılan',
                 'message': 'Turkish spelling error: missing "d" in "adlandırılan"',
-                'severity': 'high'
+                'severity': 'high',
+                'requires': literal_requires('adalandırılan')
             },
             {
                 'pattern': r'\bolabilir\s+farklı',
                 'correction': 'olası farklı',
                 'message': 'Inconsistent terminology: use "olası" instead of "olabilir" for consistency',
-                'severity': 'medium'
+                'severity': 'medium',
+                'requires': literal_requires('olabilirfarklı') + requires(WHITESPACE),
+                'language_specific': True
             },
             {
                 'pattern': r'\bN\s+is\b',
                 'correction': 'N ise',
                 'message': 'Mixed language: "is" should be Turkish "ise"',
-                'severity': 'high'
+                'severity': 'high',
+                'requires': literal_requires('Nis') + requires(WHITESPACE),
+                'language_specific': True
             },
             {
                 'pattern': r',([A-Za-zÇĞİÖŞÜçğıöşü])',
                 'correction': lambda m: ', ' + m.group(1),
                 'message': 'Missing space after comma (Turkish punctuation rule)',
-                'severity': 'medium'
+                'severity': 'medium',
+                'requires': requires(',')
             },
             {
                 'pattern': r';([A-Za-zÇĞİÖŞÜçğıöşü])',
                 'correction': lambda m: '; ' + m.group(1),
                 'message': 'Missing space after semicolon (Turkish punctuation rule)',
-                'severity': 'medium'
+                'severity': 'medium',
+                'requires': requires(';')
             },
             {
                 'pattern': r':([A-Za-zÇĞİÖŞÜçğıöşü])',
                 'correction': lambda m: ': ' + m.group(1),
                 'message': 'Missing space after colon (Turkish punctuation rule)',
-                'severity': 'medium'
+                'severity': 'medium',
+                'requires': requires(':')
             },
         ]
         
@@ -73,107 +119,154 @@ class TurkishGrammarChecker:
             {
                 'pattern': r'Örnek\s+\?\?',
                 'message': 'Broken example reference',
-                'severity': 'high'
+                'severity': 'high',
+                'requires': literal_requires('Örnek??') + requires(WHITESPACE)
             },
             {
                 'pattern': r'Şekil\s+\?\?',
                 'message': 'Broken figure reference',
-                'severity': 'high'
+                'severity': 'high',
+                'requires': literal_requires('Şekil??') + requires(WHITESPACE)
             },
             {
                 'pattern': r'Tablo\s+\?\?',
                 'message': 'Broken table reference',
-                'severity': 'high'
+                'severity': 'high',
+                'requires': literal_requires('Tablo??') + requires(WHITESPACE)
             },
             {
                 'pattern': r'Bölüm\s+\?\?',
                 'message': 'Broken section reference',
-                'severity': 'high'
+                'severity': 'high',
+                'requires': literal_requires('Bölüm??') + requires(WHITESPACE)
             },
         ]
     
-    def check_spelling(self, text: str) -> List[Dict[str, Any]]:
+    def check_spelling(self, text: str, signature: Optional[FrozenSet[str]] = None,
+                       tokens: Optional[List[Token]] = None) -> List[ErrorRecord]:
         """
         Check for Turkish spelling errors.
         
         Args:
             text: Text to check
+            signature: Precomputed character signature of the text
+            tokens: Precomputed tokens of the text
             
         Returns:
             List of spelling errors found
         """
         errors = []
         
-        for misspelling, correction in self.spelling_errors.items():
-            pattern = re.compile(r'\b' + misspelling + r'\b', re.IGNORECASE)
-            for match in pattern.finditer(text):
-                start = max(0, match.start() - 40)
-                end = min(len(text), match.end() + 40)
-                context = text[start:end]
+        if signature is None:
+            signature = char_signature(text)
+        
+        candidates = [
+            misspelling for misspelling in self.spelling_errors
+            if may_match(signature, self.spelling_prefilters[misspelling])
+        ]
+        if not candidates:
+            return errors
+        
+        if tokens is None:
+            tokens = tokenize(text)
+        
+        # Collect the words that are misspellings in one pass over the tokens
+        found = {}
+        for token in tokens:
+            if token.kind == WORD:
+                misspelling = self.spelling_keys.get(token.lower)
+                if misspelling is not None:
+                    found.setdefault(misspelling, []).append(token)
+        
+        for misspelling in candidates:
+            correction = self.spelling_errors[misspelling]
+            for token in found.get(misspelling, []):
+                start = max(0, token.start - 40)
+                end = min(len(text), token.end + 40)
                 
-                errors.append({
-                    'type': 'turkish_spelling',
-                    'message': f'Turkish spelling error: "{match.group()}" should be "{correction}"',
-                    'context': f'...{context}...',
-                    'offset': match.start(),
-                    'length': match.end() - match.start(),
-                    'suggestions': [correction],
-                    'severity': 'high'
-                })
+                errors.append(ErrorRecord(
+                    type='turkish_spelling',
+                    message=f'Turkish spelling error: "{token.text}" should be "{correction}"',
+                    source=text,
+                    context_start=start,
+                    context_end=end,
+                    offset=token.start,
+                    length=token.end - token.start,
+                    suggestions=[correction],
+                    severity='high'
+                ))
         
         return errors
     
-    def check_comma_spacing(self, text: str) -> List[Dict[str, Any]]:
+    def check_comma_spacing(self, text: str, signature: Optional[FrozenSet[str]] = None) -> List[ErrorRecord]:
         """
         Check for missing spaces after commas in Turkish text.
         
         Args:
             text: Text to check
+            signature: Precomputed character signature of the text
             
         Returns:
             List of comma spacing errors found
         """
         errors = []
         
+        if signature is None:
+            signature = char_signature(text)
+        if not may_match(signature, self.comma_prefilter):
+            return errors
+        
         # Pattern for comma followed by letter without space
         pattern = re.compile(r',([A-Za-zÇĞİÖŞÜçğıöşü])')
         
         for match in pattern.finditer(text):
             start = max(0, match.start() - 30)
             end = min(len(text), match.end() + 30)
-            context = text[start:end]
             
-            errors.append({
-                'type': 'turkish_punctuation',
-                'message': 'Missing space after comma (Turkish punctuation rule)',
-                'context': f'...{context}...',
-                'offset': match.start(),
-                'length': match.end() - match.start(),
-                'suggestions': [', ' + match.group(1)],
-                'severity': 'medium'
-            })
+            errors.append(ErrorRecord(
+                type='turkish_punctuation',
+                message='Missing space after comma (Turkish punctuation rule)',
+                source=text,
+                context_start=start,
+                context_end=end,
+                offset=match.start(),
+                length=match.end() - match.start(),
+                suggestions=[', ' + match.group(1)],
+                severity='medium'
+            ))
         
         return errors
     
-    def check_turkish_patterns(self, text: str) -> List[Dict[str, Any]]:
+    def check_turkish_patterns(self, text: str, signature: Optional[FrozenSet[str]] = None,
+                               language_specific: bool = True) -> List[ErrorRecord]:
         """
         Check for Turkish-specific grammar patterns.
         
         Args:
             text: Text to check
+            signature: Precomputed character signature of the text
+            language_specific: Whether to include rules that only apply to
+                Turkish prose (terminology, mixed-language words)
             
         Returns:
             List of pattern-based errors found
         """
         errors = []
         
+        if signature is None:
+            signature = char_signature(text)
+        
         for rule in self.turkish_patterns:
+            if rule.get('language_specific') and not language_specific:
+                continue
+            if not may_match(signature, rule.get('requires')):
+                continue
+            
             pattern = re.compile(rule['pattern'])
             
             for match in pattern.finditer(text):
                 start = max(0, match.start() - 40)
                 end = min(len(text), match.end() + 40)
-                context = text[start:end]
                 
                 # Get correction
                 if callable(rule.get('correction')):
@@ -181,65 +274,153 @@ class TurkishGrammarChecker:
                 else:
                     correction = rule.get('correction', '')
                 
-                errors.append({
-                    'type': 'turkish_grammar',
-                    'message': rule['message'],
-                    'context': f'...{context}...',
-                    'offset': match.start(),
-                    'length': match.end() - match.start(),
-                    'suggestions': [correction] if correction else [],
-                    'severity': rule.get('severity', 'medium')
-                })
+                errors.append(ErrorRecord(
+                    type='turkish_grammar',
+                    message=rule['message'],
+                    source=text,
+                    context_start=start,
+                    context_end=end,
+                    offset=match.start(),
+                    length=match.end() - match.start(),
+                    suggestions=[correction] if correction else [],
+                    severity=rule.get('severity', 'medium')
+                ))
         
         return errors
     
-    def check_broken_references(self, text: str) -> List[Dict[str, Any]]:
+    def check_broken_references(self, text: str, signature: Optional[FrozenSet[str]] = None) -> List[ErrorRecord]:
         """
         Check for broken references (e.g., "Örnek ??").
         
         Args:
             text: Text to check
+            signature: Precomputed character signature of the text
             
         Returns:
             List of broken references found
         """
         errors = []
         
+        if signature is None:
+            signature = char_signature(text)
+        
         for rule in self.reference_patterns:
+            if not may_match(signature, rule.get('requires')):
+                continue
+            
             pattern = re.compile(rule['pattern'])
             
             for match in pattern.finditer(text):
                 start = max(0, match.start() - 30)
                 end = min(len(text), match.end() + 30)
-                context = text[start:end]
                 
-                errors.append({
-                    'type': 'broken_reference',
-                    'message': rule['message'],
-                    'context': f'...{context}...',
-                    'offset': match.start(),
-                    'length': match.end() - match.start(),
-                    'suggestions': [],
-                    'severity': rule.get('severity', 'high')
-                })
+                errors.append(ErrorRecord(
+                    type='broken_reference',
+                    message=rule['message'],
+                    source=text,
+                    context_start=start,
+                    context_end=end,
+                    offset=match.start(),
+                    length=match.end() - match.start(),
+                    suggestions=[],
+                    severity=rule.get('severity', 'high')
+                ))
         
         return errors
     
-    def check_all(self, text: str) -> List[Dict[str, Any]]:
+    def check_unknown_words(self, text: str, tokens: Optional[List[Token]] = None) -> List[ErrorRecord]:
+        """
+        Check words against the lexicon.
+        
+        With suffix stripping enabled, a word is known if it or any of its
+        candidate stems is in the lexicon, so the lexicon only needs root
+        words. Acronyms, short words and word pieces (suffixes after an
+        apostrophe, fragments of decomposed letters) are not checked.
+        
+        Args:
+            text: Text to check
+            tokens: Precomputed tokens of the text
+            
+        Returns:
+            List of unknown-word errors found
+        """
+        errors = []
+        
+        if self.lexicon is None:
+            return errors
+        
+        if tokens is None:
+            tokens = tokenize(text)
+        
+        for i, token in enumerate(tokens):
+            word = token.text
+            if token.kind != WORD or len(word) < self.min_unknown_word_length or not word.isalpha() or word.isupper():
+                continue
+            
+            previous = tokens[i - 1] if i > 0 else None
+            following = tokens[i + 1] if i + 1 < len(tokens) else None
+            if previous and previous.end == token.start and (
+                    previous.text in APOSTROPHES or unicodedata.combining(previous.text)):
+                continue
+            if following and following.start == token.end and unicodedata.combining(following.text):
+                continue
+            
+            if token.lower in self.lexicon:
+                continue
+            if self.suffix_stripper is not None and any(
+                    stem in self.lexicon for stem in self.suffix_stripper.stems(token.lower)):
+                continue
+            
+            start = max(0, token.start - 30)
+            end = min(len(text), token.end + 30)
+            
+            suggestions = []
+            if self.suggestion_index is not None:
+                suggestions = self.suggestion_index.suggest(word, self.max_suggestions)
+            
+            errors.append(ErrorRecord(
+                type='turkish_spelling',
+                message=f'Unknown word: "{word}"',
+                source=text,
+                context_start=start,
+                context_end=end,
+                offset=token.start,
+                length=token.end - token.start,
+                suggestions=suggestions,
+                severity='low',
+                rule='lexicon'
+            ))
+        
+        return errors
+    
+    def check_all(self, text: str, signature: Optional[FrozenSet[str]] = None,
+                  tokens: Optional[List[Token]] = None, language_specific: bool = True) -> List[ErrorRecord]:
         """
         Run all Turkish grammar checks.
         
+        Broken references, known misspellings and punctuation spacing apply to
+        any text; lexicon lookups and the Turkish-prose patterns only run with
+        language_specific.
+        
         Args:
             text: Text to check
+            signature: Precomputed character signature of the text
+            tokens: Precomputed tokens of the text
+            language_specific: Whether to run the checks that only apply to Turkish prose
             
         Returns:
             List of all Turkish-specific errors found
         """
         errors = []
         
-        errors.extend(self.check_spelling(text))
-        errors.extend(self.check_comma_spacing(text))
-        errors.extend(self.check_turkish_patterns(text))
-        errors.extend(self.check_broken_references(text))
+        if signature is None:
+            signature = char_signature(text)
+        
+        errors.extend(self.check_spelling(text, signature, tokens))
+        errors.extend(self.check_comma_spacing(text, signature))
+        errors.extend(self.check_turkish_patterns(text, signature, language_specific))
+        errors.extend(self.check_broken_references(text, signature))
+        if language_specific:
+            errors.extend(self.check_unknown_words(text, tokens))
         
         return errors
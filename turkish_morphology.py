@@ -0,0 +1,266 @@
+"""
+Rule-based Turkish suffix stripping for matching inflected words to stems.
+
+Turkish words carry chains of suffixes (olasılıklarının = olasılık + lar +
+ı + nın), so a list of surface forms never covers real text. The analyzer
+strips suffixes from the end of a word, accepting a suffix only in the form
+that vowel harmony and consonant assimilation produce after the remaining
+stem, and returns every stem reachable this way. Spelling checks can then
+look the stems up in a lexicon of root words.
+
+Suffixes are written with archiphonemes: A is a/e, I is ı/i/u/ü, D is d/t
+and C is c/ç. A parenthesized buffer letter, as in (y)A, is only used after
+a vowel and a parenthesized buffer vowel, as in (I)m, only after a consonant;
+other suffixes starting with a vowel only follow a consonant. The causative
+(t) is written like a buffer letter, as it only follows vowels (oku → okut).
+
+Word frequencies are Zipfian, so analyses are kept in a bounded LRU cache
+and most words of a book are answered from it.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+VOWELS = frozenset('aeıioöuüâîû')
+BACK_VOWELS = frozenset('aıouâû')
+ROUNDED_VOWELS = frozenset('oöuü')
+VOICELESS = frozenset('çfhkpsşt')
+
+# Stem-final consonants softened before a vowel (kitap → kitabı, renk → rengi)
+SOFTENED = {'b': 'p', 'c': 'ç', 'd': 't', 'ğ': 'k', 'g': 'k'}
+
+# Final consonants that polysyllabic stems always soften before a vowel (olasılığı,
+# never olasılıkı); most polysyllabic stems ending in t keep it (devleti, sabiti)
+SOFTENING = frozenset('pçk')
+
+NOMINAL_SUFFIXES = [
+    'lAr',
+    '(I)m', '(I)n', '(s)I', '(I)mIz', '(I)nIz', 'lArI',
+    '(y)I', '(y)A', 'DA', 'DAn', '(n)In', '(y)lA', 'CA', 'ki', 'DAki', 'nI', 'nA', 'nDA', 'nDAn',
+    '(y)Im', 'sIn', '(y)Iz', 'sInIz', 'DIr', '(y)DI', '(y)mIş', '(y)sA', '(y)ken',
+    'lIk', 'lI', 'sIz', 'CI', 'CIk', 'sAl', 'DAş', 'lAş', 'lA',
+]
+
+VERBAL_SUFFIXES = [
+    'mAk', 'mA', 'mAz', 'mAktA', 'mAlI', 'mAdAn', '(y)An', 'DI', 'DIk', 'DIğ', 'mIş', 'Iyor',
+    '(y)AcAk', '(y)AcAğ', '(I)r', 'Ar', '(I)l', '(I)ş', '(t)', '(y)Abil', '(y)ArAk', '(y)Ip',
+    '(y)IncA', '(y)Iş', '(y)AlIm', 'sA',
+]
+
+# Stem contexts: last vowel of the stem (None if it has none) and its final sound
+_FINAL_TYPES = ('vowel', 'voiceless', 'voiced')
+
+
+def _harmonize(vowel: str, previous: Optional[str]) -> Optional[str]:
+    """Realize archiphoneme vowel A or I after the previous vowel."""
+    if previous is None:
+        return None
+    back = previous in BACK_VOWELS
+    if vowel == 'A':
+        return 'a' if back else 'e'
+    if previous in ROUNDED_VOWELS:
+        return 'u' if back else 'ü'
+    return 'ı' if back else 'i'
+
+
+def realize(template: str, last_vowel: Optional[str], final_type: str) -> Optional[str]:
+    """
+    Realize a suffix template after a stem.
+
+    Args:
+        template: Suffix in archiphoneme notation, e.g. '(y)A' or 'DAn'
+        last_vowel: Last vowel of the stem, or None if the stem has no vowel
+        final_type: 'vowel', 'voiceless' or 'voiced' final sound of the stem
+
+    Returns:
+        Surface form of the suffix, or None if it cannot follow such a stem
+    """
+    if template.startswith('('):
+        buffer, template = template[1], template[3:]
+        # Buffer consonants separate two vowels; buffer vowels two consonants
+        if (final_type == 'vowel') != (buffer in 'AI'):
+            template = buffer + template
+    elif final_type == 'vowel' and (template[0] in VOWELS or template[0] in 'AI'):
+        return None
+
+    surface = []
+    vowel = last_vowel
+    sound = final_type
+    for char in template:
+        if char in 'AI':
+            char = _harmonize(char, vowel)
+            if char is None:
+                return None
+        elif char in 'DC':
+            voiceless = sound == 'voiceless'
+            char = ('t' if voiceless else 'd') if char == 'D' else ('ç' if voiceless else 'c')
+        surface.append(char)
+        if char in VOWELS:
+            vowel = char
+            sound = 'vowel'
+        else:
+            sound = 'voiceless' if char in VOICELESS else 'voiced'
+    return ''.join(surface)
+
+
+def stem_context(stem: str) -> Tuple[Optional[str], str]:
+    """
+    Describe the end of a stem for suffix realization.
+
+    Args:
+        stem: Lowercase stem
+
+    Returns:
+        Tuple of (last vowel or None, final sound type)
+    """
+    last_vowel = next((char for char in reversed(stem) if char in VOWELS), None)
+    final = stem[-1]
+    if final in VOWELS:
+        final_type = 'vowel'
+    elif final in VOICELESS:
+        final_type = 'voiceless'
+    else:
+        final_type = 'voiced'
+    return last_vowel, final_type
+
+
+class SuffixStripper:
+    """Strip Turkish suffixes to find candidate stems, with an LRU cache of analyses."""
+
+    def __init__(self, min_stem_length: int = 2, max_suffixes: int = 6, cache_size: int = 50000):
+        """
+        Initialize the analyzer.
+
+        Args:
+            min_stem_length: Shortest stem to consider
+            max_suffixes: Largest number of suffixes stripped from one word
+            cache_size: Number of word analyses to keep (0 disables caching)
+        """
+        self.min_stem_length = min_stem_length
+        self.max_suffixes = max_suffixes
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Surface form -> (template, stem contexts it may follow)
+        self._suffixes: Dict[str, List[Tuple[str, Set[Tuple[Optional[str], str]]]]] = {}
+        for template in NOMINAL_SUFFIXES + VERBAL_SUFFIXES:
+            contexts: Dict[str, Set[Tuple[Optional[str], str]]] = {}
+            for last_vowel in sorted(VOWELS) + [None]:
+                for final_type in _FINAL_TYPES:
+                    surface = realize(template, last_vowel, final_type)
+                    if surface:
+                        contexts.setdefault(surface, set()).add((last_vowel, final_type))
+            for surface, allowed in contexts.items():
+                self._suffixes.setdefault(surface, []).append((template, allowed))
+        self._lengths = sorted({len(surface) for surface in self._suffixes})
+
+    def analyze(self, word: str) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+        """
+        Find all stems a word can be reduced to.
+
+        Args:
+            word: Lowercase (Turkish case-folded) word
+
+        Returns:
+            Tuple of (stem, suffix templates) analyses, starting with the word
+            itself and then ordered from the longest stem to the shortest
+        """
+        if self.cache_size > 0:
+            cached = self.cache.get(word)
+            if cached is not None:
+                self.cache_hits += 1
+                self.cache.move_to_end(word)
+                return cached
+            self.cache_misses += 1
+
+        found: Dict[str, Tuple[str, ...]] = {word: ()}
+        self._strip(word, (), found, set())
+        analyses = tuple(sorted(found.items(), key=lambda item: (-len(item[0]), item[0])))
+
+        if self.cache_size > 0:
+            self.cache[word] = analyses
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+        return analyses
+
+    def stems(self, word: str) -> List[str]:
+        """
+        Get the candidate stems of a word.
+
+        Args:
+            word: Lowercase (Turkish case-folded) word
+
+        Returns:
+            Candidate stems, starting with the word itself
+
+        Examples:
+            >>> stripper = SuffixStripper()
+            >>> 'olasılık' in stripper.stems('olasılığından')
+            True
+            >>> 'deney' in stripper.stems('deneyde')
+            True
+            >>> 'oku' in stripper.stems('okutmak')
+            True
+
+            Misspelled inflections do not reduce to the stem:
+
+            >>> 'olasılık' in stripper.stems('olasılıkı')
+            False
+            >>> 'olasılık' in stripper.stems('olasılıkdan')
+            False
+            >>> 'deney' in stripper.stems('deneyte')
+            False
+        """
+        return [stem for stem, _ in self.analyze(word)]
+
+    def _strip(self, word: str, suffixes: Tuple[str, ...], found: Dict[str, Tuple[str, ...]], seen: Set[str]):
+        if len(suffixes) >= self.max_suffixes or word in seen:
+            return
+        seen.add(word)
+
+        for length in self._lengths:
+            if len(word) - length < self.min_stem_length:
+                break
+            surface = word[-length:]
+            entries = self._suffixes.get(surface)
+            if entries is None:
+                continue
+
+            stem = word[:-length]
+            candidates = [stem]
+            if surface[0] in VOWELS:
+                if stem[-1] in SOFTENED:
+                    candidates.append(stem[:-1] + SOFTENED[stem[-1]])
+                elif stem[-1] in SOFTENING and sum(char in VOWELS for char in stem) > 1:
+                    continue
+
+            for candidate in candidates:
+                context = stem_context(candidate)
+                if context[0] is None:
+                    continue
+                for template, allowed in entries:
+                    if context in allowed:
+                        chain = (template,) + suffixes
+                        if candidate not in found:
+                            found[candidate] = chain
+                        self._strip(candidate, chain, found, seen)
+                        break
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics for the analysis cache.
+
+        Returns:
+            Dictionary with hits, misses, hit rate and current size
+        """
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': round(self.cache_hits / lookups, 4) if lookups else 0.0,
+            'size': len(self.cache),
+            'max_size': self.cache_size
+        }
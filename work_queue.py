@@ -0,0 +1,215 @@
+"""
+Shared work queue for spreading scans across several processes or hosts.
+
+The queue is a SQLite file, typically on shared storage. Work units are whole
+files or page ranges of a PDF. Workers claim units, send heartbeats while
+working and store the unit results. Units whose worker stopped sending
+heartbeats are put back in the queue.
+"""
+import json
+import time
+import sqlite3
+from typing import List, Dict, Any, Optional
+from error_record import to_json
+
+
+class WorkQueue:
+    """SQLite-backed queue of scan work units."""
+
+    def __init__(self, db_path: str, stale_after: float = 120.0, max_attempts: int = 3):
+        """
+        Open (and create if needed) a work queue.
+
+        Args:
+            db_path: Path to the SQLite queue file
+            stale_after: Seconds without a heartbeat after which a running unit is re-queued
+            max_attempts: Number of attempts before a failing unit is marked failed
+        """
+        self.db_path = db_path
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+        self.conn.execute('PRAGMA busy_timeout = 60000')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS units ('
+            'id INTEGER PRIMARY KEY, path TEXT NOT NULL, kind TEXT NOT NULL, '
+            'first_page INTEGER, last_page INTEGER, total_pages INTEGER, '
+            "status TEXT NOT NULL DEFAULT 'pending', worker TEXT, heartbeat REAL, "
+            'attempts INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS units_status ON units (status)')
+
+    def add_unit(self, path: str, kind: str, first_page: Optional[int] = None,
+                 last_page: Optional[int] = None, total_pages: Optional[int] = None) -> int:
+        """
+        Add a work unit.
+
+        Args:
+            path: File to scan
+            kind: 'text' or 'pdf'
+            first_page: First page of the range (1-indexed, PDF only)
+            last_page: Last page of the range (inclusive, PDF only)
+            total_pages: Page count of the whole PDF
+
+        Returns:
+            ID of the new unit
+        """
+        cursor = self.conn.execute(
+            'INSERT INTO units (path, kind, first_page, last_page, total_pages) VALUES (?, ?, ?, ?, ?)',
+            (path, kind, first_page, last_page, total_pages)
+        )
+        return cursor.lastrowid
+
+    def requeue_stale(self) -> int:
+        """
+        Put units whose worker stopped sending heartbeats back in the queue.
+
+        Units that already used max_attempts are marked failed instead.
+
+        Returns:
+            Number of re-queued units
+        """
+        cursor = self.conn.execute(
+            "UPDATE units SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, error = 'worker stopped sending heartbeats' "
+            "WHERE status = 'running' AND heartbeat < ?",
+            (self.max_attempts, time.time() - self.stale_after)
+        )
+        return cursor.rowcount
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Claim the next pending unit for a worker.
+
+        Args:
+            worker_id: Unique name of the worker
+
+        Returns:
+            Unit dictionary, or None if no unit is pending
+        """
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.requeue_stale()
+            row = self.conn.execute(
+                "SELECT id, path, kind, first_page, last_page, total_pages FROM units "
+                "WHERE status = 'pending' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self.conn.execute('COMMIT')
+                return None
+            self.conn.execute(
+                "UPDATE units SET status = 'running', worker = ?, heartbeat = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker_id, time.time(), row[0])
+            )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+        return dict(zip(('id', 'path', 'kind', 'first_page', 'last_page', 'total_pages'), row))
+
+    def heartbeat(self, unit_id: int, worker_id: str) -> bool:
+        """
+        Record that a worker is still processing a unit.
+
+        Args:
+            unit_id: Unit being processed
+            worker_id: Worker holding the unit
+
+        Returns:
+            False if the unit was re-queued and no longer belongs to the worker
+        """
+        cursor = self.conn.execute(
+            "UPDATE units SET heartbeat = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time(), unit_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, unit_id: int, worker_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Store the result of a finished unit.
+
+        Args:
+            unit_id: Finished unit
+            worker_id: Worker holding the unit
+            result: Unit results dictionary
+
+        Returns:
+            False if the unit had been re-queued and the result was discarded
+        """
+        cursor = self.conn.execute(
+            "UPDATE units SET status = 'done', result = ?, error = NULL "
+            "WHERE id = ? AND worker = ? AND status = 'running'",
+            (json.dumps(result, ensure_ascii=False, default=to_json), unit_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, unit_id: int, worker_id: str, error: str):
+        """
+        Record a failed attempt; the unit is retried until max_attempts is reached.
+
+        Args:
+            unit_id: Failed unit
+            worker_id: Worker holding the unit
+            error: Error description
+        """
+        self.conn.execute(
+            "UPDATE units SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, error = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (self.max_attempts, error, unit_id, worker_id)
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Count units by status.
+
+        Returns:
+            Dictionary mapping status to number of units
+        """
+        counts = {'pending': 0, 'running': 0, 'done': 0, 'failed': 0}
+        counts.update(self.conn.execute('SELECT status, COUNT(*) FROM units GROUP BY status').fetchall())
+        return counts
+
+    def units_for(self, path: str) -> List[Dict[str, Any]]:
+        """
+        Get all units of a file, ordered by page range.
+
+        Args:
+            path: File path
+
+        Returns:
+            List of unit dictionaries, with parsed results for finished units
+        """
+        rows = self.conn.execute(
+            'SELECT id, kind, first_page, last_page, total_pages, status, result, error FROM units '
+            'WHERE path = ? ORDER BY first_page, id',
+            (path,)
+        ).fetchall()
+        units = []
+        for unit_id, kind, first_page, last_page, total_pages, status, result, error in rows:
+            units.append({
+                'id': unit_id,
+                'path': path,
+                'kind': kind,
+                'first_page': first_page,
+                'last_page': last_page,
+                'total_pages': total_pages,
+                'status': status,
+                'result': json.loads(result) if result else None,
+                'error': error
+            })
+        return units
+
+    def paths(self) -> List[str]:
+        """
+        Get every file that has units in the queue.
+
+        Returns:
+            List of file paths in the order they were added
+        """
+        rows = self.conn.execute('SELECT path FROM units GROUP BY path ORDER BY MIN(id)')
+        return [row[0] for row in rows.fetchall()]
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()